@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Offline browser benchmark for Isle Map Updater
+Runs BrowserManager setup, map discovery, map selection and position updates
+against the local vulnona stand-in and reports p50/p95/p99 latencies
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import time
+
+from browser_manager import BrowserManager
+from vulnona_fixture import VulnonaFixture, FakeWebDriver
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def timed(func, *args):
+    """Run func quietly and return (result, elapsed milliseconds)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = (time.perf_counter() - start) * 1000.0
+    return result, elapsed
+
+
+def report(name, samples):
+    """Print one result line"""
+    print(f"{name:<18} n={len(samples):<5} "
+          f"p50={percentile(samples, 50):8.2f} ms  "
+          f"p95={percentile(samples, 95):8.2f} ms  "
+          f"p99={percentile(samples, 99):8.2f} ms")
+
+
+def create_browser_manager(fixture, use_chrome=False, keep_waits=False):
+    """BrowserManager pointed at the fixture, with the fake driver unless Chrome is requested"""
+    driver_factory = None if use_chrome else FakeWebDriver
+    browser_manager = BrowserManager(vulnova_url=fixture.url, driver_factory=driver_factory)
+    if not keep_waits:
+        browser_manager.page_load_wait = 0
+        browser_manager.popup_close_wait = 0
+        browser_manager.map_load_wait = 0
+    return browser_manager
+
+
+def run_benchmark(updates=1000, selections=20, load_delay=0.0, response_delay=0.0,
+                  use_chrome=False, keep_waits=False):
+    """Run the full benchmark and return the collected samples per stage"""
+    fixture = VulnonaFixture(load_delay=load_delay, response_delay=response_delay).start()
+    browser_manager = create_browser_manager(fixture, use_chrome, keep_waits)
+    results = {"setup": [], "discovery": [], "selection": [], "update": []}
+
+    try:
+        success, elapsed = timed(browser_manager.setup_browser)
+        if not success:
+            print("[ERROR] Browser setup failed against fixture")
+            return results
+        results["setup"].append(elapsed)
+
+        maps, elapsed = timed(browser_manager.get_available_maps)
+        results["discovery"].append(elapsed)
+        map_values = [map_info['value'] for map_info in maps]
+        if not map_values:
+            print("[ERROR] No maps discovered on fixture")
+            return results
+
+        for i in range(selections):
+            _, elapsed = timed(browser_manager.select_map, map_values[i % len(map_values)])
+            results["selection"].append(elapsed)
+
+        for i in range(updates):
+            coords = f"{88 + i % 50},{i % 1000:03d}.526, -288,696.11, 21,112.882"
+            _, elapsed = timed(browser_manager.update_map_position, coords)
+            results["update"].append(elapsed)
+
+        state = fixture.get_state()
+        print(f"[BENCH] Fixture saw {state['position_count']} position updates, "
+              f"last map '{state['selected_map']}'")
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.stop()
+        fixture.stop()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline BrowserManager latency benchmark")
+    parser.add_argument("--updates", type=int, default=1000, help="Number of position updates")
+    parser.add_argument("--selections", type=int, default=20, help="Number of map selections")
+    parser.add_argument("--load-delay", type=float, default=0.0, help="Fixture page load delay (s)")
+    parser.add_argument("--response-delay", type=float, default=0.0, help="Fixture response delay (s)")
+    parser.add_argument("--chrome", action="store_true", help="Use real Chrome instead of the fake driver")
+    parser.add_argument("--keep-waits", action="store_true", help="Keep BrowserManager's fixed sleeps")
+    args = parser.parse_args()
+
+    print("ISLE MAP UPDATER - OFFLINE BROWSER BENCHMARK")
+    print("=" * 70)
+    results = run_benchmark(args.updates, args.selections, args.load_delay,
+                            args.response_delay, args.chrome, args.keep_waits)
+    for name in ("setup", "discovery", "selection", "update"):
+        report(name, results[name])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Load test for the ingestion server of Isle Map Updater
+Opens keep-alive HTTP (or WebSocket) connections and pushes batches of
+positions, then reports request latency percentiles and positions per second.
+Without --port it starts its own server whose handler runs CoordinateParser,
+so the numbers cover the server and parser but not the browser.
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import io
+import json
+import os
+import time
+
+from benchmark_browser import report
+from coordinate_parser import CoordinateParser
+from ingest_server import IngestServer, encode_frame, read_frame
+from metrics_registry import MetricsRegistry
+
+
+def make_batch(index, batch_size, use_json=False):
+    """batch_size Evrima positions as raw text lines or a JSON list"""
+    lines = [f"{88 + (index + i) % 50},{(index * 7 + i) % 1000:03d}.526, -288,696.11, 21,112.882"
+             for i in range(batch_size)]
+    if use_json:
+        return json.dumps({"positions": lines}).encode('utf-8')
+    return "\n".join(lines).encode('utf-8')
+
+
+async def http_client(host, port, requests, batch_size, use_json, token, samples):
+    reader, writer = await asyncio.open_connection(host, port)
+    auth = f"Authorization: Bearer {token}\r\n" if token else ""
+    try:
+        for index in range(requests):
+            body = make_batch(index, batch_size, use_json)
+            start = time.perf_counter()
+            writer.write((f"POST /position HTTP/1.1\r\nHost: {host}\r\n{auth}"
+                          f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = int(head.split(b"Content-Length: ", 1)[1].split(b"\r\n", 1)[0])
+            await reader.readexactly(length)
+            samples.append((time.perf_counter() - start) * 1000.0)
+    finally:
+        writer.close()
+
+
+async def websocket_client(host, port, requests, batch_size, use_json, token, samples):
+    reader, writer = await asyncio.open_connection(host, port)
+    query = f"?token={token}" if token else ""
+    key = base64.b64encode(os.urandom(16)).decode('ascii')
+    writer.write((f"GET /ws{query} HTTP/1.1\r\nHost: {host}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                  f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode('latin-1'))
+    await writer.drain()
+    await reader.readuntil(b"\r\n\r\n")
+    try:
+        for index in range(requests):
+            body = make_batch(index, batch_size, use_json)
+            start = time.perf_counter()
+            writer.write(encode_frame(body, mask=os.urandom(4)))
+            await writer.drain()
+            await read_frame(reader, 1 << 24)
+            samples.append((time.perf_counter() - start) * 1000.0)
+        writer.write(encode_frame(b"\x03\xe8", opcode=0x8, mask=os.urandom(4)))
+        await writer.drain()
+    finally:
+        writer.close()
+
+
+async def run_clients(host, port, connections, requests, batch_size, use_json, websocket, token):
+    samples = []
+    client = websocket_client if websocket else http_client
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, requests, batch_size, use_json, token, samples)
+                           for _ in range(connections)))
+    return samples, time.perf_counter() - start
+
+
+def local_server():
+    """Ingestion server on a free port whose handler only parses"""
+    parser = CoordinateParser()
+
+    def handler(text, player=None, map_value=None, received_ns=None):
+        return 'sent' if parser.parse_coordinates(text) is not None else 'no_match'
+
+    server = IngestServer(handler, port=0, metrics=MetricsRegistry())
+    server.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingestion server load test")
+    parser.add_argument("--port", type=int, help="Port of a running Isle Map Updater (default: start a local server)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--token", help="ingest_token of the running app")
+    parser.add_argument("--connections", type=int, default=8, help="Concurrent keep-alive connections")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per connection")
+    parser.add_argument("--batch", type=int, default=10, help="Positions per request")
+    parser.add_argument("--json", action="store_true", help="Send JSON instead of raw text")
+    parser.add_argument("--websocket", action="store_true", help="Use one WebSocket per connection")
+    args = parser.parse_args()
+
+    print("ISLE MAP UPDATER - INGESTION LOAD TEST")
+    print("=" * 70)
+    server = None if args.port else local_server()
+    port = args.port or server.port
+    try:
+        # The parser logs every position; keep that out of the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            samples, elapsed = asyncio.run(run_clients(args.host, port, args.connections, args.requests,
+                                                       args.batch, args.json, args.websocket, args.token))
+    finally:
+        if server:
+            server.stop()
+
+    positions = len(samples) * args.batch
+    report("websocket" if args.websocket else "http", samples)
+    print(f"{len(samples)} requests, {positions} positions in {elapsed:.2f} s: "
+          f"{len(samples) / elapsed:,.0f} req/s, {positions / elapsed:,.0f} positions/s")
+
+
+if __name__ == "__main__":
+    main()
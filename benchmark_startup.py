@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for Isle Map Updater
+Measures import time and time-to-window in fresh interpreters and fails
+if time-to-window regresses against the stored baseline
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(REPO_DIR, "startup_baseline.json")
+
+# Modules that must not be loaded before the window is shown
+HEAVY_MODULES = ("selenium", "webdriver_manager", "psutil", "pyperclip", "numpy")
+
+CHILD_SCRIPT = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {repo_dir!r})
+import contextlib, io
+with contextlib.redirect_stdout(io.StringIO()):
+    import isle_map_updater
+    imported = time.perf_counter()
+    result = {{'import_ms': (imported - start) * 1000.0, 'window_ms': None}}
+    updater = isle_map_updater.IsleMapUpdater()
+    if {show_window!r}:
+        try:
+            updater.gui_manager.create_gui()
+            updater.gui_manager.gui.update()
+            result['window_ms'] = (time.perf_counter() - start) * 1000.0
+            updater.gui_manager.gui.destroy()
+        except Exception as e:
+            result['window_error'] = str(e)
+    result['ready_ms'] = (time.perf_counter() - start) * 1000.0
+result['heavy_modules'] = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps(result))
+"""
+
+
+def run_once(show_window=True):
+    """Start a fresh interpreter (in an empty working directory) and return its measurements"""
+    script = CHILD_SCRIPT.format(repo_dir=REPO_DIR, show_window=show_window, heavy=HEAVY_MODULES)
+    with tempfile.TemporaryDirectory() as work_dir:
+        output = subprocess.run([sys.executable, "-c", script], cwd=work_dir,
+                                capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def load_baseline():
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, 'r') as f:
+            return json.load(f)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreter runs")
+    parser.add_argument("--no-window", action="store_true", help="Skip the GUI (headless machines)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression over baseline (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    print("ISLE MAP UPDATER - STARTUP BENCHMARK")
+    print("=" * 70)
+
+    results = [run_once(not args.no_window) for _ in range(args.runs)]
+    import_ms = statistics.median(r['import_ms'] for r in results)
+    ready_ms = statistics.median(r['ready_ms'] for r in results)
+    window_samples = [r['window_ms'] for r in results if r['window_ms'] is not None]
+    window_ms = statistics.median(window_samples) if window_samples else None
+    heavy = sorted({m for r in results for m in r['heavy_modules']})
+
+    print(f"Import time:     {import_ms:8.1f} ms")
+    print(f"Managers ready:  {ready_ms:8.1f} ms")
+    if window_ms is not None:
+        print(f"Time to window:  {window_ms:8.1f} ms")
+    elif not args.no_window:
+        print(f"Time to window:  n/a ({results[0].get('window_error', 'no display')})")
+    print(f"Heavy modules loaded at startup: {', '.join(heavy) if heavy else 'none'}")
+
+    # Compare window time when available, otherwise the headless ready time
+    metric, value = ('window_ms', window_ms) if window_ms is not None else ('ready_ms', ready_ms)
+
+    if args.update_baseline:
+        baseline = load_baseline() or {}
+        baseline[metric] = value
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"[OK] Baseline {metric} set to {value:.1f} ms")
+        return 0
+
+    failed = False
+    if heavy:
+        print("[FAIL] Heavy dependencies are imported before the window appears")
+        failed = True
+
+    baseline = load_baseline()
+    if baseline and metric in baseline:
+        limit = baseline[metric] * (1.0 + args.tolerance)
+        if value > limit:
+            print(f"[FAIL] {metric} {value:.1f} ms exceeds baseline {baseline[metric]:.1f} ms + {args.tolerance:.0%}")
+            failed = True
+        else:
+            print(f"[PASS] {metric} {value:.1f} ms within baseline {baseline[metric]:.1f} ms + {args.tolerance:.0%}")
+    else:
+        print("[INFO] No baseline stored yet - run with --update-baseline")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
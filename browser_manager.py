@@ -3,50 +3,120 @@ Browser management for Isle Map Updater
 Handles Chrome/Selenium operations and vulnona.com interaction
 """
 
+import json
 import time
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+import threading
+from collections import OrderedDict
+
+
+# Applies one multi-marker frame in a single script call: the DOM writes of all
+# markers happen in one task, so the page lays out and paints once per frame.
+# arguments: overlay host selector, frame JSON {"set": {id: [fx, fy, label]},
+# "removed": [id, ...], "full": bool}. Returns the markers shown, or null.
+MARKER_SCRIPT = """
+var host = document.querySelector(arguments[0]);
+if (!host) { return null; }
+var frame = JSON.parse(arguments[1]);
+var layer = host.querySelector(':scope > .isle-markers');
+if (!layer) {
+    layer = document.createElement('div');
+    layer.className = 'isle-markers';
+    layer.style.cssText = 'position:absolute;left:0;top:0;width:100%;height:100%;pointer-events:none;z-index:1000';
+    if (getComputedStyle(host).position === 'static') { host.style.position = 'relative'; }
+    host.appendChild(layer);
+}
+if (!layer.markers || frame.full) {
+    layer.textContent = '';
+    layer.markers = {};
+}
+frame.removed.forEach(function (id) {
+    var marker = layer.markers[id];
+    if (marker) { marker.remove(); delete layer.markers[id]; }
+});
+Object.keys(frame.set).forEach(function (id) {
+    var entry = frame.set[id];
+    var marker = layer.markers[id];
+    if (!marker) {
+        marker = document.createElement('div');
+        marker.className = 'isle-marker';
+        marker.style.cssText = 'position:absolute;width:10px;height:10px;margin:-7px 0 0 -7px;'
+            + 'border-radius:50%;background:#0a84ff;border:2px solid #fff';
+        marker.appendChild(document.createElement('span')).style.cssText =
+            'position:absolute;left:14px;top:-3px;font:11px sans-serif;color:#fff;white-space:nowrap;'
+            + 'text-shadow:0 0 2px #000';
+        layer.appendChild(marker);
+        layer.markers[id] = marker;
+    }
+    marker.style.left = (entry[0] * 100) + '%';
+    marker.style.top = (entry[1] * 100) + '%';
+    marker.firstChild.textContent = entry[2];
+});
+return Object.keys(layer.markers).length;
+"""
+
+
+class By:
+    """Locator strategies - same values as selenium's By, so selenium is only
+    imported when Chrome is actually started"""
+    ID = "id"
+    CSS_SELECTOR = "css selector"
 
 
 class BrowserManager:
-    def __init__(self):
+    def __init__(self, vulnova_url="https://vulnona.com/game/map/", driver_factory=None):
         self.driver = None
-        self.vulnova_url = "https://vulnona.com/game/map/"
+        self.vulnova_url = vulnova_url
         self.available_maps = []
+        
+        # Optional callable returning a ready driver (offline fixture / benchmarks)
+        self.driver_factory = driver_factory
+        
+        # Fixed waits (seconds) while vulnona loads - lowered by the benchmarks
+        self.page_load_wait = 10
+        self.popup_close_wait = 2
+        self.map_load_wait = 3
+        
+        # Pool of loaded tabs: map value -> window handle, least recently used first
+        self.map_tabs = OrderedDict()
+        self.active_map = None
+        self.max_map_tabs = 3
+        self.tab_memory_budget_mb = 1500
+        self.estimated_tab_memory_mb = 250
+        
+        self._process_cache = {}
+        
+        # Optional page acknowledgement for latency traces: CSS selector of an
+        # element whose markup changes once the marker has moved (None = disabled)
+        self.ack_selector = None
+        self.ack_timeout = 2.0
+        self.ack_poll_interval = 0.01
+        self._ack_before = None
+        
+        # Element the multi-marker layer is placed over - it must span exactly
+        # the map image (None = no markers in the browser)
+        self.marker_overlay_selector = None
+        
+        # Serializes driver commands between the monitor and GUI threads
+        self.driver_lock = threading.RLock()
     
     def setup_browser(self):
         """Initialize Chrome browser with vulnona map"""
         try:
-            chrome_options = Options()
-            chrome_options.add_argument("--new-window")
-            chrome_options.add_argument("--start-maximized")
-            
-            # Try to start Chrome with bundled ChromeDriver
-            chromedriver_path = "chromedriver.exe"
-            
-            # Check if bundled ChromeDriver exists
-            if os.path.exists(chromedriver_path):
-                print("[INFO] Using bundled ChromeDriver")
-                service = Service(chromedriver_path)
+            if self.driver_factory:
+                print("[BROWSER] Starting custom driver...")
+                self.driver = self.driver_factory()
             else:
-                print("[INFO] Using WebDriver-Manager fallback")
-                service = Service(ChromeDriverManager().install())
-            
-            print("[BROWSER] Starting Chrome with ChromeDriver...")
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+                self.driver = self._create_chrome_driver()
+            self.map_tabs.clear()
+            self.active_map = None
             
             print(f"[BROWSER] Navigating to: {self.vulnova_url}")
             self.driver.get(self.vulnova_url)
             
             print("[OK] Browser opened successfully!")
-            print("[WAIT] Waiting 10 seconds for page to fully load...")
-            time.sleep(10)
+            print(f"[WAIT] Waiting {self.page_load_wait} seconds for page to fully load...")
+            time.sleep(self.page_load_wait)
             
             # Wait for the page to be fully interactive
             print("[DEBUG] Checking for map selection elements...")
@@ -97,7 +167,7 @@ class BrowserManager:
                 close_button = self.driver.find_element(By.ID, "readme_close")
                 close_button.click()
                 print("[OK] Info popup closed")
-                time.sleep(2)
+                time.sleep(self.popup_close_wait)
             except Exception as e:
                 print(f"[INFO] No popup to close: {e}")
             
@@ -109,6 +179,32 @@ class BrowserManager:
             print("[INFO] Make sure ChromeDriver is installed")
             return False
     
+    def _create_chrome_driver(self):
+        """Start Chrome with the bundled ChromeDriver or WebDriver-Manager"""
+        # Heavy imports deferred until the browser is really needed
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        
+        chrome_options = Options()
+        chrome_options.add_argument("--new-window")
+        chrome_options.add_argument("--start-maximized")
+        
+        # Try to start Chrome with bundled ChromeDriver
+        chromedriver_path = "chromedriver.exe"
+        
+        # Check if bundled ChromeDriver exists
+        if os.path.exists(chromedriver_path):
+            print("[INFO] Using bundled ChromeDriver")
+            service = Service(chromedriver_path)
+        else:
+            print("[INFO] Using WebDriver-Manager fallback")
+            from webdriver_manager.chrome import ChromeDriverManager
+            service = Service(ChromeDriverManager().install())
+        
+        print("[BROWSER] Starting Chrome with ChromeDriver...")
+        return webdriver.Chrome(service=service, options=chrome_options)
+    
     def get_available_maps(self):
         """Get available maps from vulnona.com"""
         if not self.driver:
@@ -262,61 +358,219 @@ class BrowserManager:
             return []
     
     def select_map(self, map_value):
-        """Select a specific map on vulnona.com"""
+        """Select a specific map on vulnona.com (switches to its pooled tab if loaded)"""
         if not self.driver:
             print("[ERROR] Browser not initialized")
             return False
         
+        with self.driver_lock:
+            opened_tab = False
+            try:
+                # Fast path: map already loaded in a pooled tab
+                if self._switch_to_pooled_tab(map_value):
+                    print(f"[OK] Switched to loaded tab for map: {map_value}")
+                    return True
+                
+                print(f"[MAP] Selecting map: {map_value}")
+                
+                # First map reuses the initial tab, later maps get their own tab
+                if self.map_tabs:
+                    opened_tab = True
+                    if not self._open_map_tab():
+                        return self._discard_new_tabs()
+                
+                if not self._click_map_radio(map_value):
+                    return self._discard_new_tabs() if opened_tab else False
+                
+                self.map_tabs[map_value] = self.driver.current_window_handle
+                self.active_map = map_value
+                self._evict_map_tabs()
+                return True
+                    
+            except Exception as e:
+                print(f"[ERROR] Failed to select map {map_value}: {e}")
+                if opened_tab:
+                    self._discard_new_tabs()
+                return False
+    
+    def _discard_new_tabs(self):
+        """Close tabs that are not in the pool (a map that failed to load) and go back to
+        the active map's tab. Returns False for the failed selection"""
+        pooled = set(self.map_tabs.values())
         try:
-            print(f"[MAP] Selecting map: {map_value}")
-            
-            # Find and click the radio button for this map - try different selectors
-            radio = None
+            for handle in self.driver.window_handles:
+                if handle not in pooled:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+        except Exception as e:
+            print(f"[WARNING] Could not close the failed tab: {e}")
+        self._switch_to_active_tab()
+        return False
+    
+    def _switch_to_active_tab(self):
+        """Make the active map's tab current, whatever tab was left current before"""
+        handle = self.map_tabs.get(self.active_map)
+        if handle is None:
+            return
+        try:
+            if self.driver.current_window_handle != handle:
+                self.driver.switch_to.window(handle)
+        except Exception as e:
+            print(f"[WARNING] Could not switch to the tab of {self.active_map}: {e}")
+    
+    def _click_map_radio(self, map_value):
+        """Click the radio button for a map in the current tab"""
+        # Find and click the radio button for this map - try different selectors
+        radio = None
+        try:
+            radio = self.driver.find_element(By.CSS_SELECTOR, f"input[type='radio'][name='map_list'][value='{map_value}']")
+            print(f"[MAP] Found radio with map_list selector")
+        except:
             try:
-                radio = self.driver.find_element(By.CSS_SELECTOR, f"input[type='radio'][name='map_list'][value='{map_value}']")
-                print(f"[MAP] Found radio with map_list selector")
+                radio = self.driver.find_element(By.CSS_SELECTOR, f"input[type='radio'][name='map'][value='{map_value}']")
+                print(f"[MAP] Found radio with map selector")
             except:
-                try:
-                    radio = self.driver.find_element(By.CSS_SELECTOR, f"input[type='radio'][name='map'][value='{map_value}']")
-                    print(f"[MAP] Found radio with map selector")
-                except:
-                    print(f"[ERROR] Could not find radio button for map: {map_value}")
-                    return False
+                print(f"[ERROR] Could not find radio button for map: {map_value}")
+                return False
+        
+        if not radio.is_selected():
+            # Try clicking the label instead (often more reliable)
+            map_id = radio.get_attribute('id')
+            try:
+                label = self.driver.find_element(By.CSS_SELECTOR, f"label[for='{map_id}']")
+                self.driver.execute_script("arguments[0].click();", label)
+                print(f"[OK] Clicked label for map: {map_value}")
+            except:
+                # Fallback to radio button
+                self.driver.execute_script("arguments[0].checked = true;", radio)
+                self.driver.execute_script("arguments[0].click();", radio)
+                print(f"[OK] Clicked radio for map: {map_value}")
             
-            if not radio.is_selected():
-                # Try clicking the label instead (often more reliable)
-                map_id = radio.get_attribute('id')
-                try:
-                    label = self.driver.find_element(By.CSS_SELECTOR, f"label[for='{map_id}']")
-                    self.driver.execute_script("arguments[0].click();", label)
-                    print(f"[OK] Clicked label for map: {map_value}")
-                except:
-                    # Fallback to radio button
-                    self.driver.execute_script("arguments[0].checked = true;", radio)
-                    self.driver.execute_script("arguments[0].click();", radio)
-                    print(f"[OK] Clicked radio for map: {map_value}")
-                
-                time.sleep(3)  # Wait for map to load
-                
-                # Check if selection worked
-                if radio.is_selected():
-                    print(f"[OK] Successfully selected map: {map_value}")
-                    return True
-                else:
-                    print(f"[WARNING] Map selection may have failed")
-                    # Still return true since the click went through
-                    return True
+            time.sleep(self.map_load_wait)  # Wait for map to load
+            
+            # Check if selection worked
+            if radio.is_selected():
+                print(f"[OK] Successfully selected map: {map_value}")
             else:
-                print(f"[OK] Map {map_value} already selected")
-                return True
-                
+                print(f"[WARNING] Map selection may have failed")
+                # Still return true since the click went through
+        else:
+            print(f"[OK] Map {map_value} already selected")
+        return True
+    
+    def _switch_to_pooled_tab(self, map_value):
+        """Activate the tab already holding map_value, if any"""
+        handle = self.map_tabs.get(map_value)
+        if handle is None:
+            return False
+        
+        try:
+            self.driver.switch_to.window(handle)
         except Exception as e:
-            print(f"[ERROR] Failed to select map {map_value}: {e}")
+            print(f"[WARNING] Pooled tab for {map_value} is gone: {e}")
+            del self.map_tabs[map_value]
             return False
+        
+        self.map_tabs.move_to_end(map_value)
+        self.active_map = map_value
+        return True
+    
+    def _open_map_tab(self):
+        """Open a new tab with vulnona and wait until the map list is present"""
+        print("[BROWSER] Opening new map tab...")
+        self.driver.switch_to.new_window('tab')
+        self.driver.get(self.vulnova_url)
+        
+        deadline = time.time() + self.page_load_wait
+        while not self.driver.find_elements(By.CSS_SELECTOR, "input[type='radio'][name='map_list']"):
+            if time.time() >= deadline:
+                print("[ERROR] Map list did not appear in new tab")
+                return False
+            time.sleep(0.25)
+        
+        try:
+            self.driver.find_element(By.ID, "readme_close").click()
+        except Exception:
+            pass  # Popup is optional
+        return True
+    
+    def _evict_map_tabs(self):
+        """Close least-recently-used tabs beyond the tab limit or memory budget"""
+        while len(self.map_tabs) > 1:
+            over_limit = len(self.map_tabs) > self.max_map_tabs
+            over_budget = self.get_browser_memory_mb() > self.tab_memory_budget_mb
+            if not over_limit and not over_budget:
+                break
+            
+            lru_map, lru_handle = next(iter(self.map_tabs.items()))
+            if lru_map == self.active_map:
+                break
+            
+            print(f"[BROWSER] Evicting tab for map: {lru_map}")
+            del self.map_tabs[lru_map]
+            try:
+                self.driver.switch_to.window(lru_handle)
+                self.driver.close()
+            except Exception as e:
+                print(f"[WARNING] Could not close tab for {lru_map}: {e}")
+            self.driver.switch_to.window(self.map_tabs[self.active_map])
     
-    def update_map_position(self, raw_coordinates):
-        """Update position on vulnona map with raw Isle coordinates"""
+    def get_browser_memory_mb(self):
+        """Resident memory of the browser process tree in MB (estimated if unavailable)"""
         try:
+            processes = self._browser_processes()
+            return sum(process.memory_info().rss for process in processes) / (1024 * 1024)
+        except Exception:
+            return len(self.map_tabs) * self.estimated_tab_memory_mb
+    
+    def get_process_stats(self):
+        """RSS (MB) and CPU (%) of the Chrome processes started by ChromeDriver, or None"""
+        try:
+            processes = self._browser_processes()
+        except Exception:
+            return None
+        
+        rss = 0
+        cpu = 0.0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+                cpu += process.cpu_percent(None)
+            except Exception:
+                pass  # Renderer processes come and go
+        return {'rss_mb': rss / (1024 * 1024), 'cpu_percent': cpu}
+    
+    def _browser_processes(self):
+        """Child processes of ChromeDriver, reused between calls so cpu_percent has a baseline"""
+        import psutil
+        driver_pid = self.driver.service.process.pid
+        processes = []
+        for child in psutil.Process(driver_pid).children(recursive=True):
+            cached = self._process_cache.get(child.pid)
+            processes.append(cached if cached is not None else child)
+        self._process_cache = {process.pid: process for process in processes}
+        return processes
+    
+    def update_map_position(self, raw_coordinates, trace=None):
+        """Update position on vulnona map with raw Isle coordinates (in the active map's tab)"""
+        with self.driver_lock:
+            if trace:
+                trace.mark('driver_start')
+            self._switch_to_active_tab()
+            success = self._submit_position(raw_coordinates, trace)
+            ack_before = self._ack_before
+        if success and trace and self.ack_selector:
+            # Polled without holding the lock, so other threads' commands are not held up
+            self._wait_for_page_ack(trace, ack_before)
+        return success
+    
+    def _submit_position(self, raw_coordinates, trace=None):
+        """Fill #current_pos and click Show in the current tab"""
+        try:
+            # Snapshot the acknowledgement element so its change can be detected
+            if trace and self.ack_selector:
+                self._ack_before = self._read_ack_state()
+            
             # Find the coordinate input field
             coordinate_input = self.driver.find_element(By.ID, "current_pos")
             
@@ -327,6 +581,8 @@ class BrowserManager:
             # Find and click the submit button
             submit_button = self.driver.find_element(By.CSS_SELECTOR, "input[type='submit'][value='Show']")
             submit_button.click()
+            if trace:
+                trace.mark('driver_end')
             
             print(f"[MAP] Updated position: {raw_coordinates}")
             return True
@@ -335,13 +591,79 @@ class BrowserManager:
             print(f"[ERROR] Failed to update map: {e}")
             return False
     
+    def update_markers(self, markers, removed=(), full=False):
+        """Apply one multi-marker frame in the active map's tab with a single script call.
+        markers maps id -> (fraction x, fraction y, label) of the map image.
+        Returns the number of markers the page shows, or None without an overlay host"""
+        if not self.marker_overlay_selector or not self.driver:
+            return None
+        frame = json.dumps({
+            'set': {str(marker_id): [round(fx, 5), round(fy, 5), label]
+                    for marker_id, (fx, fy, label) in markers.items()},
+            'removed': [str(marker_id) for marker_id in removed],
+            'full': full,
+        })
+        with self.driver_lock:
+            self._switch_to_active_tab()
+            try:
+                return self.driver.execute_script(MARKER_SCRIPT, self.marker_overlay_selector, frame)
+            except Exception as e:
+                print(f"[ERROR] Failed to update markers: {e}")
+                return None
+    
+    def _read_ack_state(self):
+        """Markup of the acknowledgement element (e.g. the position marker)"""
+        try:
+            element = self.driver.find_element(By.CSS_SELECTOR, self.ack_selector)
+            return self.driver.execute_script("return arguments[0].outerHTML;", element)
+        except Exception:
+            return None
+    
+    def _wait_for_page_ack(self, trace, ack_before):
+        """Poll until the acknowledgement element changes, marking page_ack on the trace.
+        The driver lock is taken for each check only"""
+        deadline = time.monotonic() + self.ack_timeout
+        while time.monotonic() < deadline:
+            with self.driver_lock:
+                ack_state = self._read_ack_state()
+            if ack_state != ack_before:
+                trace.mark('page_ack')
+                return True
+            time.sleep(self.ack_poll_interval)
+        print(f"[WARNING] No page acknowledgement within {self.ack_timeout}s")
+        return False
+    
+    def is_alive(self):
+        """Cheap health probe: the session answers and the active tab still exists"""
+        if not self.driver:
+            return False
+        try:
+            self.driver.current_window_handle
+            return True
+        except Exception as e:
+            print(f"[WARNING] Browser health check failed: {e}")
+            return False
+    
+    def abandon_driver(self):
+        """Forget the current session without talking to it (it is dead or being quit elsewhere).
+        Returns the abandoned driver"""
+        with self.driver_lock:
+            driver, self.driver = self.driver, None
+            self.map_tabs.clear()
+            self.active_map = None
+            self._process_cache = {}
+        return driver
+    
     def stop(self):
         """Stop the browser"""
         if self.driver:
             try:
                 print("[BROWSER] Closing browser...")
                 self.driver.quit()
-                self.driver = None
                 print("[OK] Browser closed successfully")
             except Exception as e:
-                print(f"[WARNING] Error closing browser: {e}")
\ No newline at end of file
+                print(f"[WARNING] Error closing browser: {e}")
+            finally:
+                self.driver = None
+                self.map_tabs.clear()
+                self.active_map = None
\ No newline at end of file
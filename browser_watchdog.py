@@ -0,0 +1,139 @@
+"""
+Browser health watchdog for Isle Map Updater
+Detects dead or stale browser sessions and restores them in the background
+"""
+
+import threading
+import time
+
+
+class BrowserWatchdog:
+    def __init__(self, app_instance, check_interval=5.0, probe_timeout=5.0, failure_threshold=2):
+        self.app = app_instance  # Reference to main app
+        self.check_interval = check_interval        # Seconds between routine health probes
+        self.probe_timeout = probe_timeout          # A probe slower than this means a stale session
+        self.failure_threshold = failure_threshold  # Failed updates before an immediate probe
+
+        self.running = False
+        self.recovering = False
+        self.needs_recovery = False
+        self.consecutive_failures = 0
+        self.wake_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Start watching the browser session"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self.thread.start()
+        print("[WATCHDOG] Browser watchdog started")
+
+    def stop(self):
+        """Stop watching"""
+        self.running = False
+        self.wake_event.set()
+
+    def report_success(self):
+        """Called after a successful map update"""
+        self.consecutive_failures = 0
+
+    def report_failure(self):
+        """Called after a failed map update - probes right away once failures pile up"""
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.wake_event.set()
+
+    def check_health(self):
+        """Cheap liveness probe, run with a timeout so a hung session counts as stale"""
+        result = {'alive': False}
+
+        def probe():
+            result['alive'] = self.app.browser_manager.is_alive()
+
+        probe_thread = threading.Thread(target=probe, daemon=True)
+        probe_thread.start()
+        probe_thread.join(self.probe_timeout)
+
+        if probe_thread.is_alive():
+            print(f"[WATCHDOG] Browser did not answer within {self.probe_timeout}s (stale session)")
+            return False
+        return result['alive']
+
+    def _watch_loop(self):
+        while self.running:
+            self.wake_event.wait(self.check_interval)
+            self.wake_event.clear()
+            if not self.running:
+                break
+
+            if not self.needs_recovery:
+                if not self.app.browser_manager.driver or self.check_health():
+                    continue
+                self.app.metrics.increment('browser.sessions_lost')
+
+            self.needs_recovery = not self.recover()
+
+    def recover(self):
+        """Relaunch the browser, restore the saved map and replay the latest coordinates"""
+        self.recovering = True
+        start = time.perf_counter()
+        self._log("[WATCHDOG] Browser session lost - recovering...")
+
+        try:
+            browser_manager = self.app.browser_manager
+            # Kill the old session first, without the driver lock and with a time limit - a hung
+            # browser may never answer quit(). This also fails a command another thread is stuck in
+            self._quit_driver(browser_manager.driver)
+
+            # Swap in the new session under the lock, so no update runs against a half-reset pool
+            if not browser_manager.driver_lock.acquire(timeout=self.probe_timeout):
+                self._log(f"[WATCHDOG] Browser still busy - retrying in {self.check_interval}s")
+                self.app.metrics.increment('browser.recovery_failures')
+                return False
+            try:
+                browser_manager.abandon_driver()
+                if not browser_manager.setup_browser():
+                    self._log(f"[WATCHDOG] Browser relaunch failed - retrying in {self.check_interval}s")
+                    self.app.metrics.increment('browser.recovery_failures')
+                    return False
+
+                browser_manager.get_available_maps()
+                selected_map = self.app.config_manager.get_selected_map()
+                if selected_map and not browser_manager.select_map(selected_map):
+                    self._log(f"[WATCHDOG] Could not restore map: {selected_map}")
+            finally:
+                browser_manager.driver_lock.release()
+
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            self.app.metrics.observe('browser.recovery_ms', elapsed_ms)
+            self.app.metrics.increment('browser.recoveries')
+            self.consecutive_failures = 0
+            self._log(f"[WATCHDOG] Browser recovered in {elapsed_ms / 1000.0:.1f}s")
+        finally:
+            self.recovering = False
+
+        self.app.replay_latest_coordinates()
+        return True
+
+    def _quit_driver(self, driver):
+        """quit() on a helper thread, given up after probe_timeout like a health probe"""
+        if driver is None:
+            return
+
+        def quit_driver():
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"[WATCHDOG] Closing the lost browser failed: {e}")
+
+        quit_thread = threading.Thread(target=quit_driver, daemon=True)
+        quit_thread.start()
+        quit_thread.join(self.probe_timeout)
+        if quit_thread.is_alive():
+            print(f"[WATCHDOG] Lost browser did not close within {self.probe_timeout}s - abandoning it")
+
+    def _log(self, message):
+        print(message)
+        self.app.log_to_gui(message)
@@ -8,10 +8,50 @@ import os
 import time
 
 
+# Tunable settings stored next to the selected map
+DEFAULT_SETTINGS = {
+    'movement_threshold': 50.0,      # Minimum distance (game units) before the marker is moved again
+    'movement_ignore_altitude': True,
+    'max_log_lines': 1000,           # Lines kept in the GUI status box
+    'trace_log_file': None,          # Append completed latency traces to this JSONL file
+    'trace_ack_selector': None,      # CSS selector that changes when the marker moved (page ack)
+    'history_file': 'position_history.db',  # SQLite position history (None = disabled)
+    'history_raw_points': True,      # Keep every position, not just the simplified trail
+    'trail_tolerance': 25.0,         # Max deviation (game units) of the simplified trail (None = off)
+    'map_calibration_file': 'map_calibration.json',  # World -> map image pixel calibrations
+    'map_image_dir': 'map_images',   # Cached map images (<map value>.png) for the local map window
+    'local_trail_length': 200,       # Trail segments drawn in the local map window
+    'local_map_zoom': None,          # Tile pyramid level for the local map window (None = full resolution)
+    'lan_share': False,              # Share positions with tribe members on the LAN (UDP multicast)
+    'player_name': None,             # Name shown to tribe members (None = computer user name)
+    'lan_group': '239.255.42.99',
+    'lan_port': 47999,
+    'lan_max_rate': 5.0,             # Position packets per second at most
+    'marker_frame_rate': 5.0,        # Redraws per second of other players' markers
+    'marker_overlay_selector': None, # CSS selector of the element spanning the map image (browser markers)
+    'ingest_port': None,             # Accept positions over HTTP/WebSocket on localhost:<port> (None = off)
+    'ingest_token': None,            # Shared secret other tools must send to the ingestion server
+    'ingest_allowed_origins': [],    # Web page origins allowed to use the ingestion server (others get 403)
+    'clipboard_input': True,         # Watch the clipboard for copied positions
+    'clipboard_record_file': None,   # Record clipboard changes for replay (strftime pattern, .gz = compressed)
+    'clipboard_record_redact': True, # Store only the length of copied text that was not a position
+    'log_tail_file': None,           # Also read positions appended to this log file (None = off)
+    'log_tail_pattern': None,        # Regex for position lines; optional groups 'coords' and 'player'
+    'log_offsets_file': 'log_offsets.json',  # Where reading of each log stopped
+    'bounds_auto_calibrate': False,  # Narrow each map's bounds to where positions were seen
+    'bounds_calibration_samples': 100,  # Map updates before (and between) calibrations
+    'bounds_margin': 0.25,           # Calibrated bounds extend the seen area by this share of its size
+    'bounds_confirm_distance': 5000.0,  # Two rejected positions this close widen calibrated bounds
+    'poi_file': 'pois.json',         # Points of interest per map (water, mud, nests, ...)
+    'poi_nearest_count': 3,          # POIs shown next to the position log
+}
+
+
 class ConfigManager:
     def __init__(self, config_file="map_config.json"):
         self.config_file = config_file
         self.selected_map = None
+        self.settings = dict(DEFAULT_SETTINGS)
         self.load_config()
     
     def load_config(self):
@@ -21,6 +61,7 @@ class ConfigManager:
                 with open(self.config_file, 'r') as f:
                     config = json.load(f)
                     self.selected_map = config.get('selected_map', None)
+                    self.settings.update(config.get('settings', {}))
                     print(f"[CONFIG] Loaded saved map: {self.selected_map}")
             else:
                 print("[CONFIG] No config file found, will create on first save")
@@ -32,6 +73,7 @@ class ConfigManager:
         try:
             config = {
                 'selected_map': self.selected_map,
+                'settings': self.settings,
                 'last_updated': time.strftime('%Y-%m-%d %H:%M:%S')
             }
             with open(self.config_file, 'w') as f:
@@ -47,4 +89,13 @@ class ConfigManager:
     
     def get_selected_map(self):
         """Get the currently selected map"""
-        return self.selected_map
\ No newline at end of file
+        return self.selected_map
+    
+    def get_setting(self, key):
+        """Get a tunable setting (falls back to the built-in default)"""
+        return self.settings.get(key, DEFAULT_SETTINGS.get(key))
+    
+    def set_setting(self, key, value):
+        """Set a tunable setting and save it"""
+        self.settings[key] = value
+        self.save_config()
@@ -16,6 +16,8 @@ class CoordinateParser:
             "86,999.888, -286,777.99, 19,444.333"
         ]
         self.test_index = 0
+        self.test_source = None  # Endless iterator of test positions (e.g. LoadGenerator.texts()) instead of the list
+        self.last_format = None  # 'legacy' or 'evrima' for the last successful parse
     
     def parse_coordinates(self, text):
         """Extract raw Isle coordinates from clipboard text"""
@@ -32,11 +34,13 @@ class CoordinateParser:
         # Try Legacy format first: (Lat: xxx,xxx.xxx Long: yyy,yyy.yyy Alt: zzz,zzz.zzz)
         legacy_coords = self._parse_legacy_format(text)
         if legacy_coords:
+            self.last_format = 'legacy'
             return legacy_coords
         
         # Try Evrima format: xxx,xxx.xxx, yyy,yyy.yyy, zzz,zzz.zzz
         evrima_coords = self._parse_evrima_format(text)
         if evrima_coords:
+            self.last_format = 'evrima'
             return evrima_coords
         
         return None
@@ -63,13 +67,15 @@ class CoordinateParser:
         
         # Pattern for various number formats - more flexible matching
         number_pattern = (
-            r"" + minus_signs + r"?"                    # optional minus sign (hyphen or minus)
+            r"(?<!\d)"                                  # never start inside a digit run (1234567, 2, 3)
+            + minus_signs + r"?"                        # optional minus sign (hyphen or minus)
             r"(?:"                                      # start group for number formats
             r"\d{1,3}(?:" + thousands_seps + r"\d{1,3})*"  # digit groups with separators (1-3 per group)
             r"(?:" + decimal_seps + r"\d{1,6})?"        # optional decimal part
             r"|"                                        # OR
             r"\d{1,6}(?:" + decimal_seps + r"\d{1,6})?" # simple number with optional decimal
             r")"                                        # end group
+            r"(?!\d)"                                   # never stop inside a digit run (Alt: 36617.423)
         )
         
         return number_pattern
@@ -320,8 +326,20 @@ class CoordinateParser:
         
         return f"{norm_x}, {norm_y}, {norm_z}"
     
+    def to_numeric(self, normalized_coords):
+        """Convert normalized "x, y, z" output (comma-dot format) to a tuple of floats"""
+        try:
+            parts = normalized_coords.split(', ')
+            if len(parts) != 3:
+                return None
+            return tuple(float(part.replace(',', '')) for part in parts)
+        except (AttributeError, ValueError):
+            return None
+    
     def get_test_coordinates(self):
         """Get next test coordinates for demo purposes"""
+        if self.test_source is not None:
+            return next(self.test_source)
         coords = self.test_coordinates[self.test_index]
         self.test_index = (self.test_index + 1) % len(self.test_coordinates)
         return coords
\ No newline at end of file
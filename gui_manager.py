@@ -5,7 +5,9 @@ Handles the tkinter interface and user interactions
 
 import tkinter as tk
 from tkinter import ttk
+import math
 import threading
+from collections import deque
 
 
 class GUIManager:
@@ -18,12 +20,24 @@ class GUIManager:
         self.save_map_button = None
         self.setup_button = None
         self.refresh_button = None
+        self.nearby_label = None
+        self.tribe_label = None
+        
+        # Ring buffer of log lines from any thread, drained in batches on the Tk thread
+        self.max_log_lines = self.app.config_manager.get_setting('max_log_lines')
+        self.log_queue = deque(maxlen=self.max_log_lines)
+        self.log_drain_interval_ms = 100
+        self.nearby_text = None  # Latest nearest-POI summary, applied on the next drain
+        
+        # Performance panel labels, refreshed from the metrics registry
+        self.perf_labels = {}
+        self.perf_refresh_interval_ms = 1000
     
     def create_gui(self):
         """Create GUI with map selection and monitoring"""
         self.gui = tk.Tk()
         self.gui.title("Isle Map Updater")
-        self.gui.geometry("500x400")
+        self.gui.geometry("500x600")
         self.gui.resizable(False, False)
         
         # Header
@@ -65,12 +79,29 @@ class GUIManager:
                                        bg="#2196F3", fg="white", font=("Arial", 11), state=tk.DISABLED)
         self.refresh_button.pack(side=tk.LEFT, padx=5)
         
+        tk.Button(setup_frame, text="Local Map", command=self.open_local_map,
+                  bg="#607D8B", fg="white", font=("Arial", 11)).pack(side=tk.LEFT, padx=5)
+        
+        # Performance panel
+        self.create_performance_panel()
+        
         # Status display
         status_frame = tk.Frame(self.gui)
         status_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
         
         tk.Label(status_frame, text="Status:", font=("Arial", 11, "bold")).pack(anchor=tk.W)
         
+        # Nearest points of interest for the last position
+        self.nearby_label = tk.Label(status_frame, text="Nearby: -", font=("Consolas", 9),
+                                     anchor=tk.W, justify=tk.LEFT, wraplength=470)
+        self.nearby_label.pack(fill=tk.X)
+        
+        # Tribe members shared over the LAN
+        if self.app.lan:
+            self.tribe_label = tk.Label(status_frame, text="Tribe: -", font=("Consolas", 9),
+                                        anchor=tk.W, justify=tk.LEFT, wraplength=470)
+            self.tribe_label.pack(fill=tk.X)
+        
         # Status text area
         self.status_text = tk.Text(status_frame, height=12, width=55, font=("Consolas", 9))
         self.status_text.pack(pady=5, fill=tk.BOTH, expand=True)
@@ -96,6 +127,91 @@ class GUIManager:
         # Initialize map dropdown if we have saved config
         if self.app.config_manager.get_selected_map():
             self.log_to_gui(f"Saved map: {self.app.config_manager.get_selected_map()}")
+        
+        # Start draining queued log lines and refreshing the performance panel
+        self.gui.after(self.log_drain_interval_ms, self.drain_log_queue)
+        self.gui.after(self.perf_refresh_interval_ms, self.refresh_performance_panel)
+    
+    def create_performance_panel(self):
+        """Compact grid of live latency and throughput numbers"""
+        perf_frame = tk.LabelFrame(self.gui, text="Performance", font=("Arial", 10, "bold"))
+        perf_frame.pack(pady=5, padx=10, fill=tk.X)
+        
+        rows = [
+            ('clipboard', "Clipboard change seen within:"),
+            ('parse', "Parse:"),
+            ('browser', "Map update (last/p50/p95):"),
+            ('throughput', "Updates/min:"),
+            ('skipped', "Skipped:"),
+            ('process', "Browser:"),
+            ('sinks', "Sink lag (p95):"),
+        ]
+        for row, (key, title) in enumerate(rows):
+            tk.Label(perf_frame, text=title, font=("Arial", 9)).grid(row=row, column=0, sticky=tk.W, padx=5)
+            value_label = tk.Label(perf_frame, text="-", font=("Consolas", 9), anchor=tk.W)
+            value_label.grid(row=row, column=1, sticky=tk.W)
+            self.perf_labels[key] = value_label
+    
+    def refresh_performance_panel(self):
+        """Update the performance panel from the metrics registry (Tk thread, ~1 Hz)"""
+        if not self.gui:
+            return
+        
+        metrics = self.app.metrics
+        
+        def latency(name, detailed=False):
+            histogram = metrics.get_histogram(name)
+            if not histogram:
+                return "-"
+            if detailed:
+                return f"{histogram['last']:.0f} / {histogram['p50']:.0f} / {histogram['p95']:.0f} ms"
+            return f"{histogram['last']:.2f} ms (p95 {histogram['p95']:.2f})"
+        
+        skipped = metrics.get_counter('updates.suppressed') + metrics.get_counter('updates.out_of_bounds')
+        rss = metrics.get_gauge('browser.rss_mb')
+        cpu = metrics.get_gauge('browser.cpu_percent')
+        
+        values = {
+            'clipboard': latency('clipboard.detect_ms'),
+            'parse': latency('parse.ms'),
+            'browser': latency('browser.update_ms', detailed=True),
+            'throughput': str(metrics.get_rate('updates.sent')),
+            'skipped': f"{skipped} / {metrics.get_counter('updates.coalesced')} coalesced",
+            'process': f"{rss:.0f} MB, {cpu:.0f}% CPU" if rss is not None else "-",
+            'sinks': self.format_sink_lag(),
+        }
+        for key, text in values.items():
+            self.perf_labels[key].config(text=text)
+        if self.tribe_label:
+            self.tribe_label.config(text=f"Tribe: {self.format_tribe()}")
+        
+        self.gui.after(self.perf_refresh_interval_ms, self.refresh_performance_panel)
+    
+    def format_tribe(self):
+        """'Alice 1,234 away, Bob (spiro)' for the members heard from recently"""
+        selected_map = self.app.config_manager.get_selected_map()
+        own = self.app.latest_coords
+        parts = []
+        for peer in sorted(self.app.lan.get_peers(), key=lambda p: p.name or ""):
+            if peer.map_value != selected_map:
+                parts.append(f"{peer.name} ({peer.map_value})")
+            elif own:
+                distance = math.hypot(peer.coords[0] - own[0], peer.coords[1] - own[1])
+                parts.append(f"{peer.name} {distance:,.0f} away")
+            else:
+                parts.append(peer.name)
+        return ", ".join(parts) or "-"
+    
+    def format_sink_lag(self):
+        """'browser 12 ms, history 0 ms (3 dropped)' from the pipeline stats"""
+        parts = []
+        for name, stats in self.app.sinks.stats().items():
+            lag = stats.get('lag_ms')
+            text = f"{name} {lag['p95']:.0f} ms" if lag else f"{name} -"
+            if stats['dropped']:
+                text += f" ({stats['dropped']} dropped)"
+            parts.append(text)
+        return ", ".join(parts) or "-"
     
     def setup_browser_gui(self):
         """Setup browser from GUI button"""
@@ -115,6 +231,7 @@ class GUIManager:
                     # Now load the maps
                     maps = self.app.browser_manager.get_available_maps()
                     if maps:
+                        self.app.map_bounds.refresh(maps)
                         self.update_map_dropdown()
                         self.log_to_gui(f"✅ Found {len(maps)} available maps!")
                         self.save_map_button.config(state=tk.NORMAL)
@@ -138,13 +255,24 @@ class GUIManager:
         
         threading.Thread(target=setup_thread, daemon=True).start()
     
+    def open_local_map(self):
+        """Show the position on a cached map image (works without the browser)"""
+        self.app.renderer.open_window(self.gui)
+        selected_map = self.app.config_manager.get_selected_map()
+        if not selected_map:
+            self.log_to_gui("Select or save a map first to track it on the local map")
+        elif not self.app.running:
+            self.log_to_gui(f"🗺️ Local map: {selected_map}")
+            self.app.start_monitoring()
+    
     def refresh_maps_gui(self):
         """Refresh available maps from GUI button"""
         self.refresh_button.config(state=tk.DISABLED, text="Refreshing...")
         self.log_to_gui("Refreshing available maps...")
         
         def refresh_thread():
-            self.app.browser_manager.get_available_maps()
+            maps = self.app.browser_manager.get_available_maps()
+            self.app.map_bounds.refresh(maps)
             self.update_map_dropdown()
             self.log_to_gui("Maps refreshed!")
             self.refresh_button.config(state=tk.NORMAL, text="Refresh Maps")
@@ -205,6 +333,7 @@ class GUIManager:
                 success = self.app.browser_manager.select_map(selected_map_value)
                 if success:
                     self.app.config_manager.set_selected_map(selected_map_value)
+                    self.app.movement_filter.reset()
                     self.log_to_gui(f"✅ Map active: {selected_label}")
                     # Start monitoring if not already running
                     if not self.app.running:
@@ -251,17 +380,46 @@ class GUIManager:
         print(f"[DEBUG] Available maps: {[m['value'] for m in filtered_maps]}")
     
     def log_to_gui(self, message):
-        """Add message to GUI status"""
-        if self.status_text:
-            self.status_text.insert(tk.END, message + "\n")
+        """Queue message for the GUI status (safe to call from any thread)"""
+        self.log_queue.append(message)
+    
+    def show_nearby(self, text):
+        """Replace the nearest-POI line (safe to call from any thread)"""
+        self.nearby_text = text
+    
+    def drain_log_queue(self):
+        """Write queued log lines in one batch and trim the status to max_log_lines (Tk thread only)"""
+        if not self.gui or not self.status_text:
+            return
+        
+        lines = []
+        try:
+            while True:
+                lines.append(self.log_queue.popleft())
+        except IndexError:
+            pass
+        
+        if lines:
+            self.status_text.insert(tk.END, "\n".join(lines) + "\n")
+            
+            # Drop the oldest lines so the widget stays bounded over long sessions
+            line_count = int(self.status_text.index('end-1c').split('.')[0]) - 1
+            if line_count > self.max_log_lines:
+                self.status_text.delete('1.0', f"{line_count - self.max_log_lines + 1}.0")
             self.status_text.see(tk.END)
-            self.gui.update_idletasks()
+        
+        nearby_text, self.nearby_text = self.nearby_text, None
+        if nearby_text is not None and self.nearby_label:
+            self.nearby_label.config(text=f"Nearby: {nearby_text}")
+        
+        self.gui.after(self.log_drain_interval_ms, self.drain_log_queue)
     
     def stop_gui(self):
         """Stop everything and close GUI"""
         self.app.running = False
         if self.gui:
             self.gui.destroy()
+            self.gui = None
         self.app.stop()
     
     def start_mainloop(self):
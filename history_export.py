@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Export and import of recorded positions for Isle Map Updater
+Streams positions or simplified trails between the history database and
+GeoJSON / CSV files in constant memory, so season-long files can be shared.
+
+    python history_export.py export gateway.geojson --map gateway
+    python history_export.py export trails.csv --trail
+    python history_export.py import shared.geojson.gz
+"""
+
+import argparse
+import csv
+import gzip
+import itertools
+import json
+import re
+import time
+
+from position_history import PositionHistory
+
+
+POSITION_COLUMNS = ['ts', 'map', 'x', 'y', 'z', 'fmt']
+TRAIL_COLUMNS = ['trail_id', 'ts', 'map', 'x', 'y', 'z']
+FEATURES_START = re.compile(r'"features"\s*:\s*\[')
+
+
+def open_text(path, mode):
+    """Open a text file, gzip-compressed if the name ends with .gz"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def detect_format(path):
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'csv' if name.lower().endswith('.csv') else 'geojson'
+
+
+# --- writing -----------------------------------------------------------------
+
+def write_csv(rows, f, columns, chunk_size=5000):
+    """Write rows to CSV in chunks; returns the number written"""
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    written = 0
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            return written
+        writer.writerows(chunk)
+        written += len(chunk)
+
+
+def position_features(rows):
+    """Point feature per (ts, map, x, y, z, fmt) row"""
+    for ts, map_value, x, y, z, fmt in rows:
+        yield {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [x, y, z]},
+            "properties": {"map": map_value, "ts": ts, "fmt": fmt},
+        }
+
+
+def trail_features(rows):
+    """LineString feature per trail from (trail_id, ts, map, x, y, z) rows grouped by trail"""
+    for (trail_id, map_value), vertices in itertools.groupby(rows, key=lambda row: (row[0], row[2])):
+        vertices = list(vertices)  # One trail, already simplified
+        yield {
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": [[x, y, z] for _, _, _, x, y, z in vertices]},
+            "properties": {"map": map_value, "trail_id": trail_id, "timestamps": [row[1] for row in vertices]},
+        }
+
+
+def write_geojson(features, f, chunk_size=1000):
+    """Write a FeatureCollection one feature per line, in chunks; returns the number written"""
+    f.write('{"type": "FeatureCollection", "features": [\n')
+    written = 0
+    while True:
+        chunk = [json.dumps(feature, separators=(',', ':')) for feature in itertools.islice(features, chunk_size)]
+        if not chunk:
+            break
+        f.write((",\n" if written else "") + ",\n".join(chunk))
+        written += len(chunk)
+    f.write('\n]}\n')
+    return written
+
+
+def export_history(history, path, map_value=None, trail=False, start_time=None, end_time=None):
+    """Stream positions (or trails) from the history into a GeoJSON / CSV file"""
+    if trail:
+        rows = history.iter_trail_points(map_value, start_time, end_time)
+    else:
+        rows = history.iter_positions(map_value, start_time, end_time)
+
+    with open_text(path, 'w') as f:
+        if detect_format(path) == 'csv':
+            return write_csv(rows, f, TRAIL_COLUMNS if trail else POSITION_COLUMNS)
+        return write_geojson(trail_features(rows) if trail else position_features(rows), f)
+
+
+# --- reading -----------------------------------------------------------------
+
+def read_csv(f):
+    """Yield ('position', row) or ('trail', row) records from a CSV export"""
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header == TRAIL_COLUMNS:
+        for trail_id, ts, map_value, x, y, z in reader:
+            yield 'trail', (int(trail_id), float(ts), map_value, float(x), float(y), float(z))
+    elif header == POSITION_COLUMNS:
+        for ts, map_value, x, y, z, fmt in reader:
+            yield 'position', (float(ts), map_value, float(x), float(y), float(z), fmt or None)
+    else:
+        raise ValueError(f"Unknown CSV header: {header}")
+
+
+def iter_features(f, read_size=1 << 16):
+    """Yield the features of a FeatureCollection one at a time, holding only the
+    current feature in memory (works for any formatting, not just our own exports)"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+
+    # Skip to the start of the features array
+    while True:
+        match = FEATURES_START.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        if eof:
+            raise ValueError("No features array found")
+        data = f.read(read_size)
+        eof = not data
+        buffer = buffer[-64:] + data
+
+    while True:
+        stripped = buffer.lstrip(" \t\r\n,")
+        if stripped.startswith("]"):
+            return
+        if stripped:
+            try:
+                feature, end = decoder.raw_decode(stripped)
+                yield feature
+                buffer = stripped[end:]
+                continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        elif eof:
+            raise ValueError("Unterminated features array")
+        data = f.read(max(read_size, len(stripped)))  # Grow reads for very large features
+        eof = not data
+        buffer = stripped + data
+
+
+def read_geojson(f):
+    """Yield ('position', row) or ('trail', row) records from a GeoJSON export"""
+    for number, feature in enumerate(iter_features(f)):
+        geometry = feature.get("geometry") or {}
+        properties = feature.get("properties") or {}
+        map_value = properties.get("map")
+        if not map_value:
+            continue  # Positions are always stored per map
+        if geometry.get("type") == "Point":
+            x, y, z = (list(geometry["coordinates"]) + [0.0])[:3]
+            yield 'position', (float(properties.get("ts", 0.0)), map_value, float(x), float(y), float(z),
+                               properties.get("fmt"))
+        elif geometry.get("type") == "LineString":
+            timestamps = properties.get("timestamps") or [0.0] * len(geometry["coordinates"])
+            trail_id = properties.get("trail_id", f"feature-{number}")
+            for ts, coordinates in zip(timestamps, geometry["coordinates"]):
+                x, y, z = (list(coordinates) + [0.0])[:3]
+                yield 'trail', (trail_id, float(ts), map_value, float(x), float(y), float(z))
+
+
+def import_history(history, path, chunk_size=5000):
+    """Stream a GeoJSON / CSV file into the history; returns (positions, trail points) imported"""
+    trail_ids = {}  # id in the file -> fresh local id
+
+    def local_trail(row):
+        trail_id = trail_ids.get(row[0])
+        if trail_id is None:
+            trail_id = trail_ids[row[0]] = history.allocate_trail_id()
+        return (trail_id,) + row[1:]
+
+    positions, trail_points = [], []
+    imported = [0, 0]
+    with open_text(path, 'r') as f:
+        records = read_csv(f) if detect_format(path) == 'csv' else read_geojson(f)
+        for kind, row in records:
+            if kind == 'position':
+                positions.append(row)
+                if len(positions) >= chunk_size:
+                    imported[0] += history.insert_many(positions, chunk_size)
+                    positions = []
+            else:
+                trail_points.append(local_trail(row))
+                if len(trail_points) >= chunk_size:
+                    imported[1] += history.insert_trail_points(trail_points, chunk_size)
+                    trail_points = []
+    imported[0] += history.insert_many(positions, chunk_size)
+    imported[1] += history.insert_trail_points(trail_points, chunk_size)
+    return tuple(imported)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Export / import Isle Map Updater position history")
+    parser.add_argument("--db", help="History database (default: history_file from map_config.json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write positions or trails to .geojson/.csv (optionally .gz)")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--map", help="Only this map value")
+    export_parser.add_argument("--trail", action="store_true", help="Export simplified trails instead of positions")
+    export_parser.add_argument("--since", type=float, help="Start time (unix seconds)")
+    export_parser.add_argument("--until", type=float, help="End time (unix seconds)")
+
+    import_parser = commands.add_parser("import", help="Read a .geojson/.csv export into the history")
+    import_parser.add_argument("path")
+    args = parser.parse_args()
+
+    db_file = args.db
+    if not db_file:
+        from config_manager import ConfigManager
+        db_file = ConfigManager().get_setting('history_file') or 'position_history.db'
+
+    history = PositionHistory(db_file)
+    start = time.perf_counter()
+    try:
+        if args.command == "export":
+            count = export_history(history, args.path, args.map, args.trail, args.since, args.until)
+            summary = f"Exported {count} {'trails' if args.trail else 'positions'} to {args.path}"
+        else:
+            positions, trail_points = import_history(history, args.path)
+            count = positions + trail_points
+            summary = f"Imported {positions} positions and {trail_points} trail points from {args.path}"
+    finally:
+        history.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"[HISTORY] {summary} in {elapsed:.1f}s ({count / elapsed if elapsed else 0:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
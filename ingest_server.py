@@ -0,0 +1,416 @@
+"""
+Local ingestion endpoint for Isle Map Updater
+Lets overlay tools, bots and server scripts push positions instead of the
+clipboard. A small asyncio HTTP/1.1 + WebSocket server (standard library only)
+listens on localhost:
+
+    POST /position    body: raw Isle text (one position per line) or JSON
+    GET  /ws          WebSocket, every text message is one such body
+    GET  /status      ingestion counters and latency percentiles
+
+JSON may be a coordinate string, {"coords": "..."}, {"x": .., "y": .., "z": ..},
+a list of those, or {"positions": [...]}. Entries with a "player" (and optional
+"map") are shown as other players' markers instead of moving our own marker.
+
+Browsers send an Origin header with every cross-site POST and WebSocket
+handshake; those requests are refused unless the origin is allowed, so a web
+page cannot push positions to (or read /status from) the local server.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+MAX_HEADER_BYTES = 16 * 1024
+REASONS = {200: "OK", 101: "Switching Protocols", 400: "Bad Request", 401: "Unauthorized",
+           403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+           413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class PayloadError(ValueError):
+    """A body that is neither coordinate text nor the expected JSON"""
+
+
+def parse_payload(body, max_items=10_000):
+    """Split a request/message body into [(text, player, map_value), ...]"""
+    text = body.strip()
+    if not text:
+        return []
+    if text[0] in "{[":
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None  # e.g. "[DEBUG] ..." pasted as text - the parser skips it
+        if data is not None:
+            if isinstance(data, dict) and isinstance(data.get('positions'), list):
+                data = data['positions']
+            entries = data if isinstance(data, list) else [data]
+            if len(entries) > max_items:
+                raise PayloadError(f"More than {max_items} positions in one payload")
+            return [_json_entry(entry) for entry in entries]
+
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(lines) > max_items:
+        raise PayloadError(f"More than {max_items} positions in one payload")
+    return [(line, None, None) for line in lines]
+
+
+def _json_entry(entry):
+    if isinstance(entry, str):
+        return entry, None, None
+    if not isinstance(entry, dict):
+        raise PayloadError(f"Unsupported position entry: {entry!r}")
+    player, map_value = entry.get('player'), entry.get('map')
+    coords = entry.get('coords', entry.get('text'))
+    if isinstance(coords, str):
+        return coords, player, map_value
+    if coords is None and all(isinstance(entry.get(axis), (int, float)) for axis in "xyz"):
+        coords = (entry['x'], entry['y'], entry['z'])
+    if isinstance(coords, (list, tuple)) and len(coords) == 3:
+        # Through the parser like everything else, so all sources share one format
+        return ", ".join(f"{_coordinate(value):.3f}" for value in coords), player, map_value
+    raise PayloadError(f"Position entry without coordinates: {entry!r}")
+
+
+def _coordinate(value):
+    # bool is an int to Python, and json.loads accepts NaN and Infinity
+    if isinstance(value, bool):
+        raise PayloadError(f"Invalid coordinate: {value!r}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise PayloadError(f"Invalid coordinate: {value!r}") from None
+    if not math.isfinite(number):
+        raise PayloadError(f"Invalid coordinate: {value!r}")
+    return number
+
+
+def websocket_accept(key):
+    return base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode('ascii')).digest()).decode('ascii')
+
+
+def encode_frame(payload, opcode=0x1, mask=None):
+    """One final WebSocket frame (servers send unmasked frames; clients pass a 4-byte mask)"""
+    length = len(payload)
+    mask_bit = 0x80 if mask else 0
+    if length < 126:
+        header = bytes([0x80 | opcode, mask_bit | length])
+    elif length < 1 << 16:
+        header = bytes([0x80 | opcode, mask_bit | 126]) + length.to_bytes(2, 'big')
+    else:
+        header = bytes([0x80 | opcode, mask_bit | 127]) + length.to_bytes(8, 'big')
+    if mask:
+        return header + mask + _unmask(payload, mask)
+    return header + payload
+
+
+def _unmask(payload, mask):
+    # XOR as one big integer - much faster than a per-byte loop for large messages
+    repeated = (mask * (len(payload) // 4 + 1))[:len(payload)]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(len(payload), 'big')
+
+
+async def read_frame(reader, max_size):
+    """(fin, opcode, payload) of the next WebSocket frame"""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), 'big')
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), 'big')
+    if length > max_size:
+        raise PayloadError(f"WebSocket frame of {length} bytes")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    return bool(first & 0x80), first & 0x0F, _unmask(payload, mask) if mask else payload
+
+
+class IngestServer:
+    def __init__(self, handler, host="127.0.0.1", port=47980, token=None, allowed_origins=(),
+                 max_body=1024 * 1024, idle_timeout=30.0, metrics=None):
+        self.handler = handler            # handler(text, player, map_value, received_ns) -> result string
+        self.host = host
+        self.port = port                  # 0 picks a free port (see .port after start)
+        self.token = token                # Optional shared secret (Authorization: Bearer / ?token=)
+        self.allowed_origins = set(allowed_origins or ())  # Web pages allowed to connect (e.g. an overlay)
+        self.max_body = max_body
+        self.idle_timeout = idle_timeout  # Close keep-alive connections idle this long
+        self.metrics = metrics
+
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.executor = None              # Runs the handler off the event loop, one payload at a time
+        self.ready = threading.Event()
+        self.connections = 0
+        self.error = None
+        self.window_start = time.monotonic()
+        self.window_positions = 0
+        self.positions_per_s = 0.0
+
+    # --- lifecycle -----------------------------------------------------------
+
+    def start(self, timeout=5.0):
+        """Serve on a background thread; raises OSError if the port cannot be bound"""
+        if self.thread:
+            return
+        self.ready.clear()
+        self.thread = threading.Thread(target=self._run, name="ingest-server", daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout)
+        if self.error:
+            self.thread = None
+            raise self.error
+        print(f"[INGEST] Accepting positions on http://{self.host}:{self.port}/position")
+
+    def stop(self):
+        if self.loop and self.server:
+            self.loop.call_soon_threadsafe(self.server.close)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self.thread:
+            self.thread.join(2)
+        self.thread = None
+
+    def _run(self):
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-handler")
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self._serve_connection, self.host, self.port, limit=MAX_HEADER_BYTES))
+            self.port = self.server.sockets[0].getsockname()[1]
+        except OSError as e:
+            self.error = e
+            self.ready.set()
+            self.loop.close()
+            self.executor.shutdown(wait=False)
+            return
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+            self.executor.shutdown(wait=False)
+            self.server = None
+
+    # --- HTTP ----------------------------------------------------------------
+
+    async def _serve_connection(self, reader, writer):
+        self.connections += 1
+        self._gauge('ingest.connections', self.connections)
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 413, {"error": "Headers too large"}, keep_alive=False)
+                    return
+                received_ns = time.monotonic_ns()
+                start = time.perf_counter()
+
+                request_line, *header_lines = head.decode('latin-1').split("\r\n")
+                try:
+                    method, target, version = request_line.split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Bad request line"}, keep_alive=False)
+                    return
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                url = urllib.parse.urlsplit(target)
+                query = urllib.parse.parse_qs(url.query)
+                connection = headers.get('connection', '').lower()
+                keep_alive = 'close' not in connection if version == "HTTP/1.1" else 'keep-alive' in connection
+
+                if not self._origin_allowed(headers):
+                    self._count('ingest.rejected_origins')
+                    await self._respond(writer, 403, {"error": "Origin not allowed"}, keep_alive=False)
+                    return
+                if not self._authorized(headers, query):
+                    await self._respond(writer, 401, {"error": "Missing or wrong token"}, keep_alive=False)
+                    return
+
+                if url.path == "/ws" and headers.get('upgrade', '').lower() == "websocket":
+                    await self._serve_websocket(reader, writer, headers)
+                    return
+
+                if method == "POST" and url.path == "/position":
+                    if 'chunked' in headers.get('transfer-encoding', '').lower():
+                        await self._respond(writer, 411, {"error": "Send a Content-Length"}, keep_alive=False)
+                        return
+                    length = headers.get('content-length', '0')
+                    if not length.isdigit():
+                        await self._respond(writer, 400, {"error": "Bad Content-Length"}, keep_alive=False)
+                        return
+                    length = int(length)
+                    if length > self.max_body:
+                        await self._respond(writer, 413, {"error": "Body too large"}, keep_alive=False)
+                        return
+                    try:
+                        body = await reader.readexactly(length)
+                    except asyncio.IncompleteReadError:
+                        return
+                    status, result = await self._ingest_async(body, received_ns)
+                    self._count('ingest.requests')
+                elif method == "GET" and url.path == "/status":
+                    status, result = 200, self.status()
+                elif url.path in ("/position", "/status"):
+                    status, result = 405, {"error": f"{method} not allowed"}
+                else:
+                    status, result = 404, {"error": "Not found"}
+
+                await self._respond(writer, status, result, keep_alive)
+                if self.metrics and url.path == "/position":
+                    self.metrics.observe('ingest.request_ms', (time.perf_counter() - start) * 1000.0)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # Client went away / server shutting down
+        finally:
+            self.connections -= 1
+            self._gauge('ingest.connections', self.connections)
+            writer.close()
+
+    def _origin_allowed(self, headers):
+        """Tools and scripts send no Origin; a browser always does for cross-site requests"""
+        origin = headers.get('origin')
+        return origin is None or origin in self.allowed_origins
+
+    def _authorized(self, headers, query):
+        if not self.token:
+            return True
+        authorization = headers.get('authorization', '')
+        return authorization == f"Bearer {self.token}" or query.get('token', [None])[0] == self.token
+
+    async def _respond(self, writer, status, result, keep_alive=True):
+        body = json.dumps(result).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body)
+        await writer.drain()
+
+    async def _ingest_async(self, body, received_ns):
+        """_ingest on the handler thread - the handler takes the app's input lock and may be
+        slow for big batches, which must not stall other connections"""
+        return await self.loop.run_in_executor(self.executor, self._ingest, body, received_ns)
+
+    def _ingest(self, body, received_ns):
+        """(status, response) for one payload"""
+        try:
+            entries = parse_payload(body.decode('utf-8'))
+        except (UnicodeDecodeError, PayloadError) as e:
+            self._count('ingest.errors')
+            return 400, {"error": str(e)}
+
+        results = []
+        for text, player, map_value in entries:
+            try:
+                results.append(self.handler(text, player, map_value, received_ns))
+            except Exception as e:
+                print(f"[ERROR] Ingested position failed: {e}")
+                results.append('error')
+        self._count_positions(len(entries))
+        return 200, {"results": results, "accepted": sum(result in ('sent', 'tracked') for result in results)}
+
+    # --- WebSocket -----------------------------------------------------------
+
+    async def _serve_websocket(self, reader, writer, headers):
+        key = headers.get('sec-websocket-key')
+        if not key:
+            await self._respond(writer, 400, {"error": "Missing Sec-WebSocket-Key"}, keep_alive=False)
+            return
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\n"
+                      "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {websocket_accept(key)}\r\n\r\n").encode('latin-1'))
+        await writer.drain()
+        self._count('ingest.websockets')
+
+        fragments = []
+        while True:
+            try:
+                fin, opcode, payload = await asyncio.wait_for(read_frame(reader, self.max_body), self.idle_timeout)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                return
+            except PayloadError:
+                writer.write(encode_frame((1009).to_bytes(2, 'big'), opcode=0x8))  # Message too big
+                await writer.drain()
+                return
+
+            if opcode == 0x8:                       # Close - echo it and hang up
+                writer.write(encode_frame(payload[:2], opcode=0x8))
+                await writer.drain()
+                return
+            if opcode == 0x9:                       # Ping
+                writer.write(encode_frame(payload, opcode=0xA))
+                await writer.drain()
+                continue
+            if opcode == 0xA:                       # Unsolicited pong
+                continue
+            if opcode in (0x1, 0x2) or (opcode == 0x0 and fragments):
+                fragments.append(payload)
+            if not fin:
+                continue
+
+            received_ns = time.monotonic_ns()
+            start = time.perf_counter()
+            message, fragments = b"".join(fragments), []
+            _, result = await self._ingest_async(message, received_ns)
+            self._count('ingest.messages')
+            writer.write(encode_frame(json.dumps(result).encode('utf-8')))
+            await writer.drain()
+            if self.metrics:
+                self.metrics.observe('ingest.message_ms', (time.perf_counter() - start) * 1000.0)
+
+    # --- metrics -------------------------------------------------------------
+
+    def _count_positions(self, count):
+        # Throughput over ~1 s windows (event marks would saturate at thousands per second)
+        self.window_positions += count
+        now = time.monotonic()
+        elapsed = now - self.window_start
+        if elapsed >= 1.0:
+            self.positions_per_s = self.window_positions / elapsed
+            self.window_start, self.window_positions = now, 0
+            self._gauge('ingest.positions_per_s', self.positions_per_s)
+        if self.metrics:
+            self.metrics.increment('ingest.positions', count)
+
+    def _count(self, name):
+        if self.metrics:
+            self.metrics.increment(name)
+
+    def _gauge(self, name, value):
+        if self.metrics:
+            self.metrics.set_gauge(name, value)
+
+    def status(self):
+        if not self.metrics:
+            return {"connections": self.connections}
+        return {
+            "connections": self.connections,
+            "requests": self.metrics.get_counter('ingest.requests'),
+            "messages": self.metrics.get_counter('ingest.messages'),
+            "positions": self.metrics.get_counter('ingest.positions'),
+            "positions_per_s": self.positions_per_s,
+            "request_ms": self.metrics.get_histogram('ingest.request_ms'),
+            "message_ms": self.metrics.get_histogram('ingest.message_ms'),
+        }
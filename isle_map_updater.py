@@ -5,33 +5,181 @@ Simple coordinate tracker for The Isle
 Monitors clipboard for coordinates and updates vulnova map automatically.
 """
 
+import argparse
+import getpass
+import re
+import signal
 import time
 import threading
-import pyperclip
-import psutil
 
 # Import our modules
 from config_manager import ConfigManager
 from coordinate_parser import CoordinateParser
 from browser_manager import BrowserManager
-from gui_manager import GUIManager
+from metrics_registry import MetricsRegistry
+from browser_watchdog import BrowserWatchdog
+from movement_filter import MovementFilter
+from map_bounds import MapBoundsTable
+from latency_tracer import LatencyTracer
+from position_history import PositionHistory
+from poi_database import PoiDatabase
+from map_projection import MapProjection
+from lan_share import LanShare
+from multi_marker import MultiMarkerTracker
+from ingest_server import IngestServer
+from log_tailer import LogTailer
+from sink_pipeline import SinkPipeline, PositionUpdate, LATEST_WINS, DROP_OLDEST
+from profiling_hooks import ProfilingSession, profiling_requested, PROFILE_ENV_VAR
 
 
 class IsleMapUpdater:
-    def __init__(self):
+    def __init__(self, headless=False, config_manager=None, clipboard=None):
         self.running = False
+        self.headless = headless  # No tkinter at all (CLI / daemon mode)
+        self.stop_event = threading.Event()
         self.last_coordinates = ""
+        self.latest_raw_coords = None  # Last parsed position, replayed after browser recovery
+        self.latest_coords = None      # Same position as numbers
         self.test_mode = False
+        self.input_lock = threading.RLock()  # Parser and movement filter are shared by all input sources
+        self.clipboard = clipboard     # Backend with paste() (None = pyperclip, loaded when monitoring starts)
+        self.clipboard_interval = 0.3  # Check every 300ms for faster response
+        self.last_read_start_ns = None  # Start of the previous clipboard read (bounds detection latency)
+        self.recorder = None           # SessionRecorder while clipboard_record_file is set
+        self.profiling_session = None  # ProfilingSession, started with monitoring (--profile)
         
         # Initialize managers
-        self.config_manager = ConfigManager()
+        self.metrics = MetricsRegistry()
+        self.config_manager = config_manager or ConfigManager()
         self.coordinate_parser = CoordinateParser()
         self.browser_manager = BrowserManager()
-        self.gui_manager = GUIManager(self)
+        self.projection = MapProjection(self.config_manager.get_setting('map_calibration_file'))
+        if headless:
+            self.gui_manager = None
+            self.renderer = None
+        else:
+            from gui_manager import GUIManager  # tkinter is only loaded for the GUI
+            from local_renderer import LocalMapRenderer
+            self.gui_manager = GUIManager(self)
+            self.renderer = LocalMapRenderer(
+                self.config_manager, self.projection,
+                image_dir=self.config_manager.get_setting('map_image_dir'),
+                trail_length=self.config_manager.get_setting('local_trail_length'),
+                tile_zoom=self.config_manager.get_setting('local_map_zoom'),
+                metrics=self.metrics
+            )
+        self.watchdog = BrowserWatchdog(self)
+        self.map_bounds = MapBoundsTable()
+        self.tracer = LatencyTracer(self.metrics, log_file=self.config_manager.get_setting('trace_log_file'))
+        self.browser_manager.ack_selector = self.config_manager.get_setting('trace_ack_selector')
+        history_file = self.config_manager.get_setting('history_file')
+        self.history = PositionHistory(
+            history_file,
+            store_raw=self.config_manager.get_setting('history_raw_points'),
+            trail_tolerance=self.config_manager.get_setting('trail_tolerance'),
+            metrics=self.metrics
+        ) if history_file else None
+        poi_file = self.config_manager.get_setting('poi_file')
+        self.pois = PoiDatabase(poi_file) if poi_file else None
+        self.movement_filter = MovementFilter(
+            threshold=self.config_manager.get_setting('movement_threshold'),
+            ignore_altitude=self.config_manager.get_setting('movement_ignore_altitude'),
+            metrics=self.metrics
+        )
+        self.lan = LanShare(
+            self.config_manager.get_setting('player_name') or getpass.getuser(),
+            group=self.config_manager.get_setting('lan_group'),
+            port=self.config_manager.get_setting('lan_port'),
+            max_rate=self.config_manager.get_setting('lan_max_rate'),
+            metrics=self.metrics
+        ) if self.config_manager.get_setting('lan_share') else None
+        self.sinks = SinkPipeline(self.metrics)
+        self.register_sinks()
+        
+        # Other players (tribe members, ...) drawn as extra markers at a fixed frame rate
+        self.markers = MultiMarkerTracker(
+            self.config_manager, self.projection,
+            frame_rate=self.config_manager.get_setting('marker_frame_rate'),
+            metrics=self.metrics
+        )
+        self.browser_manager.marker_overlay_selector = self.config_manager.get_setting('marker_overlay_selector')
+        self.register_marker_outputs()
+        if self.lan:
+            self.lan.on_peer_update = self.track_peer
+        
+        # Positions pushed by other tools over HTTP / WebSocket (localhost only)
+        ingest_port = self.config_manager.get_setting('ingest_port')
+        self.ingest = IngestServer(
+            self.ingest_position, port=ingest_port,
+            token=self.config_manager.get_setting('ingest_token'),
+            allowed_origins=self.config_manager.get_setting('ingest_allowed_origins'),
+            metrics=self.metrics
+        ) if ingest_port else None
+        
+        # Positions written to a game / server log, read as they are appended
+        self.log_tailer = None
+        self.log_pattern = None
+        log_file = self.config_manager.get_setting('log_tail_file')
+        if log_file:
+            try:
+                pattern = self.config_manager.get_setting('log_tail_pattern')
+                self.log_pattern = re.compile(pattern) if pattern else None
+                self.log_tailer = LogTailer(
+                    log_file, self.handle_log_line,
+                    offsets_file=self.config_manager.get_setting('log_offsets_file'),
+                    metrics=self.metrics
+                )
+            except re.error as e:
+                print(f"[ERROR] Invalid log_tail_pattern - not following {log_file}: {e}")
+    
+    def register_sinks(self):
+        """Consumers of accepted positions, each with its own queue and drop policy"""
+        # Only the newest position matters for the marker - never queue stale ones behind a slow page
+        self.sinks.register('browser', self.browser_sink, policy=LATEST_WINS)
+        if self.history:
+            self.sinks.register('history', self.history_sink, policy=DROP_OLDEST, maxsize=10_000)
+        if self.renderer:
+            self.sinks.register('renderer', lambda update: self.renderer.update_position(update.coords),
+                                policy=DROP_OLDEST, maxsize=1_000)
+        if self.pois:
+            self.sinks.register('poi', lambda update: self.show_nearby_pois(update.map_value, update.coords),
+                                policy=LATEST_WINS)
+        if self.lan:
+            # Rate-limited inside publish(); positions arriving meanwhile are coalesced
+            self.sinks.register('lan', lambda update: self.lan.publish(update.map_value, update.coords),
+                                policy=LATEST_WINS)
+    
+    def register_marker_outputs(self):
+        """Views that show other players, each diffed and redrawn on its own frame thread"""
+        if self.renderer:
+            self.markers.add_output('renderer', self.renderer.update_markers)
+        if self.browser_manager.marker_overlay_selector:
+            self.markers.add_output('browser', self.browser_markers)
+    
+    def browser_markers(self, frame):
+        """Apply a marker frame in the browser (positions as fractions of the calibrated image)"""
+        size = self.projection.image_size(frame.map_value)
+        if not size:
+            return False
+        width, height = size
+        markers = {marker_id: (px / width, py / height, label)
+                   for marker_id, (px, py, label) in frame.changes.items()}
+        # A count mismatch means the page lost the layer (reload, other tab) - resend everything
+        return self.browser_manager.update_markers(markers, frame.removed, frame.full) == frame.count
+    
+    def track_peer(self, peer):
+        """Show a tribe member as a marker (LAN receive thread)"""
+        self.markers.set_position(f"lan-{peer.sender_id}", peer.name, peer.map_value, peer.coords)
+    
+    def log_to_gui(self, message):
+        """Forward a status line to the GUI (no-op in headless mode)"""
+        if self.gui_manager:
+            self.gui_manager.log_to_gui(message)
     
     def is_the_isle_running(self):
         """Check if The Isle game is currently running"""
         try:
+            import psutil  # Only needed when process watching is used
             for proc in psutil.process_iter(['pid', 'name']):
                 if proc.info['name'] and 'isle' in proc.info['name'].lower():
                     return True
@@ -47,40 +195,14 @@ class IsleMapUpdater:
         print("[INFO] Press Ctrl+C in terminal to stop")
         print("[MONITOR] Waiting for clipboard changes...")
         
+        if self.clipboard is None:
+            import pyperclip  # Deferred so the window appears before clipboard backends load
+            self.clipboard = pyperclip
+        
         while self.running:
             try:
-                # Get current clipboard content
-                current_clipboard = pyperclip.paste()
-                
-                # Check if clipboard changed and contains potential coordinates
-                if current_clipboard != self.last_coordinates and current_clipboard.strip():
-                    raw_coords = self.coordinate_parser.parse_coordinates(current_clipboard)
-                    
-                    if raw_coords is not None:
-                        msg = f"[FOUND] Isle coordinates: {raw_coords}"
-                        print(msg)
-                        self.gui_manager.log_to_gui(msg)
-                        
-                        if self.browser_manager.driver:
-                            success = self.browser_manager.update_map_position(raw_coords)
-                            if success:
-                                success_msg = "[OK] Map updated successfully!"
-                                print(success_msg)
-                                self.gui_manager.log_to_gui(success_msg)
-                            else:
-                                error_msg = "[WARNING] Map update failed"
-                                print(error_msg)
-                                self.gui_manager.log_to_gui(error_msg)
-                        
-                        self.last_coordinates = current_clipboard
-                    else:
-                        # Only show this for non-empty clipboard that doesn't match patterns
-                        if len(current_clipboard.strip()) > 0 and len(current_clipboard) < 200:
-                            info_msg = f"[INFO] Clipboard: '{current_clipboard[:30]}...'"
-                            print(info_msg)
-                        self.last_coordinates = current_clipboard
-                
-                time.sleep(0.3)  # Check every 300ms for faster response
+                self.poll_clipboard()
+                time.sleep(self.clipboard_interval)
                 
             except KeyboardInterrupt:
                 break
@@ -88,14 +210,226 @@ class IsleMapUpdater:
                 print(f"[ERROR] Monitoring error: {e}")
                 time.sleep(1)
     
+    def poll_clipboard(self):
+        """Read the clipboard once and handle a change (monitor thread, or a session replay).
+        Returns (result, coordinates sent or None) for a change, None if nothing changed"""
+        # Get current clipboard content
+        read_start_ns = time.monotonic_ns()
+        current_clipboard = self.clipboard.paste()
+        read_done_ns = time.monotonic_ns()
+        self.metrics.observe('clipboard.read_ms', (read_done_ns - read_start_ns) / 1_000_000.0)
+        previous_read_start_ns, self.last_read_start_ns = self.last_read_start_ns, read_start_ns
+        
+        # Check if clipboard changed and contains potential coordinates
+        if current_clipboard == self.last_coordinates or not current_clipboard.strip():
+            return None
+        if previous_read_start_ns is not None:
+            # The change happened after the previous read began: poll interval + processing + read at most
+            self.metrics.observe('clipboard.detect_ms', (read_done_ns - previous_read_start_ns) / 1_000_000.0)
+        with self.input_lock:  # Other sources must not replace latest_raw_coords in between
+            result = self.handle_input(current_clipboard, 'clipboard', read_done_ns)
+            sent = self.latest_raw_coords if result == 'sent' else None
+        # Only show this for non-empty clipboard that doesn't match patterns
+        if result == 'no_match' and len(current_clipboard) < 200:
+            info_msg = f"[INFO] Clipboard: '{current_clipboard[:30]}...'"
+            print(info_msg)
+        self.last_coordinates = current_clipboard
+        if self.recorder:
+            self.recorder.record(current_clipboard, result, sent, read_done_ns)
+        return result, sent
+    
+    def handle_input(self, text, source='clipboard', read_done_ns=None):
+        """Run one piece of input text through the update path (any input thread).
+        Returns 'sent', 'out_of_bounds', 'unchanged' or 'no_match'"""
+        with self.input_lock:
+            self.metrics.increment(f'input.{source}')
+            parse_start = time.perf_counter()
+            raw_coords = self.coordinate_parser.parse_coordinates(text)
+            parse_done_ns = time.monotonic_ns()
+            self.metrics.observe('parse.ms', (time.perf_counter() - parse_start) * 1000.0)
+            if raw_coords is None:
+                return 'no_match'
+            coords = self.coordinate_parser.to_numeric(raw_coords)
+            selected_map = self.config_manager.get_selected_map()
+            
+            if not self.map_bounds.contains(selected_map, coords):
+                if not self.map_bounds.observe_outlier(
+                        selected_map, coords,
+                        margin=self.config_manager.get_setting('bounds_margin'),
+                        confirm_distance=self.config_manager.get_setting('bounds_confirm_distance')):
+                    # Three numbers, but not a position on this map (dates, versions, ...)
+                    print(f"[SKIP] Outside bounds of map '{selected_map}': {raw_coords}")
+                    self.metrics.increment('updates.out_of_bounds')
+                    return 'out_of_bounds'
+                # Confirmed by a second position nearby - the player left the area seen so far
+                self.map_bounds.save()
+                self.log_to_gui(f"[BOUNDS] Bounds of map '{selected_map}' widened to {raw_coords}")
+            if not self.movement_filter.should_update(coords):
+                # Same spot (or just formatted differently) - marker would not move
+                print(f"[SKIP] Position barely changed ({self.movement_filter.suppressed} suppressed): {raw_coords}")
+                return 'unchanged'
+            
+            msg = f"[FOUND] Isle coordinates: {raw_coords}"
+            print(msg)
+            self.log_to_gui(msg)
+            self.latest_raw_coords = raw_coords
+            self.latest_coords = coords
+            
+            trace = self.tracer.start('clipboard_read' if source == 'clipboard' else 'receive', read_done_ns)
+            trace.coordinates = raw_coords
+            trace.mark('parse', parse_done_ns)
+            self.sinks.dispatch(PositionUpdate(
+                selected_map, raw_coords, coords, self.coordinate_parser.last_format, trace))
+        return 'sent'
+    
+    def ingest_position(self, text, player=None, map_value=None, received_ns=None, source='ingest'):
+        """One position pushed to the ingestion server (server thread). Positions with a
+        player name become markers; the rest move our own marker like the clipboard does"""
+        if not player:
+            return self.handle_input(text, source, received_ns)
+        with self.input_lock:
+            raw_coords = self.coordinate_parser.parse_coordinates(text)
+        if raw_coords is None:
+            return 'no_match'
+        self.markers.set_position(f"player-{player}", player, map_value or self.config_manager.get_selected_map(),
+                                  self.coordinate_parser.to_numeric(raw_coords))
+        return 'tracked'
+    
+    def handle_log_line(self, line):
+        """One new line of the followed log (tailer thread). With log_tail_pattern, only
+        matching lines count; its 'coords' and 'player' groups pick out the position and name"""
+        received_ns = time.monotonic_ns()
+        text, player = line, None
+        if self.log_pattern:
+            match = self.log_pattern.search(line)
+            if not match:
+                return 'no_match'
+            groups = match.groupdict()
+            text = groups.get('coords') or match.group(0)
+            player = groups.get('player')
+        return self.ingest_position(text, player, received_ns=received_ns, source='logtail')
+    
+    def browser_sink(self, update):
+        """Move the vulnona marker (browser sink worker thread)"""
+        if self.watchdog.recovering:
+            print("[WATCHDOG] Browser is recovering - position will be replayed")
+            return
+        if not self.browser_manager.driver:
+            return
+        
+        update_start = time.perf_counter()
+        success = self.browser_manager.update_map_position(update.raw_coords, update.trace)
+        self.metrics.observe('browser.update_ms', (time.perf_counter() - update_start) * 1000.0)
+        if success:
+            self.tracer.finish(update.trace)
+            self.metrics.mark('updates.sent')
+            self.watchdog.report_success()
+            self.map_bounds.observe(update.map_value, update.coords)
+            if self.config_manager.get_setting('bounds_auto_calibrate') and self.map_bounds.auto_calibrate(
+                    update.map_value,
+                    margin=self.config_manager.get_setting('bounds_margin'),
+                    min_samples=self.config_manager.get_setting('bounds_calibration_samples')):
+                self.map_bounds.save()
+                self.log_to_gui(f"[BOUNDS] Bounds of map '{update.map_value}' calibrated from your positions")
+            success_msg = "[OK] Map updated successfully!"
+            print(success_msg)
+            self.log_to_gui(success_msg)
+        else:
+            self.movement_filter.rollback(update.coords)
+            self.watchdog.report_failure()
+            error_msg = "[WARNING] Map update failed"
+            print(error_msg)
+            self.log_to_gui(error_msg)
+    
+    def history_sink(self, update):
+        """Record the position (history sink worker thread)"""
+        self.history.record(update.map_value, update.coords, update.fmt)
+    
+    def show_nearby_pois(self, map_value, coords):
+        """Look up the closest points of interest (poi sink worker thread)"""
+        if not self.pois:
+            return
+        lookup_start = time.perf_counter()
+        nearest = self.pois.nearest(map_value, coords[0], coords[1],
+                                    k=self.config_manager.get_setting('poi_nearest_count'))
+        self.metrics.observe('poi.lookup_ms', (time.perf_counter() - lookup_start) * 1000.0)
+        if not nearest:
+            return
+        
+        text = ", ".join(f"{poi.get('name', poi['type'])} ({poi['type']}) {distance:,.0f}"
+                         for distance, poi in nearest)
+        if self.gui_manager:
+            self.gui_manager.show_nearby(text)
+        else:
+            print(f"[POI] Nearby: {text}")
+    
     def start_monitoring(self):
         """Start coordinate monitoring"""
-        if not self.running and self.browser_manager.driver and self.config_manager.get_selected_map():
+        browser_ready = self.browser_manager.driver or self.headless or (self.renderer and self.renderer.canvas)
+        if not self.running and browser_ready and self.config_manager.get_selected_map():
             self.running = True
-            self.gui_manager.log_to_gui("Starting coordinate monitoring...")
-            self.gui_manager.log_to_gui("Copy Isle coordinates to clipboard!")
-            monitor_thread = threading.Thread(target=self.monitor_clipboard, daemon=True)
-            monitor_thread.start()
+            if self.history:
+                self.history.start()
+            if self.lan:
+                try:
+                    self.lan.start()
+                except OSError as e:
+                    print(f"[LAN] Sharing unavailable: {e}")
+                    self.lan.stop()
+            self.sinks.start()
+            self.markers.start()
+            if self.ingest:
+                try:
+                    self.ingest.start()
+                except OSError as e:
+                    print(f"[INGEST] Server unavailable: {e}")
+            self.log_to_gui("Starting coordinate monitoring...")
+            if self.log_tailer:
+                self.log_tailer.start()
+                self.log_to_gui(f"Following log: {self.log_tailer.path}")
+            if self.config_manager.get_setting('clipboard_input'):
+                self.log_to_gui("Copy Isle coordinates to clipboard!")
+                self.start_recording()
+                monitor_thread = threading.Thread(target=self.monitor_clipboard, daemon=True)
+                monitor_thread.start()
+            self.watchdog.start()
+            threading.Thread(target=self.sample_browser_process, daemon=True).start()
+            if self.profiling_session:
+                self.profiling_session.start()  # The window covers monitoring, not idle setup time
+    
+    def start_recording(self):
+        """Record clipboard changes for later replay when clipboard_record_file is set"""
+        record_file = self.config_manager.get_setting('clipboard_record_file')
+        if not record_file or self.recorder:
+            return
+        from session_replay import SessionRecorder  # Only needed while recording
+        path = time.strftime(record_file)  # e.g. sessions/%Y%m%d-%H%M%S.jsonl.gz - one file per run
+        try:
+            self.recorder = SessionRecorder(
+                path, self.config_manager.get_selected_map(),
+                settings={key: self.config_manager.get_setting(key)
+                          for key in ('movement_threshold', 'movement_ignore_altitude')},
+                redact=self.config_manager.get_setting('clipboard_record_redact')
+            )
+            self.log_to_gui(f"Recording clipboard session: {path}")
+        except OSError as e:
+            print(f"[ERROR] Cannot record clipboard session to {path}: {e}")
+    
+    def sample_browser_process(self, interval=1.0):
+        """Publish the browser's RSS and CPU as gauges while monitoring"""
+        while self.running:
+            stats = self.browser_manager.get_process_stats() if self.browser_manager.driver else None
+            self.metrics.set_gauge('browser.rss_mb', stats['rss_mb'] if stats else None)
+            self.metrics.set_gauge('browser.cpu_percent', stats['cpu_percent'] if stats else None)
+            time.sleep(interval)
+    
+    def replay_latest_coordinates(self):
+        """Send the most recent position again (after the browser was recovered)"""
+        if self.latest_raw_coords and self.browser_manager.driver:
+            if self.browser_manager.update_map_position(self.latest_raw_coords):
+                msg = f"[WATCHDOG] Replayed latest position: {self.latest_raw_coords}"
+                print(msg)
+                self.log_to_gui(msg)
     
     def start(self):
         """Start the map updater with GUI"""
@@ -103,18 +437,73 @@ class IsleMapUpdater:
         self.gui_manager.create_gui()
         
         # Initial status
-        self.gui_manager.log_to_gui("Isle Map Updater Ready!")
-        self.gui_manager.log_to_gui("Click 'Setup Browser & Load Maps' to begin")
+        self.log_to_gui("Isle Map Updater Ready!")
+        self.log_to_gui("Click 'Setup Browser & Load Maps' to begin")
         selected_map = self.config_manager.get_selected_map()
         if selected_map:
-            self.gui_manager.log_to_gui(f"Will restore saved map: {selected_map}")
+            self.log_to_gui(f"Will restore saved map: {selected_map}")
         
         # Start GUI (blocks until closed)
         self.gui_manager.start_mainloop()
     
+    def run_headless(self, map_value=None, use_browser=True):
+        """Run the monitoring pipeline without a GUI until SIGINT/SIGTERM"""
+        map_value = map_value or self.config_manager.get_selected_map()
+        if not map_value:
+            print("[ERROR] No map given - use --map or save a default map in the GUI first")
+            return False
+        
+        # Handle Ctrl+C / service stop for a clean shutdown
+        def request_stop(signum, frame):
+            print(f"[STOP] Received signal {signum}, shutting down...")
+            self.stop_event.set()
+        
+        for signal_name in ("SIGINT", "SIGTERM", "SIGBREAK"):
+            if hasattr(signal, signal_name):
+                signal.signal(getattr(signal, signal_name), request_stop)
+        
+        if use_browser:
+            if not self.browser_manager.setup_browser():
+                print("[ERROR] Browser setup failed")
+                return False
+            self.map_bounds.refresh(self.browser_manager.get_available_maps())
+            if not self.browser_manager.select_map(map_value):
+                print(f"[ERROR] Could not select map: {map_value}")
+                self.stop()
+                return False
+        
+        # Use the map for this run without overwriting the saved default
+        self.config_manager.selected_map = map_value
+        print(f"[HEADLESS] Tracking on map: {map_value}")
+        self.start_monitoring()
+        
+        # Short waits so signals are handled promptly on every platform
+        while not self.stop_event.wait(0.5):
+            pass
+        
+        self.stop()
+        return True
+    
     def stop(self):
         """Stop the map updater"""
         self.running = False
+        self.stop_event.set()
+        self.watchdog.stop()
+        if self.ingest:
+            self.ingest.stop()
+        if self.log_tailer:
+            self.log_tailer.stop()
+        self.sinks.stop()
+        self.markers.stop()
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+        if self.lan:
+            self.lan.stop()
+        self.map_bounds.save()
+        if self.history:
+            self.history.close()
+            self.history = None
         
         # Proper cleanup of browser resources
         self.browser_manager.stop()
@@ -124,16 +513,44 @@ class IsleMapUpdater:
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Isle Map Updater")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Profile monitor, parser and browser calls (or set {PROFILE_ENV_VAR}=1)")
+    parser.add_argument("--profile-duration", type=float, default=60.0,
+                        help="Length of the profiling window in seconds")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run without the GUI (CLI / daemon mode, stop with Ctrl+C or SIGTERM)")
+    parser.add_argument("--map", help="Map value to track in headless mode (default: saved map)")
+    parser.add_argument("--no-browser", action="store_true",
+                        help="Headless mode without Chrome (parse and record only)")
+    args = parser.parse_args()
+    
     print("Isle Map Updater - Starting...")
     
+    profiling_session = None
     try:
-        updater = IsleMapUpdater()
-        updater.start()
+        updater = IsleMapUpdater(headless=args.headless)
+        
+        if args.profile or profiling_requested([]):
+            profiling_session = ProfilingSession(duration=args.profile_duration)
+            profiling_session.instrument(updater, ['monitor_clipboard'], mode='sample')
+            profiling_session.instrument(updater.coordinate_parser, ['parse_coordinates'])
+            profiling_session.instrument(updater.browser_manager, [
+                'setup_browser', 'get_available_maps', 'select_map', 'update_map_position'
+            ])
+            updater.profiling_session = profiling_session
+        
+        if args.headless:
+            updater.run_headless(args.map, use_browser=not args.no_browser)
+        else:
+            updater.start()
     except KeyboardInterrupt:
         print("\\n[STOP] Interrupted by user")
     except Exception as e:
         print(f"[ERROR] Unexpected error: {e}")
     finally:
+        if profiling_session:
+            profiling_session.stop()
         print("[EXIT] Isle Map Updater terminated")
 
 
@@ -0,0 +1,247 @@
+"""
+LAN position sharing for Isle Map Updater
+Every instance publishes its position to a UDP multicast group and listens
+for tribe members on the same group. Packets are tiny binary structs: a
+keyframe with name, map and absolute position now and then, and otherwise
+a 16-byte delta in centi-units, sent at most max_rate times per second.
+"""
+
+import random
+import socket
+import struct
+import threading
+import time
+
+
+MAGIC = b"IM"
+VERSION = 1
+KEYFRAME = 0
+DELTA = 1
+
+HEADER = struct.Struct("<2sBBIH")     # magic, version, kind, sender id, sequence
+KEYFRAME_BODY = struct.Struct("<diii")  # timestamp, x, y, z (centi-units)
+DELTA_BODY = struct.Struct("<hhh")      # dx, dy, dz (centi-units)
+DELTA_LIMIT = 32767
+
+
+def to_centi(coords):
+    return tuple(int(round(value * 100)) for value in coords)
+
+
+def encode_keyframe(sender_id, sequence, name, map_value, timestamp, centi):
+    name_bytes = name.encode('utf-8')[:64]
+    map_bytes = map_value.encode('utf-8')[:64]
+    return (HEADER.pack(MAGIC, VERSION, KEYFRAME, sender_id, sequence)
+            + bytes([len(name_bytes)]) + name_bytes + bytes([len(map_bytes)]) + map_bytes
+            + KEYFRAME_BODY.pack(timestamp, *centi))
+
+
+def encode_delta(sender_id, sequence, delta):
+    return HEADER.pack(MAGIC, VERSION, DELTA, sender_id, sequence) + DELTA_BODY.pack(*delta)
+
+
+def decode(packet):
+    """(kind, sender_id, sequence, fields) or None for foreign/broken packets.
+    fields is (name, map, timestamp, centi) for keyframes and (dx, dy, dz) for deltas"""
+    try:
+        magic, version, kind, sender_id, sequence = HEADER.unpack_from(packet, 0)
+        if magic != MAGIC or version != VERSION:
+            return None
+        offset = HEADER.size
+        if kind == DELTA:
+            return kind, sender_id, sequence, DELTA_BODY.unpack_from(packet, offset)
+        if kind != KEYFRAME:
+            return None
+        name_length = packet[offset]
+        name = packet[offset + 1:offset + 1 + name_length].decode('utf-8', 'replace')
+        offset += 1 + name_length
+        map_length = packet[offset]
+        map_value = packet[offset + 1:offset + 1 + map_length].decode('utf-8', 'replace')
+        offset += 1 + map_length
+        timestamp, x, y, z = KEYFRAME_BODY.unpack_from(packet, offset)
+        return kind, sender_id, sequence, (name, map_value, timestamp, (x, y, z))
+    except (struct.error, IndexError):
+        return None
+
+
+class Peer:
+    """Last known state of one tribe member"""
+
+    __slots__ = ('sender_id', 'name', 'map_value', 'centi', 'synced', 'sequence', 'last_seen')
+
+    def __init__(self, sender_id):
+        self.sender_id = sender_id
+        self.name = None
+        self.map_value = None
+        self.centi = None       # Reconstructed position (centi-units), None until a keyframe arrives
+        self.synced = False     # False after a lost packet: deltas are ignored until the next keyframe
+        self.sequence = None
+        self.last_seen = 0.0
+
+    @property
+    def coords(self):
+        return tuple(value / 100.0 for value in self.centi) if self.centi else None
+
+
+class LanShare:
+    def __init__(self, player_name, group="239.255.42.99", port=47999, max_rate=5.0,
+                 keyframe_interval=5.0, peer_timeout=30.0, metrics=None):
+        self.player_name = player_name
+        self.group = group
+        self.port = port
+        self.max_rate = max_rate                    # Packets per second at most
+        self.keyframe_interval = keyframe_interval  # Full position (also a heartbeat) at least this often
+        self.peer_timeout = peer_timeout            # Forget members not heard from for this long
+        self.metrics = metrics
+
+        self.sender_id = random.getrandbits(32)
+        self.sequence = 0
+        self.sent_map = None
+        self.sent_centi = None      # Position as peers reconstruct it
+        self.last_send = 0.0
+        self.last_keyframe = 0.0
+        self.send_lock = threading.Lock()
+
+        self.peers = {}             # sender id -> Peer
+        self.peers_lock = threading.Lock()
+        self.on_peer_update = None  # Optional callback(peer) from the receive thread
+
+        self.running = False
+        self.send_socket = None
+        self.receive_socket = None
+        self.receive_thread = None
+
+    # --- sockets -------------------------------------------------------------
+
+    def start(self):
+        if self.running:
+            return
+        self.send_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.send_socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)   # Stay on the LAN
+        self.send_socket.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)  # Instances on this PC
+
+        self.receive_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.receive_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            self.receive_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self.receive_socket.bind(("", self.port))
+        membership = struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton("0.0.0.0"))
+        self.receive_socket.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        self.receive_socket.settimeout(0.5)
+
+        self.running = True
+        self.receive_thread = threading.Thread(target=self._receive_loop, name="lan-share", daemon=True)
+        self.receive_thread.start()
+        print(f"[LAN] Sharing as '{self.player_name}' on {self.group}:{self.port}")
+
+    def stop(self):
+        self.running = False
+        if self.receive_thread:
+            self.receive_thread.join(2)
+        for sock in (self.send_socket, self.receive_socket):
+            if sock:
+                sock.close()
+        self.send_socket = self.receive_socket = None
+
+    # --- publishing ----------------------------------------------------------
+
+    def publish(self, map_value, coords):
+        """Send our position (rate-limited; sink worker thread). Blocks at most 1/max_rate
+        seconds, during which the latest-wins sink queue coalesces newer positions."""
+        if not self.running or not map_value or coords is None:
+            return False
+        wait = self.last_send + 1.0 / self.max_rate - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        return self._send(map_value, to_centi(coords))
+
+    def _send(self, map_value, centi, force_keyframe=False):
+        with self.send_lock:
+            if not self.send_socket:
+                return False
+            now = time.monotonic()
+            delta = None
+            if not force_keyframe and map_value == self.sent_map and self.sent_centi is not None \
+                    and now - self.last_keyframe < self.keyframe_interval:
+                delta = tuple(new - old for new, old in zip(centi, self.sent_centi))
+                if max(abs(value) for value in delta) > DELTA_LIMIT:
+                    delta = None
+
+            self.sequence = (self.sequence + 1) & 0xFFFF
+            if delta is None:
+                packet = encode_keyframe(self.sender_id, self.sequence, self.player_name, map_value, time.time(), centi)
+                self.last_keyframe = now
+                kind = 'keyframes'
+            else:
+                packet = encode_delta(self.sender_id, self.sequence, delta)
+                kind = 'deltas'
+            try:
+                self.send_socket.sendto(packet, (self.group, self.port))
+            except OSError as e:
+                print(f"[LAN] Send failed: {e}")
+                return False
+
+            self.sent_map = map_value
+            self.sent_centi = centi
+            self.last_send = now
+        if self.metrics:
+            self.metrics.increment(f'lan.{kind}')
+            self.metrics.increment('lan.bytes_sent', len(packet))
+        return True
+
+    # --- receiving -----------------------------------------------------------
+
+    def _receive_loop(self):
+        while self.running:
+            # Heartbeat so peers keep showing us while we stand still
+            if self.sent_centi is not None and time.monotonic() - self.last_keyframe >= self.keyframe_interval:
+                self._send(self.sent_map, self.sent_centi, force_keyframe=True)
+            try:
+                packet, _ = self.receive_socket.recvfrom(512)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.handle_packet(packet)
+
+    def handle_packet(self, packet):
+        """Apply one received packet; returns the updated Peer or None"""
+        decoded = decode(packet)
+        if decoded is None:
+            return None
+        kind, sender_id, sequence, fields = decoded
+        if sender_id == self.sender_id:
+            return None
+        if self.metrics:
+            self.metrics.increment('lan.packets_received')
+
+        with self.peers_lock:
+            peer = self.peers.get(sender_id)
+            if peer is None:
+                peer = self.peers[sender_id] = Peer(sender_id)
+            joined = peer.name is None and kind == KEYFRAME
+            if kind == KEYFRAME:
+                peer.name, peer.map_value, _, peer.centi = fields
+                peer.synced = True
+            elif peer.synced and peer.sequence == (sequence - 1) & 0xFFFF:
+                peer.centi = tuple(old + change for old, change in zip(peer.centi, fields))
+            else:
+                # Lost a packet - keep the last good position until the next keyframe
+                peer.synced = False
+            peer.sequence = sequence
+            peer.last_seen = time.monotonic()
+
+        if joined:
+            print(f"[LAN] {peer.name} joined on map '{peer.map_value}'")
+        if peer.centi is not None and self.on_peer_update:
+            self.on_peer_update(peer)
+        return peer
+
+    def get_peers(self, map_value=None):
+        """Members heard from recently with a known position, optionally on one map"""
+        cutoff = time.monotonic() - self.peer_timeout
+        with self.peers_lock:
+            for sender_id in [sid for sid, peer in self.peers.items() if peer.last_seen < cutoff]:
+                del self.peers[sender_id]
+            return [peer for peer in self.peers.values()
+                    if peer.centi is not None and (map_value is None or peer.map_value == map_value)]
@@ -0,0 +1,83 @@
+"""
+End-to-end latency tracing for Isle Map Updater
+Follows each detected coordinate from clipboard read (or receipt from another
+input source) to confirmed map update
+"""
+
+import itertools
+import json
+import threading
+import time
+
+
+# Pipeline stages in the order they happen ('receive' replaces 'clipboard_read'
+# for positions pushed by other input sources)
+STAGES = ('receive', 'clipboard_read', 'parse', 'enqueue', 'driver_start', 'driver_end', 'page_ack')
+
+
+class Trace:
+    """Monotonic timestamps (ns) of one coordinate passing through the pipeline"""
+
+    __slots__ = ('trace_id', 'coordinates', 'stages')
+
+    def __init__(self, trace_id, coordinates=None):
+        self.trace_id = trace_id
+        self.coordinates = coordinates
+        self.stages = {}
+
+    def mark(self, stage, timestamp=None):
+        """Record that a stage finished (now, or at a timestamp from time.monotonic_ns())"""
+        self.stages[stage] = timestamp if timestamp is not None else time.monotonic_ns()
+
+    def durations_ms(self):
+        """Time spent reaching each stage from the previous recorded one, plus the total"""
+        durations = {}
+        previous = None
+        first = None
+        for stage in STAGES:
+            timestamp = self.stages.get(stage)
+            if timestamp is None:
+                continue
+            if previous is not None:
+                durations[stage] = (timestamp - previous) / 1_000_000.0
+            else:
+                first = timestamp
+            previous = timestamp
+        if first is not None:
+            durations['total'] = (previous - first) / 1_000_000.0
+        return durations
+
+
+class LatencyTracer:
+    def __init__(self, metrics, log_file=None):
+        self.metrics = metrics
+        self.log_file = log_file  # Optional append-only JSONL file of completed traces
+        self.ids = itertools.count(1)
+        self.write_lock = threading.Lock()
+
+    def start(self, stage='clipboard_read', timestamp=None):
+        """Begin a new trace with its first stage already reached"""
+        trace = Trace(next(self.ids))
+        trace.mark(stage, timestamp)
+        return trace
+
+    def finish(self, trace):
+        """Feed a completed trace into the stage histograms and the JSONL log"""
+        durations = trace.durations_ms()
+        for stage, duration in durations.items():
+            self.metrics.observe(f'trace.{stage}_ms', duration)
+
+        if self.log_file:
+            record = {
+                'trace_id': trace.trace_id,
+                'coordinates': trace.coordinates,
+                'wall_time': time.time(),
+                'stages_ns': trace.stages,
+                'durations_ms': durations,
+            }
+            try:
+                with self.write_lock, open(self.log_file, 'a') as f:
+                    f.write(json.dumps(record) + "\n")
+            except Exception as e:
+                print(f"[ERROR] Failed to write trace: {e}")
+        return durations
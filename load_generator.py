@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Synthetic movement for stress and soak tests of Isle Map Updater
+Generates believable player paths per map - random walks with a speed limit,
+gradual altitude changes and the occasional teleport (respawn, admin move) -
+and writes each position the way players copy it: Legacy or Evrima, with the
+separators of different locales and either minus sign. The positions can be
+pushed through the pipeline at a fixed rate of up to thousands per second;
+player 1 goes through the clipboard monitor step, the others become markers.
+
+    python load_generator.py --rate 2000 --count 100000 --browser none
+    python load_generator.py --players 20 --rate 200 --duration 3600    # soak
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from collections import Counter, namedtuple
+
+from map_bounds import MapBoundsTable
+
+
+STYLES = ('evrima', 'legacy')
+
+# Thousands and decimal separators as players' systems write them
+LOCALES = {
+    'en': (',', '.'),   # 88,879.526
+    'de': ('.', ','),   # 88.879,526
+    'fr': (' ', ','),   # 88 879,526
+    'ch': ("'", '.'),   # 88'879.526
+    'it': ("'", ','),   # 88'879,526
+    'raw': ('', '.'),   # 88879.526
+}
+
+MINUS_SIGNS = ('-', '−')  # Hyphen and Unicode minus
+
+# Share of time spent at each fraction of the top speed
+GAITS = ((0.0, 0.15), (0.25, 0.35), (0.6, 0.3), (1.0, 0.2))
+
+Sample = namedtuple('Sample', 'player text coords teleported')
+
+
+def format_number(value, thousands=',', decimal='.', minus='-', decimals=3):
+    """One coordinate with the given separators, e.g. -288.696,110"""
+    text = f"{abs(value):,.{decimals}f}".translate({ord(','): '\0', ord('.'): decimal}).replace('\0', thousands)
+    return minus + text if value < 0 else text
+
+
+def format_position(coords, style='evrima', locale='en', minus='-'):
+    """(x, y, z) as copied from the game in the given style and locale"""
+    thousands, decimal = LOCALES[locale]
+    x, y, z = (format_number(value, thousands, decimal, minus) for value in coords)
+    if style == 'legacy':
+        return f"(Lat: {x} Long: {y} Alt: {z})"
+    return f"{x}, {y}, {z}"
+
+
+class RandomWalk:
+    """One player's path inside a map's bounds"""
+
+    def __init__(self, bounds, rng, max_speed=1200.0, max_climb=300.0, teleport_chance=0.002):
+        self.bounds = bounds                    # (min_x, max_x, min_y, max_y, min_z, max_z)
+        self.rng = rng
+        self.max_speed = max_speed              # Game units per second
+        self.max_climb = max_climb              # Altitude change in game units per second at top speed
+        self.teleport_chance = teleport_chance  # Per step
+        self.teleports = 0
+        self.heading = rng.uniform(0, 2 * math.pi)
+        self.gait = rng.choice(GAITS)[0]
+        self.climb = 0.0
+        self.position = self._random_point()
+
+    def _random_point(self):
+        # Middle of the map area, where players spawn
+        min_x, max_x, min_y, max_y, min_z, max_z = self.bounds
+        return (self.rng.uniform(min_x * 0.8 + max_x * 0.2, min_x * 0.2 + max_x * 0.8),
+                self.rng.uniform(min_y * 0.8 + max_y * 0.2, min_y * 0.2 + max_y * 0.8),
+                self.rng.uniform(min_z * 0.6 + max_z * 0.4, min_z * 0.4 + max_z * 0.6))
+
+    def step(self, seconds):
+        """Advance by seconds of game time; returns (position, teleported)"""
+        rng = self.rng
+        if rng.random() < self.teleport_chance:
+            self.teleports += 1
+            self.position = self._random_point()
+            return self.position, True
+
+        if rng.random() < 0.1:
+            self.gait = rng.choices([gait for gait, _ in GAITS], [share for _, share in GAITS])[0]
+        self.heading += rng.gauss(0.0, 0.35)
+        self.climb = max(-1.0, min(1.0, self.climb + rng.gauss(0.0, 0.25)))
+
+        distance = self.gait * self.max_speed * seconds
+        x, y, z = self.position
+        x += math.cos(self.heading) * distance
+        y += math.sin(self.heading) * distance
+        z += self.climb * self.gait * self.max_climb * seconds
+
+        # Turn back at the edge of the map instead of leaving it
+        min_x, max_x, min_y, max_y, min_z, max_z = self.bounds
+        if not min_x <= x <= max_x or not min_y <= y <= max_y:
+            self.heading += math.pi
+            x, y = min(max(x, min_x), max_x), min(max(y, min_y), max_y)
+        if not min_z <= z <= max_z:
+            self.climb = -self.climb
+            z = min(max(z, min_z), max_z)
+        self.position = (x, y, z)
+        return self.position, False
+
+
+class LoadGenerator:
+    def __init__(self, map_value='gateway', players=1, seed=None, step_seconds=1.0, max_speed=1200.0,
+                 max_climb=300.0, teleport_chance=0.002, styles=STYLES, locales=tuple(LOCALES),
+                 unicode_minus=0.3, bounds=None):
+        self.map_value = map_value
+        self.rng = random.Random(seed)        # Same seed, same paths and texts
+        self.step_seconds = step_seconds      # Game time between two positions of one player
+        self.styles = list(styles)
+        self.locales = list(locales)
+        self.unicode_minus = unicode_minus    # Share of positions written with U+2212
+        if bounds is None:
+            bounds = MapBoundsTable().get_bounds(map_value)
+        self.walks = [RandomWalk(bounds, self.rng, max_speed, max_climb, teleport_chance)
+                      for _ in range(max(1, players))]
+        self.generated = 0
+
+    def samples(self):
+        """Endless positions, one player after the other"""
+        rng = self.rng
+        while True:
+            for player, walk in enumerate(self.walks):
+                position, teleported = walk.step(self.step_seconds)
+                coords = tuple(round(value, 3) for value in position)
+                minus = MINUS_SIGNS[1] if rng.random() < self.unicode_minus else MINUS_SIGNS[0]
+                text = format_position(coords, rng.choice(self.styles), rng.choice(self.locales), minus)
+                self.generated += 1
+                yield Sample(player, text, coords, teleported)
+
+    def texts(self):
+        """Endless position texts (e.g. for CoordinateParser.test_source)"""
+        return (sample.text for sample in self.samples())
+
+
+def paced(samples, rate):
+    """Yield samples at rate per second on average; sleeps only when ahead, so a slow
+    stretch is caught up afterwards"""
+    start = time.perf_counter()
+    for index, sample in enumerate(samples):
+        if rate:
+            delay = start + index / rate - time.perf_counter()
+            if delay > 0.001:
+                time.sleep(delay)
+        yield sample
+
+
+def process_rss_mb():
+    try:
+        import psutil  # Optional: only for the soak report
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def run_load(updater, generator, rate, duration=None, count=None, report_interval=None, report=None):
+    """Feed generated positions to a running updater: player 0 through the clipboard monitor
+    step, the others as markers. Calls report(stats) every report_interval seconds.
+    Returns the final stats dict"""
+    from session_replay import ReplayClipboard, quiet
+
+    clipboard = updater.clipboard = ReplayClipboard()
+    parser = updater.coordinate_parser
+    results = Counter()
+    stats = {'results': results, 'wrong': 0, 'step_ms': [], 'generated': 0, 'elapsed': 0.0}
+    samples = generator.samples()
+    start = last_report = time.perf_counter()
+    with quiet():
+        for sample in paced(samples, rate):
+            step_start = time.perf_counter()
+            if sample.player == 0:
+                clipboard.copy(sample.text)
+                outcome = updater.poll_clipboard()
+                result, sent = outcome if outcome else ('unchanged_text', None)
+            else:
+                result = updater.ingest_position(sample.text, player=f"bot{sample.player}", source='loadgen')
+                sent = None
+            stats['step_ms'].append((time.perf_counter() - step_start) * 1000.0)
+            results[result] += 1
+            # Every generated text is a valid position - anything else is a parser bug
+            if result == 'no_match' or (sent and not all(
+                    abs(a - b) < 0.0005 for a, b in zip(parser.to_numeric(sent), sample.coords))):
+                stats['wrong'] += 1
+            stats['generated'] += 1
+
+            now = time.perf_counter()
+            if (duration and now - start >= duration) or (count and stats['generated'] >= count):
+                break
+            if report and report_interval and now - last_report >= report_interval:
+                stats['elapsed'] = now - start
+                report(stats)
+                stats['step_ms'] = []
+                last_report = now
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    from benchmark_browser import report
+    from session_replay import start_pipeline, stop_pipeline
+
+    parser = argparse.ArgumentParser(description="Synthetic movement load for stress and soak tests")
+    parser.add_argument("--map", default="gateway", help="Map value (bounds come from map_bounds.json)")
+    parser.add_argument("--players", type=int, default=1, help="Player 1 is you, the others are markers")
+    parser.add_argument("--rate", type=float, default=500.0, help="Positions per second in total (0 = unpaced)")
+    parser.add_argument("--duration", type=float, help="Seconds to run")
+    parser.add_argument("--count", type=int, help="Positions to send (default 10000 without --duration)")
+    parser.add_argument("--seed", type=int, help="Random seed for repeatable runs")
+    parser.add_argument("--step", type=float, default=1.0, help="Game seconds between positions of one player")
+    parser.add_argument("--max-speed", type=float, default=1200.0, help="Top speed in game units per second")
+    parser.add_argument("--teleport-chance", type=float, default=0.002, help="Chance of a teleport per position")
+    parser.add_argument("--styles", default=",".join(STYLES), help="Comma-separated: " + ", ".join(STYLES))
+    parser.add_argument("--locales", default=",".join(LOCALES), help="Comma-separated: " + ", ".join(LOCALES))
+    parser.add_argument("--browser", choices=("fixture", "chrome", "none"), default="fixture",
+                        help="Local vulnona stand-in with the fake driver, with real Chrome, or no browser")
+    parser.add_argument("--config", default="map_config.json", help="Settings to run with")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between progress lines")
+    args = parser.parse_args()
+
+    generator = LoadGenerator(args.map, args.players, args.seed, args.step, args.max_speed,
+                              teleport_chance=args.teleport_chance, styles=args.styles.split(","),
+                              locales=args.locales.split(","))
+    count = args.count or (None if args.duration else 10_000)
+    out = sys.stdout
+
+    print("ISLE MAP UPDATER - SYNTHETIC LOAD")
+    print("=" * 70)
+    updater, fixture = start_pipeline({'map': args.map}, args.browser, args.config)
+
+    def progress(stats):
+        rss = process_rss_mb()
+        browser = updater.sinks.stats().get('browser', {})
+        print(f"[LOAD] {stats['elapsed']:7.0f} s  {stats['generated']:>9,} positions "
+              f"({stats['generated'] / stats['elapsed']:,.0f}/s)  wrong {stats['wrong']}  "
+              f"browser {browser.get('handled', 0):,} shown / {browser.get('coalesced', 0):,} coalesced  "
+              f"markers {len(updater.markers.positions)}"
+              + (f"  RSS {rss:.0f} MB" if rss else ""), file=out, flush=True)
+
+    try:
+        stats = run_load(updater, generator, args.rate, args.duration, count, args.report_interval, progress)
+    finally:
+        stop_pipeline(updater, fixture)
+
+    elapsed, generated = stats['elapsed'], stats['generated']
+    print(f"{generated:,} positions in {elapsed:.2f} s ({generated / elapsed:,.0f}/s, target "
+          f"{args.rate:,.0f}/s), {sum(walk.teleports for walk in generator.walks)} teleports")
+    print("Results: " + ", ".join(f"{name} {number:,}" for name, number in stats['results'].most_common()))
+    report("step (last window)", stats['step_ms'])
+    for name, sink in updater.sinks.stats().items():
+        print(f"[SINK] {name}: {sink['handled']:,} handled, {sink['coalesced']:,} coalesced, "
+              f"{sink['dropped']:,} dropped, {sink['errors']} errors")
+    if stats['wrong']:
+        print(f"[ERROR] {stats['wrong']} generated positions were not parsed back correctly")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Local map renderer for Isle Map Updater
+Draws the current position and recent trail on a locally cached map image in
+a tkinter canvas - no browser or network needed. Updates only move the marker
+and add/remove single trail segments, so Tk repaints just the small regions
+around them instead of the whole map. Large maps can be served from a tile
+pyramid (<map value>.tiles), in which case only the tiles around the marker
+are decoded. Other players (multi-marker frames) are kept as one canvas
+item pair per marker and only moved when a frame says they moved.
+"""
+
+import base64
+import os
+import threading
+import time
+from collections import deque
+
+from tile_store import TileStore
+
+
+class LocalMapRenderer:
+    def __init__(self, config_manager, projection, image_dir="map_images", trail_length=200,
+                 view_size=640, tile_zoom=None, tile_cache_size=64, pending_size=256, metrics=None):
+        self.config_manager = config_manager  # Source of the active map
+        self.projection = projection          # MapProjection (world -> full-resolution pixels)
+        self.image_dir = image_dir            # <map value>.png / .gif per map
+        self.trail_length = trail_length      # Trail segments kept on screen
+        self.view_size = view_size            # Longest canvas edge in pixels
+        self.tile_zoom = tile_zoom            # Pyramid level to show (None = full resolution)
+        self.tile_cache_size = tile_cache_size
+        self.tile_decoder = None              # bytes -> canvas image (default: tk.PhotoImage)
+        self.metrics = metrics
+
+        self.canvas = None
+        self.window = None
+        self.map_value = None
+        self.view_scale = 1.0                 # Canvas pixels per full-resolution image pixel
+        self.image = None                     # Keeps the PhotoImage alive
+        self.image_item = None
+        self.marker_item = None
+        self.status_item = None
+        self.trail_items = deque()
+        self.last_point = None                # Last marker position in canvas pixels
+        self.tiles = None                     # TileStore of the current map, if it has one
+        self.zoom = None
+        self.tile_items = {}                  # (column, row) -> (canvas image item, tile image)
+        self.markers = {}                     # Other players: marker id -> (px, py, label), full-resolution pixels
+        self.markers_map = None
+        self.marker_items = {}                # marker id -> (oval item, text item, label)
+
+        # Positions and marker frames from other threads, drawn on the Tk thread. Bounded on its
+        # own - with trail_length 0 the newest position must still reach the marker
+        self.pending = deque(maxlen=max(1, pending_size))
+        self.pending_frames = []
+        self.pending_lock = threading.Lock()
+        self.drain_interval_ms = 30
+
+    # --- window --------------------------------------------------------------
+
+    def open_window(self, parent):
+        """Show the renderer in its own Toplevel of the GUI (Tk thread only)"""
+        import tkinter as tk
+        if self.window:
+            self.window.lift()
+            return
+        self.window = tk.Toplevel(parent)
+        self.window.title("Isle Map - Local")
+        self.window.protocol("WM_DELETE_WINDOW", self.close_window)
+        canvas = tk.Canvas(self.window, width=self.view_size, height=self.view_size,
+                           background="#1e1e1e", highlightthickness=0)
+        canvas.pack(fill=tk.BOTH, expand=True)
+        self.attach(canvas)
+        self.window.after(self.drain_interval_ms, self._drain_loop)
+
+    def close_window(self):
+        if self.window:
+            self.window.destroy()
+        if self.tiles:
+            self.tiles.close()
+            self.tiles = None
+        self.window = None
+        self.canvas = None
+        self.map_value = None
+
+    def attach(self, canvas):
+        """Draw on an existing canvas"""
+        self.canvas = canvas
+        self.map_value = None
+
+    def _drain_loop(self):
+        if not self.window:
+            return
+        self.draw_pending()
+        self.window.after(self.drain_interval_ms, self._drain_loop)
+
+    # --- map -----------------------------------------------------------------
+
+    def _image_path(self, map_value):
+        for extension in (".tiles", ".png", ".gif"):
+            path = os.path.join(self.image_dir, map_value + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def load_map(self, map_value):
+        """Show the cached image of a map and start a fresh trail"""
+        canvas = self.canvas
+        canvas.delete("all")
+        self.trail_items.clear()
+        self.last_point = None
+        self.map_value = map_value
+        self.image = None
+        self.view_scale = 1.0
+        self.tile_items = {}
+        if self.tiles:
+            self.tiles.close()
+            self.tiles = None
+
+        path = self._image_path(map_value)
+        if path and path.endswith(".tiles"):
+            self.tiles = TileStore(path, self.tile_decoder or self._decode_tile, self.tile_cache_size)
+            self.zoom = self.tiles.max_zoom if self.tile_zoom is None else min(self.tile_zoom, self.tiles.max_zoom)
+            self.view_scale = 2.0 ** (self.zoom - self.tiles.max_zoom)
+            width, height = self.tiles.level_size(self.zoom)
+            canvas.config(scrollregion=(0, 0, width, height))
+        elif path:
+            import tkinter as tk
+            image = tk.PhotoImage(file=path)
+            # Integer subsampling keeps the decode cheap and the image inside the view
+            factor = max(1, -(-max(image.width(), image.height()) // self.view_size))
+            self.image = image.subsample(factor) if factor > 1 else image
+            self.view_scale = 1.0 / factor
+            self.image_item = canvas.create_image(0, 0, image=self.image, anchor="nw")
+            canvas.config(width=self.image.width(), height=self.image.height())
+
+        message = None
+        if not path:
+            message = f"No cached image for '{map_value}' in {self.image_dir}/"
+        elif not self.projection.is_calibrated(map_value):
+            message = f"'{map_value}' is not calibrated (map_calibration.json)"
+        self.status_item = canvas.create_text(8, 8, text=message or "", anchor="nw", fill="#ffcc00")
+
+        self.marker_item = canvas.create_oval(-10, -10, -10, -10, fill="#ff3b30", outline="white", width=2)
+
+        if map_value != self.markers_map:
+            self.markers = {}
+            self.markers_map = map_value
+        self.marker_items = {}
+        for marker_id in self.markers:
+            self._place_marker(marker_id)
+
+    @staticmethod
+    def _decode_tile(data):
+        import tkinter as tk
+        return tk.PhotoImage(data=base64.b64encode(data))
+
+    def _show_tiles(self, x, y):
+        """Keep exactly the tiles around the marker on the canvas and centre the view on it"""
+        canvas = self.canvas
+        half_view = self.view_size / 2
+        needed = set(self.tiles.tiles_around(self.zoom, x, y, half_view + self.tiles.tile_size / 2))
+
+        for key in [key for key in self.tile_items if key not in needed]:
+            canvas.delete(self.tile_items.pop(key)[0])
+        for column, row in needed - self.tile_items.keys():
+            tile = self.tiles.get_tile(self.zoom, column, row)
+            if tile is not None:
+                item = canvas.create_image(column * self.tiles.tile_size, row * self.tiles.tile_size,
+                                           image=tile, anchor="nw")
+                canvas.tag_lower(item)
+                # Tk shows nothing once the PhotoImage is garbage collected, and the
+                # tile cache may evict it while it is still on screen
+                self.tile_items[(column, row)] = (item, tile)
+
+        width, height = self.tiles.level_size(self.zoom)
+        canvas.xview_moveto(max(0.0, (x - half_view) / width))
+        canvas.yview_moveto(max(0.0, (y - half_view) / height))
+        if self.metrics:
+            self.metrics.set_gauge('tiles.hit_rate', self.tiles.stats()['hit_rate'])
+
+    # --- positions -----------------------------------------------------------
+
+    def update_position(self, coords):
+        """Queue a parsed (x, y, z) position (safe to call from any thread)"""
+        if not self.canvas:
+            return False
+        with self.pending_lock:
+            self.pending.append(coords)
+        return True
+
+    def update_markers(self, frame):
+        """Queue a multi-marker frame (safe to call from any thread); False without a window"""
+        if not self.canvas:
+            return False
+        with self.pending_lock:
+            self.pending_frames.append(frame)
+        return True
+
+    def draw_pending(self):
+        """Draw every queued position and marker frame (Tk thread only); returns the positions drawn"""
+        with self.pending_lock:
+            positions = list(self.pending)
+            self.pending.clear()
+            frames, self.pending_frames = self.pending_frames, []
+        if not self.canvas or not (positions or frames):
+            return 0
+
+        start = time.perf_counter()
+        selected_map = self.config_manager.get_selected_map()
+        if not selected_map:
+            return 0
+        if selected_map != self.map_value:
+            self.load_map(selected_map)
+        for coords in positions:
+            self._draw(coords)
+        for frame in frames:
+            self._apply_marker_frame(frame)
+        if self.metrics:
+            self.metrics.observe('renderer.draw_ms', (time.perf_counter() - start) * 1000.0)
+        return len(positions)
+
+    def _draw(self, coords):
+        pixel = self.projection.project(self.map_value, coords)
+        if pixel is None:
+            return
+        x, y = pixel[0] * self.view_scale, pixel[1] * self.view_scale
+        canvas = self.canvas
+
+        # Only the marker's old and new bounding boxes are repainted
+        canvas.coords(self.marker_item, x - 5, y - 5, x + 5, y + 5)
+        if self.tiles:
+            self._show_tiles(x, y)
+
+        if self.last_point is not None and self.trail_length:
+            segment = canvas.create_line(self.last_point[0], self.last_point[1], x, y,
+                                         fill="#ffd60a", width=2)
+            canvas.tag_lower(segment, self.marker_item)
+            self.trail_items.append(segment)
+            while len(self.trail_items) > self.trail_length:
+                canvas.delete(self.trail_items.popleft())
+        self.last_point = (x, y)
+
+    # --- other players -------------------------------------------------------
+
+    def _apply_marker_frame(self, frame):
+        if frame.map_value != self.map_value:
+            return  # Frame for the previous map; the tracker sends a full one for this map
+        if frame.full:
+            for marker_id in list(self.marker_items):
+                self._delete_marker(marker_id)
+            self.markers = {}
+        self.markers_map = frame.map_value
+        for marker_id in frame.removed:
+            self.markers.pop(marker_id, None)
+            self._delete_marker(marker_id)
+        self.markers.update(frame.changes)
+        for marker_id in frame.changes:
+            self._place_marker(marker_id)
+
+    def _place_marker(self, marker_id):
+        px, py, label = self.markers[marker_id]
+        x, y = px * self.view_scale, py * self.view_scale
+        canvas = self.canvas
+        items = self.marker_items.get(marker_id)
+        if items is not None and items[2] == label:
+            canvas.coords(items[0], x - 4, y - 4, x + 4, y + 4)
+            canvas.coords(items[1], x + 7, y)
+            return
+        if items is not None:
+            self._delete_marker(marker_id)
+        oval = canvas.create_oval(x - 4, y - 4, x + 4, y + 4, fill="#0a84ff", outline="white", width=1)
+        text = canvas.create_text(x + 7, y, text=label, anchor="w", fill="white")
+        for item in (oval, text):
+            canvas.tag_lower(item, self.marker_item)  # Our own marker stays on top
+        self.marker_items[marker_id] = (oval, text, label)
+
+    def _delete_marker(self, marker_id):
+        items = self.marker_items.pop(marker_id, None)
+        if items is not None:
+            self.canvas.delete(items[0])
+            self.canvas.delete(items[1])
@@ -0,0 +1,326 @@
+"""
+Log file input for Isle Map Updater
+Follows a game or server log that contains positions, as an alternative (or
+addition) to the clipboard. Only new bytes are read, from an offset that is
+persisted across restarts; rotation (rename + new file) and truncation are
+detected. The reader sleeps until the OS reports a change in the log's folder
+(inotify on Linux, change notifications on Windows) and falls back to polling
+elsewhere.
+"""
+
+import json
+import os
+import select
+import struct
+import threading
+import time
+
+
+# inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+# Windows change notifications
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x01
+FILE_NOTIFY_CHANGE_SIZE = 0x08
+FILE_NOTIFY_CHANGE_LAST_WRITE = 0x10
+WAIT_OBJECT_0 = 0
+INVALID_HANDLE_VALUE = -1
+
+
+class PollingWatcher:
+    """Fallback: wake every interval and let the tailer check the file"""
+
+    kind = 'polling'
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+
+    def wait(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        return True
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux: block until something happens to the log file in its folder"""
+
+    kind = 'inotify'
+
+    def __init__(self, path):
+        import ctypes  # Only for the libc calls below
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        directory = os.path.dirname(os.path.abspath(path))
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+        self.name = os.fsencode(os.path.basename(path))
+
+    def wait(self, timeout):
+        """True if the log changed (or events were lost) within timeout seconds"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        relevant = False
+        try:
+            while True:
+                data = os.read(self.fd, 64 * 1024)
+                offset = 0
+                while offset < len(data):
+                    _, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+                    name = data[offset + INOTIFY_EVENT.size:offset + INOTIFY_EVENT.size + length].rstrip(b"\0")
+                    if name == self.name or mask & IN_Q_OVERFLOW:
+                        relevant = True
+                    offset += INOTIFY_EVENT.size + length
+        except BlockingIOError:
+            pass  # Drained
+        return relevant
+
+    def close(self):
+        os.close(self.fd)
+
+
+class WindowsChangeWatcher:
+    """Windows: FindFirstChangeNotification on the log's folder"""
+
+    kind = 'change-notification'
+
+    def __init__(self, path):
+        import ctypes  # Only for the kernel32 calls below
+        from ctypes import wintypes
+        self.kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self.kernel32.FindFirstChangeNotificationW.restype = wintypes.HANDLE
+        self.kernel32.FindFirstChangeNotificationW.argtypes = [wintypes.LPCWSTR, wintypes.BOOL, wintypes.DWORD]
+        self.kernel32.FindNextChangeNotification.argtypes = [wintypes.HANDLE]
+        self.kernel32.FindCloseChangeNotification.argtypes = [wintypes.HANDLE]
+        self.kernel32.WaitForSingleObject.argtypes = [wintypes.HANDLE, wintypes.DWORD]
+        directory = os.path.dirname(os.path.abspath(path))
+        flags = FILE_NOTIFY_CHANGE_FILE_NAME | FILE_NOTIFY_CHANGE_SIZE | FILE_NOTIFY_CHANGE_LAST_WRITE
+        self.handle = self.kernel32.FindFirstChangeNotificationW(directory, False, flags)
+        if self.handle in (None, INVALID_HANDLE_VALUE, ctypes.c_void_p(-1).value):
+            raise OSError(ctypes.get_last_error(), f"FindFirstChangeNotification failed for {directory}")
+
+    def wait(self, timeout):
+        # Other files in the folder wake us too; the tailer's stat() sorts that out cheaply
+        if self.kernel32.WaitForSingleObject(self.handle, int(timeout * 1000)) != WAIT_OBJECT_0:
+            return False
+        self.kernel32.FindNextChangeNotification(self.handle)
+        return True
+
+    def close(self):
+        self.kernel32.FindCloseChangeNotification(self.handle)
+
+
+def create_watcher(path, poll_interval=0.5, force_polling=False):
+    """Best change notification for this platform, or polling"""
+    if not force_polling:
+        try:
+            if os.name == 'nt':
+                return WindowsChangeWatcher(path)
+            if hasattr(select, 'select') and os.uname().sysname == 'Linux':
+                return InotifyWatcher(path)
+        except (OSError, AttributeError) as e:
+            print(f"[LOGTAIL] File notifications unavailable ({e}) - polling every {poll_interval}s")
+    return PollingWatcher(poll_interval)
+
+
+class LogTailer:
+    def __init__(self, path, handler, offsets_file=None, poll_interval=0.5, start_at_end=True,
+                 force_polling=False, metrics=None):
+        self.path = path
+        self.handler = handler              # Called with each complete new line (tailer thread)
+        self.offsets_file = offsets_file    # JSON file remembering where reading stopped
+        self.poll_interval = poll_interval  # Polling interval, and safety re-check with notifications
+        self.start_at_end = start_at_end    # A log seen for the first time is not replayed
+        self.force_polling = force_polling
+        self.metrics = metrics
+
+        # Windows blocks renaming files that are open, which would stop log rotation
+        self.keep_open = os.name != 'nt'
+        self.file = None
+        self.identity = None                # (st_dev, st_ino) of the file being read
+        self.offset = 0                     # Byte offset after the last complete line
+        self.partial = b""                  # Bytes of an unfinished last line
+        self.lines = 0
+        self.rotations = 0
+        self.last_save = 0.0
+        self.saved = None                   # (identity, offset) last written to offsets_file
+
+        self.watcher = None
+        self.running = False
+        self.thread = None
+        self.load_offset()
+
+    # --- persistent offset ---------------------------------------------------
+
+    def load_offset(self):
+        if not self.offsets_file or not os.path.exists(self.offsets_file):
+            return
+        try:
+            with open(self.offsets_file, 'r') as f:
+                entry = json.load(f).get(os.path.abspath(self.path))
+            if entry:
+                self.identity = tuple(entry['identity'])
+                self.offset = entry['offset']
+                self.saved = (self.identity, self.offset)
+        except Exception as e:
+            print(f"[ERROR] Failed to load log offsets: {e}")
+
+    def save_offset(self):
+        if not self.offsets_file or self.identity is None or (self.identity, self.offset) == self.saved:
+            return
+        try:
+            offsets = {}
+            if os.path.exists(self.offsets_file):
+                with open(self.offsets_file, 'r') as f:
+                    offsets = json.load(f)
+            offsets[os.path.abspath(self.path)] = {'identity': list(self.identity), 'offset': self.offset}
+            temporary = self.offsets_file + ".tmp"
+            with open(temporary, 'w') as f:
+                json.dump(offsets, f, indent=2)
+            os.replace(temporary, self.offsets_file)
+            self.saved = (self.identity, self.offset)
+        except Exception as e:
+            print(f"[ERROR] Failed to save log offsets: {e}")
+
+    # --- reading -------------------------------------------------------------
+
+    def poll(self):
+        """Read whatever was appended since the last call; returns the number of lines handled"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self._read_open_file()  # Rotated away and not recreated yet
+        identity = (stat.st_dev, stat.st_ino)
+
+        handled = 0
+        if self.identity is None:
+            # First sight of this log
+            self.identity = identity
+            self.offset = stat.st_size if self.start_at_end else 0
+        elif identity != self.identity:
+            # Rotated: finish the old file (still open on POSIX), then start the new one from the top
+            handled += self._read_open_file()
+            if self.partial.strip():
+                self._handle(self.partial.decode('utf-8', 'replace').rstrip("\r"))
+                handled += 1
+            self._close()
+            self.identity = identity
+            self.offset = 0
+            self.partial = b""
+            self.rotations += 1
+            self._count('logtail.rotations')
+            print(f"[LOGTAIL] {self.path} was rotated")
+        elif stat.st_size < self.offset:
+            print(f"[LOGTAIL] {self.path} was truncated - reading from the start")
+            self._close()
+            self.offset = 0
+            self.partial = b""
+
+        if stat.st_size > self.offset + len(self.partial):
+            if self.metrics:
+                self.metrics.set_gauge('logtail.backlog_bytes', stat.st_size - self.offset - len(self.partial))
+                # How stale the newest data is by the time we read it
+                self.metrics.observe('logtail.lag_ms', max(0.0, (time.time() - stat.st_mtime) * 1000.0))
+            if self.file is None:
+                self.file = open(self.path, 'rb')
+            handled += self._read_open_file()
+            if not self.keep_open:
+                self._close()
+        return handled
+
+    def _read_open_file(self):
+        if self.file is None:
+            return 0
+        self.file.seek(self.offset + len(self.partial))
+        handled = 0
+        while True:
+            chunk = self.file.read(64 * 1024)
+            if not chunk:
+                break
+            self._count('logtail.bytes', len(chunk))
+            data = self.partial + chunk
+            lines = data.split(b"\n")
+            self.partial = lines.pop()  # Unfinished line - completed by a later write
+            for line in lines:
+                self.offset += len(line) + 1
+                text = line.decode('utf-8', 'replace').rstrip("\r")
+                if text.strip():
+                    self._handle(text)
+                    handled += 1
+        return handled
+
+    def _handle(self, line):
+        start = time.perf_counter()
+        try:
+            self.handler(line)
+        except Exception as e:
+            print(f"[ERROR] Log line failed: {e}")
+        self.lines += 1
+        if self.metrics:
+            self.metrics.increment('logtail.lines')
+            self.metrics.observe('logtail.line_ms', (time.perf_counter() - start) * 1000.0)
+
+    def _close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def _count(self, name, amount=1):
+        if self.metrics:
+            self.metrics.increment(name, amount)
+
+    # --- thread --------------------------------------------------------------
+
+    def start(self):
+        if self.running:
+            return
+        self.watcher = create_watcher(self.path, self.poll_interval, self.force_polling)
+        self.last_save = time.monotonic()  # First lines_per_s window starts now
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="log-tailer", daemon=True)
+        self.thread.start()
+        print(f"[LOGTAIL] Following {self.path} ({self.watcher.kind})")
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(2 * self.poll_interval + 1)
+            self.thread = None
+        self._close()
+        self.save_offset()
+        if self.watcher:
+            self.watcher.close()
+            self.watcher = None
+
+    def _run(self):
+        window_lines = self.lines
+        while self.running:
+            try:
+                self.poll()
+            except OSError as e:
+                print(f"[ERROR] Reading {self.path} failed: {e}")
+            elapsed = time.monotonic() - self.last_save
+            if elapsed >= 1.0:
+                self.save_offset()
+                self.last_save = time.monotonic()
+                if self.metrics:
+                    self.metrics.set_gauge('logtail.lines_per_s', (self.lines - window_lines) / elapsed)
+                window_lines = self.lines
+            # Notifications wake us at once; the timeout is a safety net for missed events
+            self.watcher.wait(self.poll_interval)
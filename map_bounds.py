@@ -0,0 +1,134 @@
+"""
+Per-map coordinate bounds for Isle Map Updater
+Rejects impossible coordinates (dates, version strings, ...) before any browser work
+"""
+
+import json
+import math
+import os
+
+
+# (min_x, max_x, min_y, max_y, min_z, max_z) used for maps without a calibrated entry
+DEFAULT_BOUNDS = (-1_000_000.0, 1_000_000.0, -1_000_000.0, 1_000_000.0, -250_000.0, 250_000.0)
+
+
+class MapBoundsTable:
+    def __init__(self, bounds_file="map_bounds.json", default_bounds=DEFAULT_BOUNDS):
+        self.bounds_file = bounds_file
+        self.default_bounds = tuple(default_bounds)
+        self.table = {}     # map value -> (min_x, max_x, min_y, max_y, min_z, max_z)
+        self.observed = {}  # map value -> [min_x, max_x, min_y, max_y, min_z, max_z, count]
+        self.outliers = {}  # map value -> last plausible position rejected by the calibrated bounds
+        self.load()
+
+    def load(self):
+        """Load calibrated bounds and observed extents from JSON"""
+        try:
+            if os.path.exists(self.bounds_file):
+                with open(self.bounds_file, 'r') as f:
+                    data = json.load(f)
+                self.table = {map_value: tuple(bounds) for map_value, bounds in data.get('bounds', {}).items()}
+                self.observed = {map_value: list(extent) for map_value, extent in data.get('observed', {}).items()}
+                print(f"[BOUNDS] Loaded bounds for {len(self.table)} maps")
+        except Exception as e:
+            print(f"[ERROR] Failed to load map bounds: {e}")
+
+    def save(self):
+        """Save bounds and observed extents to JSON"""
+        try:
+            with open(self.bounds_file, 'w') as f:
+                json.dump({'bounds': self.table, 'observed': self.observed}, f, indent=2)
+        except Exception as e:
+            print(f"[ERROR] Failed to save map bounds: {e}")
+
+    def get_bounds(self, map_value):
+        return self.table.get(map_value, self.default_bounds)
+
+    def is_calibrated(self, map_value):
+        """True once a map has bounds of its own (refresh seeds catalogue maps with the defaults)"""
+        return self.get_bounds(map_value) != self.default_bounds
+
+    def contains(self, map_value, coords):
+        """O(1) check that (x, y, z) lies inside the bounds of map_value"""
+        if coords is None:
+            return False
+        min_x, max_x, min_y, max_y, min_z, max_z = self.table.get(map_value, self.default_bounds)
+        x, y, z = coords
+        return min_x <= x <= max_x and min_y <= y <= max_y and min_z <= z <= max_z
+
+    def observe(self, map_value, coords):
+        """Grow the observed extent of a map with an accepted position"""
+        if not map_value or coords is None:
+            return
+        x, y, z = coords
+        extent = self.observed.get(map_value)
+        if extent is None:
+            self.observed[map_value] = [x, x, y, y, z, z, 1]
+            return
+        extent[0] = min(extent[0], x)
+        extent[1] = max(extent[1], x)
+        extent[2] = min(extent[2], y)
+        extent[3] = max(extent[3], y)
+        extent[4] = min(extent[4], z)
+        extent[5] = max(extent[5], z)
+        extent[6] += 1
+
+    def calibrate_from_observations(self, map_value, margin=0.25, min_samples=100):
+        """Set a map's bounds to its observed extent plus a relative margin, clamped to the defaults.
+        Bounds that are already calibrated only ever grow"""
+        extent = self.observed.get(map_value)
+        if not extent or extent[6] < min_samples:
+            print(f"[BOUNDS] Not enough observations to calibrate {map_value}")
+            return False
+
+        bounds = []
+        for axis in range(3):
+            low, high = extent[axis * 2], extent[axis * 2 + 1]
+            pad = max((high - low) * margin, 1000.0)
+            bounds.append(max(low - pad, self.default_bounds[axis * 2]))
+            bounds.append(min(high + pad, self.default_bounds[axis * 2 + 1]))
+        if self.is_calibrated(map_value):
+            current = self.table[map_value]
+            bounds = [min(bounds[i], current[i]) if i % 2 == 0 else max(bounds[i], current[i]) for i in range(6)]
+
+        self.table[map_value] = tuple(bounds)
+        print(f"[BOUNDS] Calibrated {map_value} from {extent[6]} observations")
+        return True
+
+    def auto_calibrate(self, map_value, margin=0.25, min_samples=100):
+        """Calibrate a map once min_samples positions were observed, then again after every
+        min_samples more so the bounds follow the explored area. Returns True if calibrated"""
+        extent = self.observed.get(map_value)
+        if not extent or extent[6] < min_samples:
+            return False
+        if self.is_calibrated(map_value) and extent[6] % min_samples:
+            return False
+        return self.calibrate_from_observations(map_value, margin, min_samples)
+
+    def observe_outlier(self, map_value, coords, margin=0.25, confirm_distance=5000.0):
+        """A position outside a calibrated map's bounds. One stray triple (a date, ...) stays
+        rejected, but a second one within confirm_distance of it means the player really is
+        there: both are observed and the bounds widened to include them. Returns True if widened"""
+        if coords is None or not self.is_calibrated(map_value):
+            return False
+        min_x, max_x, min_y, max_y, min_z, max_z = self.default_bounds
+        x, y, z = coords
+        if not (min_x <= x <= max_x and min_y <= y <= max_y and min_z <= z <= max_z):
+            return False  # Not a position on any map
+
+        previous = self.outliers.get(map_value)
+        self.outliers[map_value] = coords
+        if previous is None or math.dist(previous, coords) > confirm_distance:
+            return False
+        del self.outliers[map_value]
+        self.observe(map_value, previous)
+        self.observe(map_value, coords)
+        return self.calibrate_from_observations(map_value, margin, min_samples=1)
+
+    def refresh(self, available_maps=None):
+        """Reload the table and make sure every map in the vulnona catalogue has an entry"""
+        self.load()
+        for map_info in available_maps or []:
+            self.table.setdefault(map_info['value'], self.default_bounds)
+        self.save()
+        return self.table
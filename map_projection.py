@@ -0,0 +1,178 @@
+"""
+Map projection for Isle Map Updater
+Maps Isle world coordinates to map image pixels with a per-map affine
+transform fitted from reference points. Single positions (the live cursor)
+use plain Python; batches (history, heatmaps, trails) use NumPy when it is
+installed, which is only imported on first batch use.
+"""
+
+import json
+import math
+import os
+
+
+def fit_affine(reference_points):
+    """Least-squares affine transform from [(x, y, px, py), ...] (at least 3 non-collinear points).
+    Returns ((a, b, c), (d, e, f)) with px = a*x + b*y + c and py = d*x + e*y + f"""
+    if len(reference_points) < 3:
+        raise ValueError("At least 3 reference points are needed")
+
+    # Normal equations A^T A p = A^T t with rows A = [x, y, 1], solved once per output axis
+    ata = [[0.0] * 3 for _ in range(3)]
+    atb = [[0.0, 0.0] for _ in range(3)]
+    for x, y, px, py in reference_points:
+        row = (x, y, 1.0)
+        for i in range(3):
+            for j in range(3):
+                ata[i][j] += row[i] * row[j]
+            atb[i][0] += row[i] * px
+            atb[i][1] += row[i] * py
+
+    solution = _solve3(ata, atb)
+    return tuple(solution[i][0] for i in range(3)), tuple(solution[i][1] for i in range(3))
+
+
+def _solve3(matrix, rhs):
+    """Gauss-Jordan elimination with partial pivoting for a 3x3 system with 2 right-hand sides"""
+    augmented = [matrix[i][:] + rhs[i][:] for i in range(3)]
+    scale = max(abs(value) for row in matrix for value in row) or 1.0
+    for col in range(3):
+        pivot = max(range(col, 3), key=lambda r: abs(augmented[r][col]))
+        if abs(augmented[pivot][col]) <= 1e-12 * scale:
+            raise ValueError("Reference points are collinear")
+        augmented[col], augmented[pivot] = augmented[pivot], augmented[col]
+        pivot_value = augmented[col][col]
+        augmented[col] = [value / pivot_value for value in augmented[col]]
+        for r in range(3):
+            if r != col:
+                factor = augmented[r][col]
+                augmented[r] = [a - factor * b for a, b in zip(augmented[r], augmented[col])]
+    return [row[3:] for row in augmented]
+
+
+def pixel_to_tile(px, py, zoom, max_zoom, tile_size=256):
+    """Tile (column, row) and offset inside it for a full-resolution pixel at a zoom level
+    (max_zoom is the full-resolution level, every level below halves the image)"""
+    scale = 2.0 ** (zoom - max_zoom)
+    sx, sy = px * scale, py * scale
+    column, row = int(math.floor(sx / tile_size)), int(math.floor(sy / tile_size))
+    return column, row, sx - column * tile_size, sy - row * tile_size
+
+
+class MapProjection:
+    """Per-map calibrations, stored as
+    {"<map value>": {"affine": [[a, b, c], [d, e, f]], "reference_points": [[x, y, px, py], ...],
+                     "image_size": [width, height]}}   (image_size is optional)"""
+
+    def __init__(self, calibration_file="map_calibration.json"):
+        self.calibration_file = calibration_file
+        self.calibrations = {}  # map value -> {'affine': ((a, b, c), (d, e, f)), 'reference_points': [...]}
+        self._matrices = {}     # map value -> cached 2x3 numpy array
+        self.load()
+
+    def load(self):
+        """Load calibrations from JSON"""
+        try:
+            if os.path.exists(self.calibration_file):
+                with open(self.calibration_file, 'r') as f:
+                    data = json.load(f)
+                self.calibrations = {
+                    map_value: {
+                        'affine': tuple(tuple(row) for row in entry['affine']),
+                        'reference_points': entry.get('reference_points', []),
+                        'image_size': entry.get('image_size'),
+                    }
+                    for map_value, entry in data.items()
+                }
+                self._matrices = {}
+                print(f"[PROJECTION] Loaded calibrations for {len(self.calibrations)} maps")
+        except Exception as e:
+            print(f"[ERROR] Failed to load map calibrations: {e}")
+
+    def save(self):
+        """Save calibrations to JSON"""
+        try:
+            with open(self.calibration_file, 'w') as f:
+                json.dump(self.calibrations, f, indent=2)
+        except Exception as e:
+            print(f"[ERROR] Failed to save map calibrations: {e}")
+
+    def calibrate(self, map_value, reference_points, image_size=None):
+        """Fit and store the affine transform for a map; returns the RMS residual in pixels.
+        image_size (width, height) of the calibrated image lets pixels be scaled to other renderings"""
+        affine = fit_affine(reference_points)
+        self.calibrations[map_value] = {
+            'affine': affine,
+            'reference_points': [list(point) for point in reference_points],
+            'image_size': list(image_size) if image_size else None,
+        }
+        self._matrices.pop(map_value, None)
+
+        squared = 0.0
+        for x, y, px, py in reference_points:
+            fx, fy = self._apply(affine, x, y)
+            squared += (fx - px) ** 2 + (fy - py) ** 2
+        return math.sqrt(squared / len(reference_points))
+
+    def is_calibrated(self, map_value):
+        return map_value in self.calibrations
+
+    def image_size(self, map_value):
+        """(width, height) of the calibrated image, or None if unknown"""
+        entry = self.calibrations.get(map_value)
+        size = entry.get('image_size') if entry else None
+        return tuple(size) if size else None
+
+    @staticmethod
+    def _apply(affine, x, y):
+        (a, b, c), (d, e, f) = affine
+        return a * x + b * y + c, d * x + e * y + f
+
+    def project(self, map_value, coords):
+        """Pixel (px, py) for one (x, y[, z]) position, or None if the map is not calibrated"""
+        entry = self.calibrations.get(map_value)
+        if entry is None or coords is None:
+            return None
+        return self._apply(entry['affine'], coords[0], coords[1])
+
+    def unproject(self, map_value, px, py):
+        """World (x, y) under a pixel, or None if the map is not calibrated"""
+        entry = self.calibrations.get(map_value)
+        if entry is None:
+            return None
+        (a, b, c), (d, e, f) = entry['affine']
+        determinant = a * e - b * d
+        dx, dy = px - c, py - f
+        return (e * dx - b * dy) / determinant, (a * dy - d * dx) / determinant
+
+    def project_many(self, map_value, coords):
+        """Pixels for a batch of (x, y[, z]) positions.
+        Returns an (N, 2) float array with NumPy, a list of (px, py) tuples without it,
+        or None if the map is not calibrated"""
+        entry = self.calibrations.get(map_value)
+        if entry is None:
+            return None
+        try:
+            import numpy as np  # Optional - only batch projection benefits from it
+        except ImportError:
+            affine = entry['affine']
+            return [self._apply(affine, point[0], point[1]) for point in coords]
+
+        matrix = self._matrices.get(map_value)
+        if matrix is None:
+            matrix = self._matrices[map_value] = np.array(entry['affine'], dtype=np.float64)
+        points = np.asarray(coords, dtype=np.float64)
+        if points.size == 0:
+            return np.empty((0, 2))
+        return points[:, :2] @ matrix[:, :2].T + matrix[:, 2]
+
+    def project_chunks(self, map_value, coords_iter, chunk_size=100_000):
+        """Project an iterable of positions (e.g. a history export) chunk by chunk"""
+        chunk = []
+        for coords in coords_iter:
+            chunk.append(coords)
+            if len(chunk) >= chunk_size:
+                yield self.project_many(map_value, chunk)
+                chunk = []
+        if chunk:
+            yield self.project_many(map_value, chunk)
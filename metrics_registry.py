@@ -0,0 +1,110 @@
+"""
+In-process metrics for Isle Map Updater
+Thread-safe counters, gauges and latency histograms shared by all managers
+"""
+
+import math
+import threading
+import time
+from collections import deque
+
+
+class Histogram:
+    """Keeps the most recent samples of a measurement for percentile queries"""
+
+    def __init__(self, max_samples=2048):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+        self.last = None
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+        self.last = value
+
+    def percentile(self, pct):
+        """Nearest-rank percentile over the retained samples"""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+        return ordered[rank - 1]
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'last': self.last,
+            'mean': self.total / self.count if self.count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, max_samples=2048):
+        self.lock = threading.Lock()
+        self.max_samples = max_samples
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.events = {}  # name -> deque of monotonic timestamps for rate queries
+
+    def increment(self, name, amount=1):
+        """Add to a counter"""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        """Set a point-in-time value"""
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe(self, name, value):
+        """Record a sample (e.g. a latency in milliseconds)"""
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.max_samples)
+            histogram.observe(value)
+
+    def mark(self, name):
+        """Record that an event happened now (for per-minute rates)"""
+        now = time.monotonic()
+        with self.lock:
+            events = self.events.get(name)
+            if events is None:
+                events = self.events[name] = deque(maxlen=self.max_samples)
+            events.append(now)
+
+    def get_rate(self, name, window=60.0):
+        """Number of marked events within the last window seconds"""
+        cutoff = time.monotonic() - window
+        with self.lock:
+            events = self.events.get(name, ())
+            return sum(1 for timestamp in events if timestamp >= cutoff)
+
+    def get_counter(self, name):
+        with self.lock:
+            return self.counters.get(name, 0)
+
+    def get_gauge(self, name, default=None):
+        with self.lock:
+            return self.gauges.get(name, default)
+
+    def get_histogram(self, name):
+        """Snapshot dict of a histogram, or None if nothing was observed"""
+        with self.lock:
+            histogram = self.histograms.get(name)
+            return histogram.snapshot() if histogram else None
+
+    def snapshot(self):
+        """Copy of all metrics"""
+        with self.lock:
+            return {
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges),
+                'histograms': {name: h.snapshot() for name, h in self.histograms.items()},
+            }
@@ -0,0 +1,53 @@
+"""
+Movement filtering for Isle Map Updater
+Drops position updates that would not visibly move the map marker
+"""
+
+import math
+
+
+class MovementFilter:
+    def __init__(self, threshold=50.0, ignore_altitude=True, metrics=None):
+        self.threshold = threshold              # Minimum distance in game units
+        self.ignore_altitude = ignore_altitude  # Compare x/y only
+        self.metrics = metrics
+        self.last_submitted = None
+        self.accepted = 0
+        self.suppressed = 0
+
+    def configure(self, threshold=None, ignore_altitude=None):
+        """Change the filter settings"""
+        if threshold is not None:
+            self.threshold = float(threshold)
+        if ignore_altitude is not None:
+            self.ignore_altitude = bool(ignore_altitude)
+
+    def distance(self, a, b):
+        """Distance between two (x, y, z) tuples"""
+        if self.ignore_altitude:
+            return math.hypot(a[0] - b[0], a[1] - b[1])
+        return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
+
+    def should_update(self, coords):
+        """Return True if coords moved far enough from the last submitted position"""
+        if coords is None:
+            return True
+
+        if self.last_submitted is not None and self.distance(coords, self.last_submitted) < self.threshold:
+            self.suppressed += 1
+            if self.metrics:
+                self.metrics.increment('updates.suppressed')
+            return False
+
+        self.last_submitted = coords
+        self.accepted += 1
+        return True
+
+    def rollback(self, coords):
+        """Forget coords if the sink could not show them, so the same spot is submitted again"""
+        if self.last_submitted == coords:
+            self.last_submitted = None
+
+    def reset(self):
+        """Forget the last position (e.g. after a map switch)"""
+        self.last_submitted = None
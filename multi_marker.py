@@ -0,0 +1,196 @@
+"""
+Multi-marker tracking for Isle Map Updater
+Shows many players (tribe members, server log entries, ...) on the active map.
+Positions may arrive at any rate; each output (browser page, local map
+window) is redrawn at a fixed frame rate from the newest positions, and only
+markers that appeared, moved or disappeared since its last frame are sent -
+as one batch per frame. A slow output simply gets fewer frames.
+"""
+
+import threading
+import time
+
+
+class MarkerFrame:
+    """One batched update for an output"""
+
+    __slots__ = ('map_value', 'changes', 'removed', 'full', 'count')
+
+    def __init__(self, map_value, changes, removed, full, count):
+        self.map_value = map_value
+        self.changes = changes  # marker id -> (px, py, label) in full-resolution map pixels
+        self.removed = removed  # marker ids to take off the map
+        self.full = full        # True: drop everything the output shows before applying
+        self.count = count      # Markers shown once the frame is applied
+
+
+class MarkerSet:
+    """What one output currently shows, and the diff to a new target state"""
+
+    def __init__(self, min_move=1.0):
+        self.min_move = min_move  # Pixels a marker must move before it is redrawn
+        self.map_value = None
+        self.shown = {}           # marker id -> (px, py, label)
+        self.full = True          # Output state unknown - next frame redraws everything
+
+    def reset(self):
+        self.shown = {}
+        self.full = True
+
+    def diff(self, map_value, targets):
+        """MarkerFrame turning the shown markers into targets, or None if nothing changed"""
+        if self.full or map_value != self.map_value:
+            return MarkerFrame(map_value, dict(targets), [], True, len(targets))
+
+        min_move = self.min_move
+        changes = {}
+        for marker_id, target in targets.items():
+            shown = self.shown.get(marker_id)
+            if (shown is None or shown[2] != target[2]
+                    or abs(shown[0] - target[0]) >= min_move or abs(shown[1] - target[1]) >= min_move):
+                changes[marker_id] = target
+        removed = [marker_id for marker_id in self.shown if marker_id not in targets]
+        if not changes and not removed:
+            return None
+        return MarkerFrame(map_value, changes, removed, False, len(targets))
+
+    def commit(self, frame):
+        """Record a frame the output applied"""
+        if frame.full:
+            self.shown = {}
+            self.full = False
+        self.map_value = frame.map_value
+        self.shown.update(frame.changes)
+        for marker_id in frame.removed:
+            self.shown.pop(marker_id, None)
+
+
+class MarkerOutput:
+    """A frame consumer with its own diff state and thread"""
+
+    def __init__(self, name, apply, min_move):
+        self.name = name
+        self.apply = apply  # Called with a MarkerFrame; returns False if it was not (fully) applied
+        self.markers = MarkerSet(min_move)
+        self.thread = None
+        self.frames = 0
+        self.overruns = 0   # Frames that took longer than the frame interval
+
+
+class MultiMarkerTracker:
+    def __init__(self, config_manager, projection, frame_rate=5.0, min_move=1.0,
+                 marker_timeout=30.0, metrics=None):
+        self.config_manager = config_manager  # Source of the active map
+        self.projection = projection          # MapProjection (world -> full-resolution pixels)
+        self.frame_interval = 1.0 / frame_rate
+        self.min_move = min_move
+        self.marker_timeout = marker_timeout  # Drop markers not updated for this long
+        self.metrics = metrics
+
+        self.positions = {}                   # marker id -> (label, map value, coords, updated)
+        self.lock = threading.Lock()
+        self.outputs = {}                     # name -> MarkerOutput
+        self.stop_event = threading.Event()
+        self.running = False
+
+    # --- positions (any thread) ----------------------------------------------
+
+    def set_position(self, marker_id, label, map_value, coords):
+        """Latest position of one marker; older positions of it are simply replaced"""
+        with self.lock:
+            self.positions[marker_id] = (label, map_value, coords, time.monotonic())
+
+    def remove(self, marker_id):
+        with self.lock:
+            self.positions.pop(marker_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.positions.clear()
+
+    def targets(self, map_value):
+        """marker id -> (px, py, label) for every live marker on a calibrated map"""
+        cutoff = time.monotonic() - self.marker_timeout
+        with self.lock:
+            for marker_id in [mid for mid, entry in self.positions.items() if entry[3] < cutoff]:
+                del self.positions[marker_id]
+            entries = [(marker_id, entry[0], entry[2]) for marker_id, entry in self.positions.items()
+                       if entry[1] == map_value]
+
+        targets = {}
+        for marker_id, label, coords in entries:
+            pixel = self.projection.project(map_value, coords)
+            if pixel is not None:
+                targets[marker_id] = (pixel[0], pixel[1], label)
+        return targets
+
+    # --- outputs -------------------------------------------------------------
+
+    def add_output(self, name, apply):
+        output = self.outputs[name] = MarkerOutput(name, apply, self.min_move)
+        if self.running:
+            self._start_output(output)
+        return output
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.stop_event.clear()
+        for output in self.outputs.values():
+            self._start_output(output)
+
+    def stop(self):
+        self.running = False
+        self.stop_event.set()
+        for output in self.outputs.values():
+            if output.thread:
+                output.thread.join(2)
+                output.thread = None
+
+    def _start_output(self, output):
+        output.thread = threading.Thread(target=self._frame_loop, args=(output,),
+                                         name=f"markers-{output.name}", daemon=True)
+        output.thread.start()
+
+    def _frame_loop(self, output):
+        next_frame = time.monotonic()
+        while not self.stop_event.is_set():
+            self.frame(output.name)
+            next_frame += self.frame_interval
+            delay = next_frame - time.monotonic()
+            if delay < 0:
+                # Behind schedule - skip the missed frames instead of bursting to catch up
+                output.overruns += 1
+                if self.metrics:
+                    self.metrics.increment(f'markers.{output.name}.overruns')
+                next_frame = time.monotonic()
+                delay = 0
+            self.stop_event.wait(delay)
+
+    def frame(self, name):
+        """Diff and apply one frame for an output; returns the applied MarkerFrame or None"""
+        output = self.outputs[name]
+        map_value = self.config_manager.get_selected_map()
+        if not map_value:
+            return None
+        frame = output.markers.diff(map_value, self.targets(map_value))
+        if frame is None:
+            return None
+
+        start = time.perf_counter()
+        try:
+            applied = output.apply(frame)
+        except Exception as e:
+            print(f"[ERROR] Marker output '{name}' failed: {e}")
+            applied = False
+        if not applied:
+            output.markers.reset()  # Unknown output state - resend everything next frame
+            return None
+        output.markers.commit(frame)
+        output.frames += 1
+        if self.metrics:
+            self.metrics.observe(f'markers.{name}.frame_ms', (time.perf_counter() - start) * 1000.0)
+            self.metrics.increment('markers.changed', len(frame.changes))
+            self.metrics.set_gauge('markers.count', frame.count)
+        return frame
@@ -0,0 +1,129 @@
+"""
+Points of interest for Isle Map Updater
+Loads water, mud, nest and other spots per map from a local JSON file and
+answers nearest-neighbour queries through a uniform grid built at load time
+"""
+
+import heapq
+import json
+import math
+import os
+
+
+class PoiDatabase:
+    """POIs for all maps; file format:
+    {"<map value>": [{"name": "Lake", "type": "water", "x": 1.0, "y": 2.0, "z": 0.0}, ...], ...}"""
+
+    def __init__(self, poi_file="pois.json", cell_size=20_000.0):
+        self.poi_file = poi_file
+        self.cell_size = cell_size
+        self.maps = {}  # map value -> PoiIndex
+        self.load()
+
+    def load(self):
+        """Load the POI file and build one spatial index per map"""
+        self.maps = {}
+        try:
+            if os.path.exists(self.poi_file):
+                with open(self.poi_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for map_value, pois in data.items():
+                    self.maps[map_value] = PoiIndex(pois, self.cell_size)
+                total = sum(len(index) for index in self.maps.values())
+                print(f"[POI] Loaded {total} points of interest for {len(self.maps)} maps")
+        except Exception as e:
+            print(f"[ERROR] Failed to load points of interest: {e}")
+
+    def nearest(self, map_value, x, y, k=1, poi_type=None):
+        index = self.maps.get(map_value)
+        return index.nearest(x, y, k, poi_type) if index else []
+
+    def within_radius(self, map_value, x, y, radius, poi_type=None):
+        index = self.maps.get(map_value)
+        return index.within_radius(x, y, radius, poi_type) if index else []
+
+    def types(self, map_value):
+        index = self.maps.get(map_value)
+        return sorted(index.types) if index else []
+
+
+class PoiIndex:
+    """Uniform grid over one map's POIs"""
+
+    def __init__(self, pois, cell_size):
+        self.cell_size = cell_size
+        self.pois = [dict(poi, type=poi.get('type', 'other')) for poi in pois]
+        self.types = {poi['type'] for poi in self.pois}
+        self.grid = {}
+        for poi in self.pois:
+            self.grid.setdefault(self._cell(poi['x'], poi['y']), []).append(poi)
+
+        # Ring search never needs to go beyond the occupied cells
+        if self.grid:
+            cells_x = [cell[0] for cell in self.grid]
+            cells_y = [cell[1] for cell in self.grid]
+            self.bounds = (min(cells_x), max(cells_x), min(cells_y), max(cells_y))
+        else:
+            self.bounds = None
+
+    def __len__(self):
+        return len(self.pois)
+
+    def _cell(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def _ring(self, center_x, center_y, ring):
+        """Cells at Chebyshev distance `ring` from the center cell"""
+        if ring == 0:
+            yield center_x, center_y
+            return
+        for dx in range(-ring, ring + 1):
+            yield center_x + dx, center_y - ring
+            yield center_x + dx, center_y + ring
+        for dy in range(-ring + 1, ring):
+            yield center_x - ring, center_y + dy
+            yield center_x + ring, center_y + dy
+
+    def nearest(self, x, y, k=1, poi_type=None):
+        """k nearest POIs as (distance, poi), closest first"""
+        if not self.bounds:
+            return []
+        center_x, center_y = self._cell(x, y)
+        min_x, max_x, min_y, max_y = self.bounds
+        max_ring = max(abs(center_x - min_x), abs(center_x - max_x), abs(center_y - min_y), abs(center_y - max_y))
+
+        best = []  # max-heap of (-distance, counter, poi)
+        counter = 0
+        for ring in range(max_ring + 1):
+            for cell in self._ring(center_x, center_y, ring):
+                for poi in self.grid.get(cell, ()):
+                    if poi_type and poi['type'] != poi_type:
+                        continue
+                    distance = math.hypot(poi['x'] - x, poi['y'] - y)
+                    counter += 1
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, counter, poi))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, counter, poi))
+
+            # Everything in later rings is at least `ring * cell_size` away
+            if len(best) == k and -best[0][0] <= ring * self.cell_size:
+                break
+
+        return [(-negative, poi) for negative, _, poi in sorted(best, reverse=True)]
+
+    def within_radius(self, x, y, radius, poi_type=None):
+        """POIs within radius as (distance, poi), closest first"""
+        min_cell_x, min_cell_y = self._cell(x - radius, y - radius)
+        max_cell_x, max_cell_y = self._cell(x + radius, y + radius)
+        found = []
+        for cell_x in range(min_cell_x, max_cell_x + 1):
+            for cell_y in range(min_cell_y, max_cell_y + 1):
+                for poi in self.grid.get((cell_x, cell_y), ()):
+                    if poi_type and poi['type'] != poi_type:
+                        continue
+                    distance = math.hypot(poi['x'] - x, poi['y'] - y)
+                    if distance <= radius:
+                        found.append((distance, poi))
+        found.sort(key=lambda item: item[0])
+        return found
@@ -0,0 +1,329 @@
+"""
+Position history for Isle Map Updater
+Append-only SQLite (WAL) store of accepted positions with a time index and a
+uniform grid index on (x, y), plus the simplified trail of every session.
+Writes are queued and committed in batches by a background thread so the
+monitor loop never waits on disk.
+"""
+
+import math
+import queue
+import sqlite3
+import threading
+import time
+
+from trail_simplifier import TrailSimplifier
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    id      INTEGER PRIMARY KEY,
+    ts      REAL NOT NULL,
+    map     TEXT NOT NULL,
+    x       REAL NOT NULL,
+    y       REAL NOT NULL,
+    z       REAL NOT NULL,
+    fmt     TEXT,
+    cell_x  INTEGER NOT NULL,
+    cell_y  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_positions_map_ts ON positions (map, ts);
+CREATE INDEX IF NOT EXISTS idx_positions_map_cell ON positions (map, cell_x, cell_y);
+CREATE TABLE IF NOT EXISTS trail_points (
+    id        INTEGER PRIMARY KEY,
+    trail_id  INTEGER NOT NULL,
+    ts        REAL NOT NULL,
+    map       TEXT NOT NULL,
+    x         REAL NOT NULL,
+    y         REAL NOT NULL,
+    z         REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trail_points_map_ts ON trail_points (map, ts);
+"""
+
+INSERT_SQL = {
+    'positions': "INSERT INTO positions (ts, map, x, y, z, fmt, cell_x, cell_y) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    'trail_points': "INSERT INTO trail_points (trail_id, ts, map, x, y, z) VALUES (?, ?, ?, ?, ?, ?)",
+}
+
+
+class PositionHistory:
+    def __init__(self, db_file="position_history.db", cell_size=1000.0, batch_size=500,
+                 flush_interval=1.0, max_pending=100_000, store_raw=True, trail_tolerance=25.0,
+                 trail_gap=60.0, metrics=None):
+        self.db_file = db_file
+        self.cell_size = cell_size            # Grid cell edge in game units
+        self.batch_size = batch_size          # Positions per transaction
+        self.flush_interval = flush_interval  # Max seconds a row waits before commit
+        self.store_raw = store_raw            # Keep every position, not just the simplified trail
+        self.trail_tolerance = trail_tolerance  # None disables trail simplification
+        self.trail_gap = trail_gap            # Seconds without positions that start a new trail
+        self.metrics = metrics
+
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.writer_thread = None
+        self.running = False
+        self.dropped = 0
+
+        self.read_lock = threading.Lock()
+        self.read_connection = self._connect()
+        self.read_connection.executescript(SCHEMA)
+        self.read_connection.commit()
+
+        # Open trails per map (only touched by the recording thread, queries take trail_lock)
+        self.trail_lock = threading.Lock()
+        self.trails = {}  # map -> (trail_id, TrailSimplifier)
+        self.next_trail_id = (self.read_connection.execute(
+            "SELECT MAX(trail_id) FROM trail_points").fetchone()[0] or 0) + 1
+
+    def _connect(self):
+        connection = sqlite3.connect(self.db_file, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def cell_of(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    # --- writing -------------------------------------------------------------
+
+    def start(self):
+        """Start the background writer"""
+        if self.running:
+            return
+        self.running = True
+        self.writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.writer_thread.start()
+
+    def record(self, map_value, coords, fmt=None, timestamp=None):
+        """Queue one accepted position (never blocks the caller)"""
+        if not map_value or coords is None:
+            return False
+        x, y, z = coords
+        timestamp = timestamp if timestamp is not None else time.time()
+        rows = []
+        if self.trail_tolerance is not None:
+            rows.extend(self._extend_trail(map_value, (timestamp, x, y, z)))
+        if self.store_raw:
+            cell_x, cell_y = self.cell_of(x, y)
+            rows.append(('positions', (timestamp, map_value, x, y, z, fmt, cell_x, cell_y)))
+        return self._enqueue(rows) if rows else True
+
+    def _extend_trail(self, map_value, point):
+        """Feed the map's open trail; returns the trail_points rows that became final"""
+        with self.trail_lock:
+            trail_id, simplifier = self.trails.get(map_value, (None, None))
+            vertices = []
+            if simplifier is None or point[0] - simplifier.last[0] > self.trail_gap:
+                if simplifier is not None:
+                    vertices.extend((trail_id, vertex) for vertex in simplifier.flush())
+                trail_id, simplifier = self.next_trail_id, TrailSimplifier(self.trail_tolerance)
+                self.next_trail_id += 1
+                self.trails[map_value] = (trail_id, simplifier)
+            vertices.extend((trail_id, vertex) for vertex in simplifier.add(point))
+        return self._vertex_rows(map_value, vertices)
+
+    def _vertex_rows(self, map_value, vertices):
+        if vertices and self.metrics:
+            self.metrics.increment('history.trail_vertices', len(vertices))
+        return [('trail_points', (trail_id, ts, map_value, x, y, z)) for trail_id, (ts, x, y, z) in vertices]
+
+    def _enqueue(self, rows):
+        """Queue the rows produced by one position as a single entry"""
+        try:
+            self.pending.put_nowait(rows)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            if self.metrics:
+                self.metrics.increment('history.dropped')
+            return False
+
+    def _writer_loop(self):
+        connection = self._connect()
+        while self.running or not self.pending.empty():
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write_batch(connection, batch)
+        connection.close()
+
+    def _write_batch(self, connection, batch):
+        start = time.perf_counter()
+        rows = {}
+        for entry in batch:
+            for table, row in entry:
+                rows.setdefault(table, []).append(row)
+        try:
+            with connection:
+                for table, table_rows in rows.items():
+                    connection.executemany(INSERT_SQL[table], table_rows)
+        except Exception as e:
+            print(f"[ERROR] Failed to write position history: {e}")
+        finally:
+            for _ in batch:
+                self.pending.task_done()
+        if self.metrics:
+            self.metrics.observe('history.batch_ms', (time.perf_counter() - start) * 1000.0)
+            self.metrics.increment('history.rows', sum(len(table_rows) for table_rows in rows.values()))
+
+    def flush(self):
+        """Block until every queued position is committed"""
+        if self.running:
+            self.pending.join()
+
+    def close(self):
+        """Close the open trails, flush pending rows and stop the writer"""
+        with self.trail_lock:
+            open_trails, self.trails = self.trails, {}
+        for map_value, (trail_id, simplifier) in open_trails.items():
+            rows = self._vertex_rows(map_value, [(trail_id, vertex) for vertex in simplifier.flush()])
+            if rows:
+                self._enqueue(rows)
+        if self.running:
+            self.flush()
+            self.running = False
+            self.writer_thread.join(self.flush_interval + 5)
+        with self.read_lock:
+            self.read_connection.close()
+
+    # --- bulk import / export ------------------------------------------------
+
+    def allocate_trail_id(self):
+        """Reserve a fresh trail id (for imported trails)"""
+        with self.trail_lock:
+            trail_id = self.next_trail_id
+            self.next_trail_id += 1
+            return trail_id
+
+    def insert_many(self, rows, chunk_size=5000):
+        """Write (ts, map, x, y, z, fmt) rows from any iterable in chunked transactions;
+        returns the number of rows written"""
+        return self._insert_chunked(
+            rows, chunk_size, 'positions',
+            lambda row: (row[0], row[1], row[2], row[3], row[4], row[5]) + self.cell_of(row[2], row[3]))
+
+    def insert_trail_points(self, rows, chunk_size=5000):
+        """Write (trail_id, ts, map, x, y, z) rows from any iterable in chunked transactions"""
+        return self._insert_chunked(rows, chunk_size, 'trail_points', tuple)
+
+    def _insert_chunked(self, rows, chunk_size, table, to_row):
+        connection = self._connect()
+        written = 0
+        chunk = []
+        try:
+            for row in rows:
+                chunk.append(to_row(row))
+                if len(chunk) >= chunk_size:
+                    with connection:
+                        connection.executemany(INSERT_SQL[table], chunk)
+                    written += len(chunk)
+                    chunk = []
+            if chunk:
+                with connection:
+                    connection.executemany(INSERT_SQL[table], chunk)
+                written += len(chunk)
+        finally:
+            connection.close()
+        return written
+
+    def iter_positions(self, map_value=None, start_time=None, end_time=None, chunk_size=5000):
+        """Yield (ts, map, x, y, z, fmt) rows in time order without loading them all"""
+        sql, params = self._range_query("SELECT ts, map, x, y, z, fmt FROM positions",
+                                        map_value, start_time, end_time)
+        return self._iter_rows(sql + " ORDER BY map, ts", params, chunk_size)
+
+    def iter_trail_points(self, map_value=None, start_time=None, end_time=None, chunk_size=5000):
+        """Yield (trail_id, ts, map, x, y, z) vertices grouped by trail, oldest first"""
+        sql, params = self._range_query("SELECT trail_id, ts, map, x, y, z FROM trail_points",
+                                        map_value, start_time, end_time)
+        return self._iter_rows(sql + " ORDER BY map, trail_id, ts", params, chunk_size)
+
+    def _range_query(self, sql, map_value, start_time, end_time):
+        conditions, params = [], []
+        for clause, value in (("map = ?", map_value), ("ts >= ?", start_time), ("ts <= ?", end_time)):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return sql, params
+
+    def _iter_rows(self, sql, params, chunk_size):
+        # Own connection so a long export never holds read_lock
+        connection = self._connect()
+        try:
+            cursor = connection.execute(sql, params)
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                yield from chunk
+        finally:
+            connection.close()
+
+    # --- queries -------------------------------------------------------------
+
+    def positions_between(self, map_value, start_time, end_time, limit=None):
+        """(ts, x, y, z, fmt) rows on a map within [start_time, end_time], oldest first"""
+        sql = "SELECT ts, x, y, z, fmt FROM positions WHERE map = ? AND ts BETWEEN ? AND ? ORDER BY ts"
+        params = [map_value, start_time, end_time]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self.read_lock:
+            return self.read_connection.execute(sql, params).fetchall()
+
+    def visits_within(self, map_value, x, y, radius, start_time=None, end_time=None):
+        """(ts, x, y, z, fmt) rows on a map within radius of (x, y), using the grid index"""
+        min_cell_x, min_cell_y = self.cell_of(x - radius, y - radius)
+        max_cell_x, max_cell_y = self.cell_of(x + radius, y + radius)
+
+        sql = ("SELECT ts, x, y, z, fmt FROM positions "
+               "WHERE map = ? AND cell_x BETWEEN ? AND ? AND cell_y BETWEEN ? AND ? "
+               "AND (x - ?) * (x - ?) + (y - ?) * (y - ?) <= ?")
+        params = [map_value, min_cell_x, max_cell_x, min_cell_y, max_cell_y, x, x, y, y, radius * radius]
+        if start_time is not None:
+            sql += " AND ts >= ?"
+            params.append(start_time)
+        if end_time is not None:
+            sql += " AND ts <= ?"
+            params.append(end_time)
+        with self.read_lock:
+            return self.read_connection.execute(sql + " ORDER BY ts", params).fetchall()
+
+    def trail_between(self, map_value, start_time, end_time):
+        """(trail_id, ts, x, y, z) vertices of the simplified trails on a map, oldest first.
+        Includes the open end of the current trail so the latest position is never missing."""
+        with self.read_lock:
+            rows = self.read_connection.execute(
+                "SELECT trail_id, ts, x, y, z FROM trail_points WHERE map = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (map_value, start_time, end_time)).fetchall()
+        with self.trail_lock:
+            trail_id, simplifier = self.trails.get(map_value, (None, None))
+            last = simplifier.last if simplifier else None
+        if last and start_time <= last[0] <= end_time and (not rows or rows[-1][1] < last[0]):
+            rows.append((trail_id,) + tuple(last))
+        return rows
+
+    def trail_stats(self):
+        """Points fed to the open trails vs. vertices kept"""
+        with self.trail_lock:
+            points = sum(simplifier.points_in for _, simplifier in self.trails.values())
+            vertices = sum(simplifier.vertices_out for _, simplifier in self.trails.values())
+        return {'points': points, 'vertices': vertices, 'ratio': points / vertices if vertices else None}
+
+    def count(self, map_value=None):
+        with self.read_lock:
+            if map_value is None:
+                return self.read_connection.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+            return self.read_connection.execute(
+                "SELECT COUNT(*) FROM positions WHERE map = ?", (map_value,)).fetchone()[0]
@@ -0,0 +1,166 @@
+"""
+Opt-in profiling for Isle Map Updater
+Wraps the monitor, parser and browser methods with cProfile, stack sampling
+and tracemalloc snapshots for a bounded time window. Nothing is wrapped unless
+profiling is requested, so the normal code paths carry no overhead.
+"""
+
+import functools
+import io
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+PROFILE_ENV_VAR = "ISLE_PROFILE"
+
+
+def profiling_requested(argv=None):
+    """True if --profile was passed or ISLE_PROFILE is set to something other than 0/false"""
+    argv = sys.argv[1:] if argv is None else argv
+    if "--profile" in argv:
+        return True
+    return os.environ.get(PROFILE_ENV_VAR, "").strip().lower() not in ("", "0", "false", "no")
+
+
+class ProfilingSession:
+    def __init__(self, output_root="profiles", duration=60.0, sample_interval=0.005, snapshot_interval=10.0):
+        self.output_dir = os.path.join(output_root, time.strftime('%Y%m%d-%H%M%S'))
+        self.duration = duration                    # Length of the profiling window (seconds)
+        self.sample_interval = sample_interval      # Stack sampling period for long-running loops
+        self.snapshot_interval = snapshot_interval  # tracemalloc snapshot period
+
+        self.active = False
+        self.deadline = 0.0
+        self.wrapped = []           # (obj, name) pairs to restore afterwards
+        self.profiles = {}          # method name -> cProfile.Profile
+        self.profile_locks = {}     # method name -> lock (a Profile can only run once at a time)
+        self.sampled_threads = {}   # thread ident -> method name
+        self.stack_counts = Counter()
+        self.snapshot_count = 0
+        self.finished = threading.Event()
+
+    def instrument(self, obj, method_names, mode='profile'):
+        """Wrap methods on an instance. mode='profile' runs each call under cProfile,
+        mode='sample' samples the calling thread's stack (for loops that never return)"""
+        for name in method_names:
+            original = getattr(obj, name)
+            wrapper = self._make_sampled(name, original) if mode == 'sample' else self._make_profiled(name, original)
+            setattr(obj, name, wrapper)
+            self.wrapped.append((obj, name))
+
+    def _make_profiled(self, name, original):
+        import cProfile
+        self.profiles[name] = cProfile.Profile()
+        self.profile_locks[name] = threading.Lock()
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            lock = self.profile_locks[name]
+            if not self.active or not lock.acquire(blocking=False):
+                return original(*args, **kwargs)
+            try:
+                return self.profiles[name].runcall(original, *args, **kwargs)
+            except ValueError:
+                # Another profiler is active on this interpreter - run unprofiled
+                return original(*args, **kwargs)
+            finally:
+                lock.release()
+
+        return wrapper
+
+    def _make_sampled(self, name, original):
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            ident = threading.get_ident()
+            self.sampled_threads[ident] = name
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.sampled_threads.pop(ident, None)
+
+        return wrapper
+
+    def start(self):
+        """Begin the profiling window (once - later calls are ignored)"""
+        import tracemalloc
+        if self.active or self.finished.is_set():
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.active = True
+        self.deadline = time.monotonic() + self.duration
+        tracemalloc.start(25)
+        threading.Thread(target=self._run, daemon=True).start()
+        print(f"[PROFILE] Profiling for {self.duration:.0f}s, reports in {self.output_dir}")
+
+    def _run(self):
+        next_snapshot = time.monotonic() + self.snapshot_interval
+        while self.active and time.monotonic() < self.deadline:
+            self._sample_stacks()
+            if time.monotonic() >= next_snapshot:
+                self._write_snapshot()
+                next_snapshot += self.snapshot_interval
+            time.sleep(self.sample_interval)
+        self.stop()
+
+    def _sample_stacks(self):
+        frames = sys._current_frames()
+        for ident, name in list(self.sampled_threads.items()):
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stack_counts[f"{name};" + ";".join(reversed(stack))] += 1
+
+    def _write_snapshot(self):
+        import tracemalloc
+        self.snapshot_count += 1
+        snapshot = tracemalloc.take_snapshot()
+        path = os.path.join(self.output_dir, f"memory_{self.snapshot_count:03d}.txt")
+        with open(path, 'w') as f:
+            current, peak = tracemalloc.get_traced_memory()
+            f.write(f"current={current / 1024:.1f} KiB peak={peak / 1024:.1f} KiB\n\n")
+            for stat in snapshot.statistics('lineno')[:50]:
+                f.write(f"{stat}\n")
+
+    def stop(self):
+        """End the window, restore the original methods and write all reports"""
+        import pstats
+        import tracemalloc
+
+        if not self.active:
+            return
+        self.active = False
+
+        for obj, name in self.wrapped:
+            try:
+                delattr(obj, name)  # Falls back to the class method again
+            except AttributeError:
+                pass
+        self.wrapped = []
+
+        self._write_snapshot()
+        tracemalloc.stop()
+
+        for name, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+            text = io.StringIO()
+            try:
+                pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(30)
+            except TypeError:
+                text.write("(no calls recorded)\n")
+            with open(os.path.join(self.output_dir, f"{name}.txt"), 'w') as f:
+                f.write(text.getvalue())
+
+        # Collapsed stacks, one "frame;frame;... count" line each (flamegraph.pl compatible)
+        with open(os.path.join(self.output_dir, "samples_collapsed.txt"), 'w') as f:
+            for stack, count in self.stack_counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+        print(f"[PROFILE] Reports written to {self.output_dir}")
+        self.finished.set()
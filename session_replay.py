@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Clipboard session recording and replay for Isle Map Updater
+With clipboard_record_file set, every clipboard change the monitor sees is
+written to a compact JSON-lines file (gzip-compressed if it ends with .gz),
+together with its time and what the pipeline made of it. Replaying feeds the
+same changes through the monitor's logic, the parser and the sinks again -
+in real time, faster, or as fast as possible - using a stand-in clipboard and
+the local vulnona fixture, and reports throughput and latency. --verify fails
+if any change now produces different coordinates than when it was recorded.
+
+    python session_replay.py sessions/20250101-200000.jsonl.gz
+    python session_replay.py session.jsonl.gz --fast --verify
+    python session_replay.py session.jsonl.gz --speed 4 --browser none
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from history_export import open_text
+
+
+FORMAT_VERSION = 1
+
+
+class SessionRecorder:
+    """Appends clipboard changes to a session file (clipboard monitor thread)"""
+
+    def __init__(self, path, map_value=None, settings=None, redact=True, flush_interval=1.0):
+        self.path = path
+        self.redact = redact                  # Text that was not a position is stored as its length only
+        self.flush_interval = flush_interval  # Seconds between flushes (a crash loses at most this much)
+        self.start_ns = time.monotonic_ns()
+        self.last_flush = time.monotonic()
+        self.events = 0
+        self.lock = threading.Lock()
+        self.file = open_text(path, 'w')
+        self._write({
+            'version': FORMAT_VERSION,
+            'started': time.time(),
+            'map': map_value,
+            'settings': settings or {},  # Filter settings the results depend on
+        })
+        print(f"[RECORD] Recording clipboard session to {path}")
+
+    def record(self, text, result, coords=None, timestamp_ns=None):
+        """One clipboard change: [ms since start, text (or its length), result, coordinates sent]"""
+        timestamp_ns = timestamp_ns if timestamp_ns is not None else time.monotonic_ns()
+        elapsed_ms = round((timestamp_ns - self.start_ns) / 1_000_000.0, 1)
+        if self.redact and result == 'no_match':
+            text = len(text)  # Passwords and chat are copied too - never keep them
+        with self.lock:
+            if self.file is None:
+                return
+            self._write([elapsed_ms, text, result, coords])
+            self.events += 1
+            now = time.monotonic()
+            if now - self.last_flush >= self.flush_interval:
+                self.file.flush()
+                self.last_flush = now
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+                print(f"[RECORD] Saved {self.events} clipboard changes to {self.path}")
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':'), ensure_ascii=False) + "\n")
+
+
+def read_session(path):
+    """Header dict and the list of [ms, text, result, coords] events of a session file"""
+    events = []
+    with open_text(path, 'r') as f:
+        header = json.loads(f.readline())
+        if header.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported session file version: {header.get('version')}")
+        try:
+            for line in f:
+                if line.strip():
+                    events.append(json.loads(line))
+        except (EOFError, ValueError):
+            # The app was killed mid-write - keep everything before the damaged tail
+            print(f"[REPLAY] {path} ends early - replaying the first {len(events)} changes")
+    return header, events
+
+
+def redacted_text(index, length):
+    """Stand-in for text that was not recorded; never a position, and different from its neighbours"""
+    return f"redacted clipboard #{index} ({length} chars)"
+
+
+class ReplayClipboard:
+    """Stand-in clipboard backend: paste() returns whatever was copied last"""
+
+    def __init__(self, text=""):
+        self.text = text
+
+    def copy(self, text):
+        self.text = text
+
+    def paste(self):
+        return self.text
+
+
+class SessionReplayer:
+    def __init__(self, updater, speed=1.0):
+        self.updater = updater
+        self.speed = speed  # 1.0 = real time, 4.0 = four times faster, None = as fast as possible
+        self.clipboard = ReplayClipboard()
+        updater.clipboard = self.clipboard
+
+    def replay(self, events):
+        """Copy each recorded change and run one monitor step for it, in order.
+        Returns the monitor's (result, coordinates sent) per event, the step times (ms)
+        and the elapsed seconds"""
+        outcomes = []
+        step_ms = []
+        start = time.perf_counter()
+        for index, (elapsed_ms, text, _, _) in enumerate(events):
+            if self.speed:
+                delay = start + elapsed_ms / 1000.0 / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            self.clipboard.copy(text if isinstance(text, str) else redacted_text(index, text))
+            step_start = time.perf_counter()
+            outcomes.append(self.updater.poll_clipboard())
+            step_ms.append((time.perf_counter() - step_start) * 1000.0)
+        return outcomes, step_ms, time.perf_counter() - start
+
+
+def verify(events, outcomes):
+    """Events whose result or coordinates differ from the recording: (index, expected, actual)"""
+    mismatches = []
+    for index, (event, outcome) in enumerate(zip(events, outcomes)):
+        expected = (event[2], event[3])
+        actual = tuple(outcome) if outcome else (None, None)
+        if actual != expected:
+            mismatches.append((index, expected, actual))
+    return mismatches
+
+
+def create_updater(header, config_file="map_config.json", history=False):
+    """Headless IsleMapUpdater with the recorded map and filter settings, fed only by the replay"""
+    from config_manager import ConfigManager
+    from isle_map_updater import IsleMapUpdater  # Deferred: the app imports this module for recording
+
+    config_manager = ConfigManager(config_file)
+    config_manager.settings.update({
+        'clipboard_input': False,  # The replay drives the monitor steps itself
+        'clipboard_record_file': None,
+        'ingest_port': None,
+        'log_tail_file': None,
+        'lan_share': False,
+        'bounds_auto_calibrate': False,  # Replayed or synthetic positions must not narrow the real bounds
+    })
+    if not history:
+        config_manager.settings['history_file'] = None
+    config_manager.settings.update(header.get('settings', {}))
+    config_manager.selected_map = header.get('map') or config_manager.get_selected_map()
+    if not config_manager.selected_map:
+        raise ValueError("Session has no map and no default map is saved")
+    return IsleMapUpdater(headless=True, config_manager=config_manager)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the pipeline's per-position log lines without keeping them in memory"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def start_pipeline(header, browser='fixture', config_file="map_config.json", history=False):
+    """Monitoring headless updater, with the vulnona fixture (fake driver or Chrome) or no browser.
+    Returns (updater, fixture or None)"""
+    from benchmark_browser import create_browser_manager
+    from vulnona_fixture import VulnonaFixture
+
+    fixture = None
+    with quiet():
+        updater = create_updater(header, config_file, history)
+        if browser != 'none':
+            fixture = VulnonaFixture().start()
+            updater.browser_manager = create_browser_manager(fixture, use_chrome=browser == 'chrome')
+            updater.browser_manager.setup_browser()
+            updater.browser_manager.select_map(updater.config_manager.get_selected_map())
+        updater.start_monitoring()
+    return updater, fixture
+
+
+def stop_pipeline(updater, fixture):
+    """Let every sink finish what was queued, then shut everything down"""
+    with quiet():
+        updater.sinks.stop(timeout=10.0)
+        updater.stop()
+    if fixture:
+        fixture.stop()
+
+
+def replay_session(path, speed=1.0, browser='fixture', config_file="map_config.json", history=False):
+    """Replay a session file through a fresh pipeline; returns a dict of results"""
+    header, events = read_session(path)
+    updater, fixture = start_pipeline(header, browser, config_file, history)
+    try:
+        with quiet():
+            outcomes, step_ms, elapsed = SessionReplayer(updater, speed).replay(events)
+    finally:
+        stop_pipeline(updater, fixture)
+
+    return {
+        'header': header,
+        'events': events,
+        'outcomes': outcomes,
+        'step_ms': step_ms,
+        'elapsed': elapsed,
+        'sinks': updater.sinks.stats(),
+        'trace_total_ms': updater.metrics.get_histogram('trace.total_ms'),
+        'positions_shown': fixture.get_state()['position_count'] if fixture else None,
+        'mismatches': verify(events, outcomes),
+    }
+
+
+def main():
+    from benchmark_browser import report
+
+    parser = argparse.ArgumentParser(description="Replay a recorded clipboard session")
+    parser.add_argument("session", help="Session file written with clipboard_record_file")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed (1 = real time)")
+    parser.add_argument("--fast", action="store_true", help="As fast as possible")
+    parser.add_argument("--browser", choices=("fixture", "chrome", "none"), default="fixture",
+                        help="Local vulnona stand-in with the fake driver, with real Chrome, or no browser")
+    parser.add_argument("--config", default="map_config.json", help="Settings to replay with")
+    parser.add_argument("--history", action="store_true", help="Also record into the position history")
+    parser.add_argument("--verify", action="store_true", help="Fail if any coordinates differ from the recording")
+    args = parser.parse_args()
+
+    print("ISLE MAP UPDATER - SESSION REPLAY")
+    print("=" * 70)
+    result = replay_session(args.session, None if args.fast else args.speed, args.browser,
+                            args.config, args.history)
+    events, elapsed = len(result['events']), result['elapsed']
+    results = Counter(outcome[0] if outcome else 'unchanged_text' for outcome in result['outcomes'])
+    print(f"Map '{result['header'].get('map')}', {events} clipboard changes in {elapsed:.2f} s "
+          f"({events / elapsed if elapsed else 0:,.0f}/s)")
+    print("Results: " + ", ".join(f"{name} {count}" for name, count in results.most_common()))
+    report("monitor step", result['step_ms'])
+    trace = result['trace_total_ms']
+    if trace:
+        print(f"{'end-to-end':<18} n={trace['count']:<5} p50={trace['p50']:8.2f} ms  "
+              f"p95={trace['p95']:8.2f} ms  p99={trace['p99']:8.2f} ms")
+    for name, stats in result['sinks'].items():
+        print(f"[SINK] {name}: {stats['handled']} handled, {stats['coalesced']} coalesced, "
+              f"{stats['dropped']} dropped")
+    if result['positions_shown'] is not None:
+        print(f"[BROWSER] Fixture showed {result['positions_shown']} positions")
+
+    mismatches = result['mismatches']
+    if mismatches:
+        print(f"[VERIFY] {len(mismatches)} changes differ from the recording:")
+        for index, expected, actual in mismatches[:20]:
+            print(f"  #{index} at {result['events'][index][0] / 1000.0:.1f} s: recorded {expected}, now {actual}")
+    else:
+        print("[VERIFY] All coordinates match the recording")
+    if args.verify and mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
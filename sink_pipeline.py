@@ -0,0 +1,183 @@
+"""
+Sink pipeline for Isle Map Updater
+Fans every accepted position out to independent sinks (browser, history,
+local map, ...). Each sink has its own bounded queue, drop policy and worker
+thread, so a slow or hung sink never delays the others.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+# Drop policies when a sink's queue is full
+LATEST_WINS = 'latest'       # Replace whatever is waiting (only the newest position matters)
+DROP_OLDEST = 'drop_oldest'  # Keep the newest maxsize positions
+BLOCK = 'block'              # Make the dispatcher wait (nothing is lost, but it can stall dispatch)
+POLICIES = (LATEST_WINS, DROP_OLDEST, BLOCK)
+
+
+class PositionUpdate:
+    """One accepted position on its way to the sinks"""
+
+    __slots__ = ('map_value', 'raw_coords', 'coords', 'fmt', 'trace', 'dispatched_ns')
+
+    def __init__(self, map_value, raw_coords, coords, fmt=None, trace=None):
+        self.map_value = map_value
+        self.raw_coords = raw_coords  # Normalized "x, y, z" string (what vulnona expects)
+        self.coords = coords          # Numeric (x, y, z)
+        self.fmt = fmt
+        self.trace = trace
+        self.dispatched_ns = None
+
+
+class SinkWorker:
+    def __init__(self, name, handler, policy=LATEST_WINS, maxsize=1, block_timeout=None, metrics=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy}")
+        self.name = name
+        self.handler = handler              # Called with a PositionUpdate on the worker thread
+        self.policy = policy
+        self.maxsize = max(1, maxsize)
+        self.block_timeout = block_timeout  # BLOCK only: give up (and drop) after this many seconds
+        self.metrics = metrics
+
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.handled = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"sink-{self.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=2.0):
+        """Let the worker finish what is queued (up to timeout) and exit"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def put(self, update):
+        """Queue an update according to the drop policy; False if it was dropped"""
+        with self.condition:
+            if len(self.queue) >= self.maxsize:
+                if self.policy == LATEST_WINS:
+                    self.queue.popleft()
+                    self._count('coalesced')
+                elif self.policy == DROP_OLDEST:
+                    self.queue.popleft()
+                    self._count('dropped')
+                else:
+                    deadline = None if self.block_timeout is None else time.monotonic() + self.block_timeout
+                    while len(self.queue) >= self.maxsize and self.running:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self._count('dropped')
+                            return False
+                        self.condition.wait(remaining)
+            self.queue.append(update)
+            self.condition.notify_all()
+            return True
+
+    def _count(self, what):
+        setattr(self, what, getattr(self, what) + 1)
+        if self.metrics:
+            self.metrics.increment(f'sink.{self.name}.{what}')
+            if what == 'coalesced':
+                self.metrics.increment('updates.coalesced')
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.queue and self.running:
+                    self.condition.wait()
+                if not self.queue:
+                    return
+                update = self.queue.popleft()
+                self.condition.notify_all()  # Wakes a blocked dispatcher
+
+            start_ns = time.monotonic_ns()
+            try:
+                self.handler(update)
+            except Exception as e:
+                self.errors += 1
+                print(f"[ERROR] Sink '{self.name}' failed: {e}")
+            self.handled += 1
+            if self.metrics:
+                if update.dispatched_ns is not None:
+                    self.metrics.observe(f'sink.{self.name}.lag_ms', (start_ns - update.dispatched_ns) / 1_000_000.0)
+                self.metrics.observe(f'sink.{self.name}.ms', (time.monotonic_ns() - start_ns) / 1_000_000.0)
+
+    def stats(self):
+        with self.condition:
+            queued = len(self.queue)
+        return {
+            'policy': self.policy,
+            'queued': queued,
+            'handled': self.handled,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'errors': self.errors,
+        }
+
+
+class SinkPipeline:
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.workers = {}  # name -> SinkWorker, in registration order
+        self.running = False
+
+    def register(self, name, handler, policy=LATEST_WINS, maxsize=1, block_timeout=None):
+        """Add a sink; registering an existing name replaces it"""
+        worker = SinkWorker(name, handler, policy, maxsize, block_timeout, self.metrics)
+        old = self.workers.pop(name, None)
+        if old:
+            old.stop()
+        self.workers[name] = worker
+        if self.running:
+            worker.start()
+        return worker
+
+    def unregister(self, name):
+        worker = self.workers.pop(name, None)
+        if worker:
+            worker.stop()
+
+    def start(self):
+        self.running = True
+        for worker in self.workers.values():
+            worker.start()
+
+    def stop(self, timeout=2.0):
+        """Stop all sinks, giving each up to timeout to drain"""
+        self.running = False
+        for worker in list(self.workers.values()):
+            worker.stop(timeout)
+
+    def dispatch(self, update):
+        """Hand an update to every sink (returns without waiting for any sink unless one uses BLOCK)"""
+        update.dispatched_ns = time.monotonic_ns()
+        if update.trace:
+            update.trace.mark('enqueue', update.dispatched_ns)
+        for worker in list(self.workers.values()):
+            worker.put(update)
+        if self.metrics:
+            self.metrics.increment('updates.dispatched')
+
+    def stats(self):
+        """Per-sink queue depth, counts and lag percentiles"""
+        stats = {}
+        for name, worker in list(self.workers.items()):
+            stats[name] = worker.stats()
+            if self.metrics:
+                stats[name]['lag_ms'] = self.metrics.get_histogram(f'sink.{name}.lag_ms')
+        return stats
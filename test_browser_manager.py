@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Test Suite for BrowserManager against the local vulnona stand-in
+Covers map discovery, the tab pool, position updates and watchdog recovery
+"""
+
+import contextlib
+import io
+import threading
+import time
+
+from browser_manager import BrowserManager
+from browser_watchdog import BrowserWatchdog
+from metrics_registry import MetricsRegistry
+from vulnona_fixture import VulnonaFixture, FakeWebDriver
+
+def create_browser_manager(fixture):
+    """BrowserManager on the fixture with the fake driver and no fixed waits"""
+    browser_manager = BrowserManager(vulnova_url=fixture.url, driver_factory=FakeWebDriver)
+    browser_manager.page_load_wait = 0
+    browser_manager.popup_close_wait = 0
+    browser_manager.map_load_wait = 0
+    return browser_manager
+
+def test_discovery_and_tab_pool():
+    """Test map filtering, pooled tab switching and LRU eviction"""
+    fixture = VulnonaFixture().start()
+    browser_manager = create_browser_manager(fixture)
+    browser_manager.max_map_tabs = 2
+
+    print("=== TESTING DISCOVERY AND TAB POOL ===")
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.setup_browser()
+            maps = browser_manager.get_available_maps()
+            browser_manager.select_map("gateway")
+            browser_manager.select_map("spiro")
+            loads_before_switch = fixture.get_state()['page_loads']
+            browser_manager.select_map("gateway")
+            loads_after_switch = fixture.get_state()['page_loads']
+            browser_manager.select_map("test_map")
+            browser_manager.update_map_position("88,879.526, -288,696.11, 21,112.882")
+
+        state = fixture.get_state()
+        checks = [
+            ([m['value'] for m in maps] == ["gateway", "spiro", "test_map"], "Outdated and PoT maps filtered"),
+            (loads_after_switch == loads_before_switch, "Switching to a pooled map loads nothing"),
+            (list(browser_manager.map_tabs) == ["gateway", "test_map"], "Least recently used tab evicted"),
+            (len(browser_manager.driver.window_handles) == 2, "Evicted tab closed"),
+            (browser_manager.active_map == "test_map", "Active map tracked"),
+            (state['last_position'] == "88,879.526, -288,696.11, 21,112.882", "Update sent to active tab"),
+        ]
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.stop()
+        fixture.stop()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_tab_pool_memory_budget():
+    """Test that the memory budget evicts tabs before the tab limit and lost tabs are reopened"""
+    fixture = VulnonaFixture().start()
+    browser_manager = create_browser_manager(fixture)
+    browser_manager.max_map_tabs = 5
+    browser_manager.estimated_tab_memory_mb = 250  # The fake driver has no processes to measure
+    browser_manager.tab_memory_budget_mb = 600
+
+    print("=== TESTING TAB POOL MEMORY BUDGET ===")
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.setup_browser()
+            browser_manager.select_map("gateway")
+            loads_first = fixture.get_state()['page_loads']
+            browser_manager.select_map("spiro")
+            loads_second = fixture.get_state()['page_loads']
+            tabs_within_budget = list(browser_manager.map_tabs)
+            browser_manager.select_map("test_map")
+            tabs_over_budget = list(browser_manager.map_tabs)
+            memory_mb = browser_manager.get_browser_memory_mb()
+
+            # A tab closed behind the pool's back is reloaded instead of switched to
+            browser_manager.driver.switch_to.window(browser_manager.map_tabs["spiro"])
+            browser_manager.driver.close()
+            browser_manager.driver.switch_to.window(browser_manager.map_tabs["test_map"])
+            reopened = browser_manager.select_map("spiro")
+
+        checks = [
+            (loads_second == loads_first + 1, "Second map opened in a new tab"),
+            (tabs_within_budget == ["gateway", "spiro"], "Tabs kept while within the budget"),
+            (tabs_over_budget == ["spiro", "test_map"], "Least recently used tab evicted over the budget"),
+            (memory_mb <= browser_manager.tab_memory_budget_mb, "Pool back within the budget"),
+            (reopened and list(browser_manager.map_tabs) == ["test_map", "spiro"], "Lost tab reopened"),
+            (len(browser_manager.driver.window_handles) == 2, "Open windows match the pool"),
+        ]
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.stop()
+        fixture.stop()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_failed_selection_keeps_active_tab():
+    """Test that a map that fails to load leaves no tab behind and updates go to the active map's tab"""
+    fixture = VulnonaFixture().start()
+    browser_manager = create_browser_manager(fixture)
+
+    def typed(handle):
+        document = browser_manager.driver.windows[handle]["document"]
+        return document.find_element("id", "current_pos").attrs.get("value")
+
+    print("=== TESTING FAILED MAP SELECTION ===")
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.setup_browser()
+            browser_manager.select_map("gateway")
+            browser_manager.select_map("spiro")
+            failed = browser_manager.select_map("no_such_map")  # Radio button missing in the new tab
+            windows_after_failure = len(browser_manager.driver.window_handles)
+            browser_manager.update_map_position("1,000.0, 2,000.0, 300.0")
+
+            # Something else left another pooled tab current
+            browser_manager.driver.switch_to.window(browser_manager.map_tabs["gateway"])
+            browser_manager.update_map_position("4,000.0, 5,000.0, 600.0")
+
+        checks = [
+            (not failed and browser_manager.active_map == "spiro", "Failed selection keeps the active map"),
+            (windows_after_failure == 2 and list(browser_manager.map_tabs) == ["gateway", "spiro"],
+             "Tab opened for the failed map closed"),
+            (typed(browser_manager.map_tabs["spiro"]) == "4,000.0, 5,000.0, 600.0",
+             "Updates go to the active map's tab"),
+            (not typed(browser_manager.map_tabs["gateway"]), "Other pooled tab untouched"),
+        ]
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.stop()
+        fixture.stop()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_page_ack_wait_releases_lock():
+    """Test that waiting for the page acknowledgement does not hold the driver lock"""
+    from latency_tracer import LatencyTracer
+
+    fixture = VulnonaFixture().start()
+    browser_manager = create_browser_manager(fixture)
+    browser_manager.ack_selector = "input[type='submit']"  # Never changes - the wait runs to its timeout
+    browser_manager.ack_timeout = 0.5
+    tracer = LatencyTracer(MetricsRegistry())
+    lock_waits = []
+
+    def other_thread():
+        time.sleep(0.1)  # Let the update reach its acknowledgement wait
+        start = time.perf_counter()
+        with browser_manager.driver_lock:
+            lock_waits.append(time.perf_counter() - start)
+
+    print("=== TESTING PAGE ACK WAIT ===")
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.setup_browser()
+            browser_manager.select_map("gateway")
+            thread = threading.Thread(target=other_thread)
+            thread.start()
+            update_start = time.perf_counter()
+            success = browser_manager.update_map_position("1,000.0, 2,000.0, 300.0", tracer.start('clipboard_read'))
+            update_seconds = time.perf_counter() - update_start
+            thread.join()
+
+        checks = [
+            (success and update_seconds >= 0.5, "Update waited for the acknowledgement"),
+            (lock_waits and lock_waits[0] < 0.1, "Other driver commands ran during the wait"),
+        ]
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.stop()
+        fixture.stop()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+class WatchdogApp:
+    """Just enough of IsleMapUpdater for the watchdog"""
+
+    class Config:
+        def get_selected_map(self):
+            return "spiro"
+
+    def __init__(self, browser_manager):
+        self.browser_manager = browser_manager
+        self.metrics = MetricsRegistry()
+        self.config_manager = self.Config()
+        self.latest_raw_coords = "1,000.0, 2,000.0, 300.0"
+
+    def log_to_gui(self, message):
+        pass
+
+    def replay_latest_coordinates(self):
+        self.browser_manager.update_map_position(self.latest_raw_coords)
+
+def test_watchdog_recovery():
+    """Test that a crashed browser is relaunched, the map restored and the position replayed"""
+    fixture = VulnonaFixture().start()
+    browser_manager = create_browser_manager(fixture)
+    app = WatchdogApp(browser_manager)
+    watchdog = BrowserWatchdog(app, check_interval=0.05)
+
+    print("=== TESTING WATCHDOG RECOVERY ===")
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.setup_browser()
+            browser_manager.select_map("gateway")
+            watchdog.start()
+            browser_manager.driver.crash()
+            deadline = time.time() + 5
+            while app.metrics.get_counter('browser.recoveries') == 0 and time.time() < deadline:
+                time.sleep(0.05)
+            time.sleep(0.1)
+            watchdog.stop()
+
+        state = fixture.get_state()
+        checks = [
+            (app.metrics.get_counter('browser.sessions_lost') == 1, "Dead session detected"),
+            (app.metrics.get_histogram('browser.recovery_ms') is not None, "Recovery time recorded"),
+            (browser_manager.active_map == "spiro", "Saved map restored"),
+            (state['last_position'] == app.latest_raw_coords, "Latest position replayed"),
+        ]
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.stop()
+        fixture.stop()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_watchdog_stale_session():
+    """Test that a probe hanging past its timeout counts as stale and recover() runs every step in order"""
+    fixture = VulnonaFixture().start()
+    browser_manager = create_browser_manager(fixture)
+    app = WatchdogApp(browser_manager)
+    watchdog = BrowserWatchdog(app, check_interval=0.05, probe_timeout=0.2)
+    steps = []
+
+    def record(name, method):
+        def wrapper(*args):
+            steps.append(name)
+            return method(*args)
+        return wrapper
+
+    print("=== TESTING WATCHDOG STALE SESSION ===")
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.setup_browser()
+            browser_manager.select_map("gateway")
+            alive_before = watchdog.check_health()
+
+            release = threading.Event()
+            browser_manager.is_alive = lambda: release.wait(5) and False  # Hung session
+            probe_start = time.perf_counter()
+            healthy = watchdog.check_health()
+            probe_seconds = time.perf_counter() - probe_start
+            release.set()
+            del browser_manager.is_alive
+
+            for name in ('abandon_driver', 'setup_browser', 'select_map'):
+                setattr(browser_manager, name, record(name, getattr(browser_manager, name)))
+            app.replay_latest_coordinates = record('replay', app.replay_latest_coordinates)
+            recovered = watchdog.recover()
+
+        state = fixture.get_state()
+        checks = [
+            (alive_before, "Live session passes the probe"),
+            (not healthy and probe_seconds < 1.0, "Hung probe reported stale after its timeout"),
+            (recovered and steps == ['abandon_driver', 'setup_browser', 'select_map', 'replay'],
+             "Abandon, relaunch, restore map, replay - in order"),
+            (browser_manager.active_map == "spiro", "Saved map restored"),
+            (state['last_position'] == app.latest_raw_coords, "Latest position replayed"),
+            (app.metrics.get_counter('browser.recoveries') == 1 and not watchdog.recovering, "Recovery counted"),
+        ]
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.stop()
+        fixture.stop()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_watchdog_recovery_with_stuck_update():
+    """Test that recover() waits for an update stuck on the hung session and survives a hanging quit()"""
+    fixture = VulnonaFixture().start()
+    browser_manager = create_browser_manager(fixture)
+    app = WatchdogApp(browser_manager)
+    watchdog = BrowserWatchdog(app, check_interval=0.05, probe_timeout=0.2)
+    events = []
+
+    print("=== TESTING WATCHDOG RECOVERY WITH STUCK UPDATE ===")
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.setup_browser()
+            browser_manager.select_map("gateway")
+            old_driver = browser_manager.driver
+            quit_called = threading.Event()
+            quit_hang = threading.Event()
+
+            def hanging_quit():
+                events.append('quit')
+                quit_called.set()
+                quit_hang.wait(5)  # Never answers while the test runs
+
+            old_driver.quit = hanging_quit
+            update_holding_lock = threading.Event()
+
+            def stuck_update():
+                # An update hung in a command against the dead browser until quit() kills it
+                with browser_manager.driver_lock:
+                    update_holding_lock.set()
+                    quit_called.wait(5)
+                    events.append('update failed')
+
+            update_thread = threading.Thread(target=stuck_update, daemon=True)
+            update_thread.start()
+            update_holding_lock.wait(5)
+
+            recover_start = time.perf_counter()
+            recovered = watchdog.recover()
+            recover_seconds = time.perf_counter() - recover_start
+            update_thread.join(5)
+            quit_hang.set()
+
+        checks = [
+            (events == ['quit', 'update failed'], "Old session quit without waiting for the lock"),
+            (recovered and recover_seconds < 2.0, "Hanging quit() given up after the probe timeout"),
+            (browser_manager.driver is not old_driver and browser_manager.active_map == "spiro",
+             "New session swapped in with the saved map"),
+            (list(browser_manager.map_tabs) == ["spiro"], "Tab pool holds only new-session tabs"),
+        ]
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.stop()
+        fixture.stop()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_discovery_and_tab_pool()
+    test_tab_pool_memory_budget()
+    test_failed_selection_keeps_active_tab()
+    test_page_ack_wait_releases_lock()
+    test_watchdog_recovery()
+    test_watchdog_stale_session()
+    test_watchdog_recovery_with_stuck_update()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the GUI's periodic work
+Drives the log queue drain and the performance panel refresh against stub
+widgets, so no display is needed
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from gui_manager import GUIManager
+
+class StubTk:
+    """Records after() callbacks instead of running a Tk event loop"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay_ms, callback):
+        self.scheduled.append((delay_ms, callback))
+
+class StubText:
+    """Just enough of tk.Text: insert at the end, line index, delete leading lines"""
+
+    def __init__(self):
+        self.content = ""
+
+    def insert(self, index, text):
+        self.content += text
+
+    def index(self, index):
+        lines = self.content.split("\n")
+        return f"{len(lines)}.{len(lines[-1])}"
+
+    def delete(self, start, end):
+        first_kept = int(end.split('.')[0])
+        self.content = "\n".join(self.content.split("\n")[first_kept - 1:])
+
+    def see(self, index):
+        pass
+
+    def lines(self):
+        return self.content.split("\n")[:-1]
+
+class StubLabel:
+    def __init__(self):
+        self.text = "-"
+
+    def config(self, text):
+        self.text = text
+
+class StubApp:
+    class Config:
+        def __init__(self, settings):
+            self.settings = settings
+
+        def get_setting(self, key):
+            return self.settings.get(key)
+
+        def get_selected_map(self):
+            return "gateway"
+
+    def __init__(self, **settings):
+        self.config_manager = self.Config(settings)
+        self.lan = None
+
+def create_gui_manager(**settings):
+    gui_manager = GUIManager(StubApp(**settings))
+    gui_manager.gui = StubTk()
+    gui_manager.status_text = StubText()
+    return gui_manager
+
+def test_log_queue_and_trimming():
+    """Test the bounded log queue, batched drains and trimming to max_log_lines"""
+    gui_manager = create_gui_manager(max_log_lines=5)
+
+    print("=== TESTING LOG QUEUE ===")
+
+    for i in range(12):
+        gui_manager.log_to_gui(f"line {i}")  # Burst before the first drain
+    queued = list(gui_manager.log_queue)
+    gui_manager.drain_log_queue()
+    after_burst = gui_manager.status_text.lines()
+
+    gui_manager.log_to_gui("line 12")
+    gui_manager.log_to_gui("line 13")
+    gui_manager.drain_log_queue()
+    after_more = gui_manager.status_text.lines()
+    gui_manager.drain_log_queue()  # Nothing queued - widget untouched
+    after_idle = gui_manager.status_text.lines()
+
+    scheduled = gui_manager.gui.scheduled
+    checks = [
+        (queued == [f"line {i}" for i in range(7, 12)], "Queue keeps only the newest max_log_lines"),
+        (after_burst == queued, "Queued lines written in one batch"),
+        (after_more == [f"line {i}" for i in range(9, 14)], "Oldest lines trimmed from the widget"),
+        (after_idle == after_more and not gui_manager.log_queue, "Empty drain changes nothing"),
+        (len(scheduled) == 3 and all(delay == 100 and callback == gui_manager.drain_log_queue
+                                     for delay, callback in scheduled), "Drain rescheduled every 100 ms"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_performance_panel_refresh():
+    """Test the 1 Hz panel refresh, including clipboard detection latency from the monitor step"""
+    from isle_map_updater import IsleMapUpdater
+    from session_replay import ReplayClipboard
+
+    previous = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+
+    print("=== TESTING PERFORMANCE PANEL ===")
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            updater = IsleMapUpdater(headless=True, clipboard=ReplayClipboard())
+            updater.config_manager.selected_map = "gateway"
+            gui_manager = GUIManager(updater)
+            gui_manager.gui = StubTk()
+            gui_manager.perf_labels = {key: StubLabel() for key in
+                                       ('clipboard', 'parse', 'browser', 'throughput', 'skipped', 'process', 'sinks')}
+
+            gui_manager.refresh_performance_panel()
+            before = {key: label.text for key, label in gui_manager.perf_labels.items()}
+
+            updater.poll_clipboard()  # Nothing copied yet
+            time.sleep(0.05)
+            updater.clipboard.copy("88,879.526, -288,696.11, 21,112.882")
+            updater.poll_clipboard()
+            updater.metrics.increment('updates.out_of_bounds')
+            delay_ms, callback = gui_manager.gui.scheduled[-1]
+            callback()  # What Tk runs a second later
+            updater.stop()
+    finally:
+        os.chdir(previous)
+
+    labels = {key: label.text for key, label in gui_manager.perf_labels.items()}
+    detect = updater.metrics.get_histogram('clipboard.detect_ms')
+    print(f"Clipboard change seen within: {labels['clipboard']}")
+    checks = [
+        (before['clipboard'] == "-" and before['parse'] == "-", "Empty metrics shown as '-'"),
+        (detect and detect['count'] == 1 and detect['last'] >= 50.0,
+         "Detection latency includes the wait since the previous read"),
+        (labels['clipboard'].startswith(f"{detect['last']:.2f} ms"), "Detection latency shown"),
+        (labels['parse'].endswith(")") and labels['skipped'].startswith("1 / "), "Parse time and skips shown"),
+        (delay_ms == 1000 and callback == gui_manager.refresh_performance_panel, "Refreshed once per second"),
+        (len(gui_manager.gui.scheduled) == 2, "Each refresh schedules the next"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_log_queue_and_trimming()
+    test_performance_panel_refresh()
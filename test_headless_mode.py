@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Smoke test for headless mode
+Runs the updater without a GUI in a fresh interpreter, stops it with a signal
+and checks that no GUI module was imported and the shutdown was clean
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HEADLESS_RUN = r"""
+import json, signal, sys, threading, time
+sys.path.insert(0, sys.argv[1])
+from isle_map_updater import IsleMapUpdater
+from session_replay import ReplayClipboard
+
+updater = IsleMapUpdater(headless=True, clipboard=ReplayClipboard("88,879.526, -288,696.11, 21,112.882"))
+threading.Timer(1.0, signal.raise_signal, (signal.SIGINT,)).start()  # Ctrl+C after a second
+result = updater.run_headless("gateway", use_browser=False)
+time.sleep(0.2)  # Give stopped workers a moment to exit
+print(json.dumps({
+    'result': result,
+    'clipboard_reads': updater.metrics.get_counter('input.clipboard'),
+    'running': updater.running,
+    'gui_modules': [name for name in ('tkinter', 'gui_manager', 'local_renderer') if name in sys.modules],
+    'threads': [thread.name for thread in threading.enumerate()
+                if thread is not threading.main_thread() and not thread.daemon],
+}))
+"""
+
+def test_headless_smoke():
+    """Test a headless run from start to signal-driven shutdown without loading tkinter"""
+    print("=== TESTING HEADLESS MODE ===")
+
+    process = subprocess.run([sys.executable, "-c", HEADLESS_RUN, REPO_DIR], cwd=tempfile.mkdtemp(),
+                             capture_output=True, text=True, timeout=60)
+    lines = process.stdout.strip().splitlines()
+    report = json.loads(lines[-1]) if lines and lines[-1].startswith("{") else {}
+
+    print(f"Exit code {process.returncode}: {report}")
+    checks = [
+        (process.returncode == 0 and report.get('result') is True, "run_headless returned after the signal"),
+        (report.get('clipboard_reads') == 1, "Clipboard position went through the pipeline"),
+        (report.get('gui_modules') == [], "tkinter, gui_manager and local_renderer never imported"),
+        ("[STOP] Isle Map Updater stopped" in process.stdout and report.get('running') is False,
+         "Clean shutdown"),
+        (report.get('threads') == [], "No worker thread keeps the process alive"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    if not all(ok for ok, _ in checks):
+        print(process.stderr[-2000:])
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_headless_smoke()
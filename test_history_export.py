@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test Suite for history export / import
+Checks GeoJSON and CSV round trips and that exports stream in constant memory
+"""
+
+import gzip
+import io
+import json
+import os
+import random
+import tempfile
+import tracemalloc
+
+from history_export import export_history, import_history, iter_features
+from position_history import PositionHistory
+
+def make_history(directory, count=50_000):
+    history = PositionHistory(os.path.join(directory, "history.db"), trail_tolerance=None)
+    rng = random.Random(40)
+    rows = ((1_000_000.0 + i, "gateway" if i % 3 else "spiro",
+             rng.uniform(-300_000, 300_000), rng.uniform(-300_000, 300_000), rng.uniform(0, 30_000), "evrima")
+            for i in range(count))
+    history.insert_many(rows)
+    history.insert_trail_points([(1, 1_000_000.0, "gateway", 0.0, 0.0, 0.0),
+                                 (1, 1_000_010.0, "gateway", 100.0, 50.0, 0.0),
+                                 (2, 1_000_500.0, "gateway", 900.0, 900.0, 10.0)])
+    return history
+
+def test_round_trips():
+    """Test that every format imports back exactly what was exported"""
+    directory = tempfile.mkdtemp()
+    source = make_history(directory)
+
+    print("=== TESTING EXPORT / IMPORT ROUND TRIPS ===")
+
+    for name in ("gateway.geojson", "gateway.csv", "gateway.geojson.gz"):
+        path = os.path.join(directory, name)
+        exported = export_history(source, path, map_value="gateway")
+        target = PositionHistory(os.path.join(directory, f"{name}.db"))
+        imported, _ = import_history(target, path)
+
+        same = list(target.iter_positions("gateway")) == list(source.iter_positions("gateway"))
+        target.close()
+        print(f"[{'PASS' if same else 'FAIL'}] {name}: {exported} exported, {imported} imported")
+        assert exported == imported == source.count("gateway") and same
+
+    for name in ("trails.geojson", "trails.csv"):
+        path = os.path.join(directory, name)
+        assert export_history(source, path, trail=True) == (2 if name.endswith("geojson") else 3)
+        target = PositionHistory(os.path.join(directory, f"{name}.db"))
+        _, imported = import_history(target, path)
+        trail = [row[1:] for row in target.iter_trail_points()]
+        target.close()
+        assert imported == 3 and trail == [row[1:] for row in source.iter_trail_points()]
+        print(f"[PASS] {name}: trails survive the round trip")
+
+    source.close()
+
+def test_constant_memory():
+    """Test that peak memory does not grow with the number of exported rows"""
+    directory = tempfile.mkdtemp()
+    source = make_history(directory, count=50_000)
+    path = os.path.join(directory, "all.geojson")
+
+    tracemalloc.start()
+    export_history(source, path)
+    _, export_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    feature_count = sum(1 for _ in iter_features(open(path, encoding='utf-8')))
+    _, read_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    source.close()
+
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"[INFO] {size_mb:.0f} MB file, export peak {export_peak / 1024 / 1024:.1f} MB, "
+          f"read peak {read_peak / 1024 / 1024:.1f} MB")
+    assert feature_count == 50_000
+    assert export_peak < 8 * 1024 * 1024 and read_peak < 2 * 1024 * 1024
+
+def test_foreign_geojson():
+    """Test the streaming reader on pretty-printed GeoJSON from another tool"""
+    collection = {"type": "FeatureCollection", "name": "tribe", "features": [
+        {"type": "Feature", "properties": {"map": "spiro", "ts": 5.0},
+         "geometry": {"type": "Point", "coordinates": [1.5, -2.5]}},
+        {"type": "Feature", "properties": {"map": "spiro"},
+         "geometry": {"type": "LineString", "coordinates": [[0, 0, 1], [10, 10, 2]]}},
+    ]}
+    text = json.dumps(collection, indent=4)
+    features = list(iter_features(io.StringIO(text), read_size=7))
+    assert features == collection["features"]
+
+    path = os.path.join(tempfile.mkdtemp(), "tribe.geojson.gz")
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write(text)
+    target = PositionHistory(os.path.join(os.path.dirname(path), "history.db"))
+    assert import_history(target, path) == (1, 2)
+    assert list(target.iter_positions()) == [(5.0, "spiro", 1.5, -2.5, 0.0, None)]
+    target.close()
+    print("[PASS] Pretty-printed GeoJSON parsed in small reads")
+
+if __name__ == "__main__":
+    test_round_trips()
+    test_constant_memory()
+    test_foreign_geojson()
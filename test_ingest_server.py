@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the ingestion server
+Checks payload formats, keep-alive HTTP, WebSocket framing, the token and browser origins
+"""
+
+import base64
+import contextlib
+import http.client
+import io
+import json
+import os
+import socket
+import threading
+import time
+
+from coordinate_parser import CoordinateParser
+from ingest_server import IngestServer, PayloadError, parse_payload, encode_frame, websocket_accept
+from metrics_registry import MetricsRegistry
+
+class RecordingHandler:
+    """Parses like the app and remembers what arrived"""
+
+    def __init__(self):
+        self.parser = CoordinateParser()
+        self.received = []
+
+    def __call__(self, text, player=None, map_value=None, received_ns=None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            raw_coords = self.parser.parse_coordinates(text)
+        if raw_coords is None:
+            return 'no_match'
+        self.received.append((raw_coords, player, map_value))
+        return 'tracked' if player else 'sent'
+
+def start_server(token=None, allowed_origins=()):
+    handler = RecordingHandler()
+    server = IngestServer(handler, port=0, token=token, allowed_origins=allowed_origins, metrics=MetricsRegistry())
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.start()
+    return server, handler
+
+def post(connection, body, headers=None):
+    connection.request("POST", "/position", body=body, headers=headers or {})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+def test_parse_payload():
+    """Test raw text lines and the JSON shapes"""
+    print("=== TESTING PAYLOAD FORMATS ===")
+
+    def rejected(body):
+        try:
+            parse_payload(body)
+        except PayloadError:
+            return True
+        return False
+
+    checks = [
+        (parse_payload("88,879.526, -288,696.11, 21,112.882\n\n1, 2, 3\n") ==
+         [("88,879.526, -288,696.11, 21,112.882", None, None), ("1, 2, 3", None, None)], "Raw text, one per line"),
+        (parse_payload('{"coords": "1, 2, 3", "player": "Rex", "map": "spiro"}') ==
+         [("1, 2, 3", "Rex", "spiro")], "JSON object with player and map"),
+        (parse_payload('{"x": 1.5, "y": -2, "z": 3}') == [("1.500, -2.000, 3.000", None, None)], "Numeric JSON"),
+        (len(parse_payload('{"positions": ["1, 2, 3", {"coords": [4, 5, 6]}]}')) == 2, "Batched JSON"),
+        (parse_payload("[DEBUG] not json") == [("[DEBUG] not json", None, None)], "Bracketed text stays text"),
+        (parse_payload("   ") == [], "Empty body"),
+        (all(rejected(body) for body in ('{"coords": [1, "a", 3]}', '{"coords": [[1], 2, 3]}',
+                                         '{"coords": [1, null, 3]}')), "Non-numeric coordinates rejected"),
+        (all(rejected(body) for body in ('{"coords": [true, 2, 3]}', '{"x": 1, "y": false, "z": 3}')),
+         "Booleans rejected"),
+        (all(rejected(body) for body in ('{"coords": [NaN, 2, 3]}', '{"x": 1, "y": Infinity, "z": 3}',
+                                         '{"coords": [1e400, 2, 3]}')), "Non-finite coordinates rejected"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_http_keep_alive():
+    """Test batched posts over one persistent connection and error statuses"""
+    server, handler = start_server()
+
+    print("=== TESTING HTTP INGESTION ===")
+
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        first = post(connection, "88,879.526, -288,696.11, 21,112.882\n(Lat: 1,000.0 Long: 2,000.0 Alt: 3,000.0)")
+        second = post(connection, json.dumps([{"x": 1000, "y": 2000, "z": 300, "player": "Rex"}, "hello"]),
+                      {"Content-Type": "application/json"})
+        connections_during = server.connections
+        connection.request("GET", "/status")
+        status = json.loads(connection.getresponse().read())
+        connection.request("GET", "/position")
+        wrong_method = connection.getresponse()
+        wrong_method.read()
+        bad_json = post(connection, '{"player": "Rex"}')
+        bad_coords = [post(connection, body) for body in ('{"coords": [1, "a", 3]}', '{"coords": [[1], 2, 3]}')]
+        after_bad_coords = post(connection, "1, 2, 3")
+        connection.close()
+    finally:
+        server.stop()
+
+    checks = [
+        (first == (200, {"results": ["sent", "sent"], "accepted": 2}), "Raw text batch accepted"),
+        (second[1]["results"] == ["tracked", "no_match"], "JSON batch with player and junk"),
+        (handler.received[0][0] == "88,879.526, -288,696.11, 21,112.882", "Parsed through CoordinateParser"),
+        (handler.received[2][1] == "Rex", "Player passed to the handler"),
+        (connections_during == 1, "All requests reused one connection"),
+        (status["requests"] == 2 and status["positions"] == 4, "Status counts requests and positions"),
+        (status["request_ms"]["count"] == 2, "Request latency recorded"),
+        (wrong_method.status == 405, "GET /position rejected"),
+        (bad_json[0] == 400, "Entry without coordinates rejected"),
+        ([status for status, _ in bad_coords] == [400, 400] and after_bad_coords[0] == 200,
+         "Bad coordinate values answered with 400 on a live connection"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_websocket_and_token():
+    """Test the WebSocket handshake, messages, ping and the shared token"""
+    server, handler = start_server(token="s3cret")
+
+    print("=== TESTING WEBSOCKET INGESTION ===")
+
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        unauthorized = post(connection, "1, 2, 3")
+        authorized = post(connection, "1, 2, 3", {"Authorization": "Bearer s3cret"})
+        connection.close()
+
+        sock = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        sock.sendall((f"GET /ws?token=s3cret HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n").encode())
+        stream = sock.makefile('rb')
+        handshake = b""
+        while not handshake.endswith(b"\r\n\r\n"):
+            handshake += stream.read(1)
+
+        def receive():
+            first, second = stream.read(2)
+            length = second & 0x7F
+            if length == 126:
+                length = int.from_bytes(stream.read(2), 'big')
+            return first & 0x0F, stream.read(length)
+
+        sock.sendall(encode_frame(b"4, 5, 6\n7, 8, 9", mask=os.urandom(4)))
+        message = receive()
+        sock.sendall(encode_frame(b"are you there", opcode=0x9, mask=os.urandom(4)))
+        pong = receive()
+        # A message split over two frames
+        first_part, last_part = b'{"coords": "10, 11, ', b'12"}'
+        sock.sendall(bytes([0x01, 0x80 | len(first_part)]) + b"\0\0\0\0" + first_part)  # No FIN, zero mask
+        sock.sendall(bytes([0x80, 0x80 | len(last_part)]) + b"\0\0\0\0" + last_part)    # Continuation + FIN
+        fragmented = receive()
+        sock.sendall(encode_frame(b'{"coords": [1, "a", 3]}', mask=os.urandom(4)))
+        bad_coords = receive()
+        sock.sendall(encode_frame(b"\x03\xe8", opcode=0x8, mask=os.urandom(4)))
+        close = receive()
+        sock.close()
+    finally:
+        server.stop()
+
+    checks = [
+        (unauthorized[0] == 401, "Missing token rejected"),
+        (authorized[0] == 200, "Bearer token accepted"),
+        (websocket_accept(key).encode() in handshake and b" 101 " in handshake, "WebSocket handshake"),
+        (message[0] == 0x1 and json.loads(message[1])["accepted"] == 2, "Batched message answered"),
+        (pong == (0xA, b"are you there"), "Ping answered with pong"),
+        (json.loads(fragmented[1])["results"] == ["sent"], "Fragmented message reassembled"),
+        (bad_coords[0] == 0x1 and "error" in json.loads(bad_coords[1]), "Bad coordinates answered with an error"),
+        (close[0] == 0x8, "Close echoed"),
+        ([raw for raw, _, _ in handler.received][-1] == "10, 11, 12", "All messages parsed"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_browser_origins():
+    """Test that web pages cannot post or open the WebSocket unless their origin is allowed"""
+    server, handler = start_server(allowed_origins=["http://localhost:8080"])
+
+    print("=== TESTING BROWSER ORIGINS ===")
+
+    try:
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        # What fetch() with a text/plain body sends - a "simple" request without CORS preflight
+        foreign = post(connection, "1, 2, 3", {"Origin": "https://evil.example", "Content-Type": "text/plain"})
+        connection.close()
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        sandboxed = post(connection, "1, 2, 3", {"Origin": "null"})
+        connection.close()
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        allowed = post(connection, "4, 5, 6", {"Origin": "http://localhost:8080"})
+        tool = post(connection, "7, 8, 9")
+        connection.close()
+
+        sock = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+        sock.sendall((f"GET /ws HTTP/1.1\r\nHost: localhost\r\nOrigin: https://evil.example\r\n"
+                      f"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Key: {base64.b64encode(os.urandom(16)).decode()}\r\n"
+                      f"Sec-WebSocket-Version: 13\r\n\r\n").encode())
+        websocket_status = sock.makefile('rb').readline()
+        sock.close()
+    finally:
+        server.stop()
+
+    checks = [
+        (foreign[0] == 403 and sandboxed[0] == 403, "Posts from other web pages refused"),
+        (allowed[0] == 200 and tool[0] == 200, "Allowed origin and non-browser tools accepted"),
+        (b" 403 " in websocket_status, "WebSocket handshake from another page refused"),
+        ([raw for raw, _, _ in handler.received] == ["4, 5, 6", "7, 8, 9"], "Refused positions never reached the app"),
+        (server.metrics.get_counter('ingest.rejected_origins') == 3, "Refusals counted"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_slow_handler_does_not_block():
+    """Test that a handler waiting on the input lock leaves other connections responsive"""
+    release = threading.Event()
+    entered = threading.Event()
+    handler = RecordingHandler()
+
+    def slow_handler(text, player=None, map_value=None, received_ns=None):
+        entered.set()
+        release.wait(5)  # e.g. the clipboard monitor holds the app's input lock
+        return handler(text, player, map_value, received_ns)
+
+    server = IngestServer(slow_handler, port=0, metrics=MetricsRegistry())
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.start()
+    results = []
+
+    print("=== TESTING SLOW HANDLER ===")
+
+    try:
+        def slow_post():
+            connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+            results.append(post(connection, "1,000.0, 2,000.0, 300.0"))
+            connection.close()
+
+        poster = threading.Thread(target=slow_post)
+        poster.start()
+        entered.wait(5)
+        start = time.perf_counter()
+        connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+        connection.request("GET", "/status")
+        status_response = connection.getresponse()
+        status_response.read()
+        status_seconds = time.perf_counter() - start
+        release.set()
+        poster.join(5)
+        connection.close()
+    finally:
+        release.set()
+        server.stop()
+
+    checks = [
+        (status_response.status == 200 and status_seconds < 0.5, "Status answered while the handler waits"),
+        (results and results[0][1]['accepted'] == 1, "Slow position accepted afterwards"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_parse_payload()
+    test_http_keep_alive()
+    test_websocket_and_token()
+    test_browser_origins()
+    test_slow_handler_does_not_block()
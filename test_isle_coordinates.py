@@ -185,6 +185,33 @@ def test_normalization():
     print(f"Normalization Tests: {passed}/{len(normalization_tests)} passed\\n")
     return passed, len(normalization_tests)
 
+def test_digit_runs():
+    """Test that numbers never start or stop inside a run of digits"""
+    parser = CoordinateParser()
+    
+    print("=== TESTING DIGIT RUNS ===")
+    
+    digit_run_tests = [
+        # Input -> expected result (None = ignored)
+        ("(Lat: 88879.526 Long: -288696.110 Alt: 21112.882)", "88,879.526, -288,696.110, 21,112.882",
+         "Unseparated Legacy altitude kept whole"),
+        ("Lat: 88879 Long: -288696 Alt: 21112", "88,879, -288,696, 21,112", "Unseparated Legacy integers"),
+        ("1234567, 2, 3", None, "Seven-digit Evrima number not cut to its last six digits"),
+        ("Build 20241018, 10, 18", None, "Digits of a longer number not used as a coordinate"),
+    ]
+    
+    passed = 0
+    for test_input, expected, description in digit_run_tests:
+        result = parser.parse_coordinates(test_input)
+        if result == expected:
+            print(f"[PASS] {description}: {result}")
+            passed += 1
+        else:
+            print(f"[FAIL] {description}: Expected '{expected}', got '{result}'")
+    
+    print(f"Digit Run Tests: {passed}/{len(digit_run_tests)} passed\\n")
+    assert passed == len(digit_run_tests)
+
 def run_comprehensive_test():
     """Run all coordinate recognition tests"""
     print("THE ISLE COORDINATE RECOGNITION - COMPREHENSIVE TEST SUITE")
@@ -195,6 +222,7 @@ def run_comprehensive_test():
     evrima_passed, evrima_total = test_evrima_coordinates()
     edge_passed, edge_total = test_edge_cases()
     norm_passed, norm_total = test_normalization()
+    test_digit_runs()
     
     # Calculate totals
     total_passed = legacy_passed + evrima_passed + edge_passed + norm_passed
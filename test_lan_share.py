@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test Suite for LAN position sharing
+Runs several instances on localhost and checks encoding, rate limiting and loss handling
+"""
+
+import random
+import time
+
+from lan_share import LanShare, decode, encode_delta, encode_keyframe
+from metrics_registry import MetricsRegistry
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+def test_instances_on_localhost():
+    """Test three instances seeing each other through the multicast group"""
+    port = random.randint(40000, 60000)
+    metrics = MetricsRegistry()
+    members = [LanShare(name, port=port, max_rate=50.0, metrics=metrics if name == "Alice" else None)
+               for name in ("Alice", "Bob", "Cleo")]
+    for member in members:
+        member.start()
+
+    print("=== TESTING LAN SHARING ===")
+
+    try:
+        start = time.perf_counter()
+        for step in range(25):
+            for i, member in enumerate(members):
+                member.publish("gateway" if i < 2 else "spiro", (88_879.526 + step * 12.5, -288_696.11 + i * 1000, 21_112.882))
+        elapsed = time.perf_counter() - start
+
+        seen_by_alice = wait_for(lambda: {p.name for p in members[0].get_peers()} == {"Bob", "Cleo"})
+        bob = next(p for p in members[0].get_peers() if p.name == "Bob")
+        wait_for(lambda: abs(bob.coords[0] - (88_879.526 + 24 * 12.5)) < 0.01)
+        keyframes = metrics.get_counter('lan.keyframes')
+        deltas = metrics.get_counter('lan.deltas')
+        bytes_per_packet = metrics.get_counter('lan.bytes_sent') / (keyframes + deltas)
+
+        print(f"[INFO] {keyframes} keyframes, {deltas} deltas, {bytes_per_packet:.1f} bytes/packet, "
+              f"25 updates in {elapsed:.2f}s")
+        checks = [
+            (seen_by_alice, "Alice sees Bob and Cleo"),
+            ([p.name for p in members[1].get_peers("spiro")] == ["Cleo"], "Peers filtered by map"),
+            (abs(bob.coords[0] - (88_879.526 + 24 * 12.5)) < 0.01 and bob.coords[1] == -287_696.11,
+             "Deltas reconstruct the position"),
+            (keyframes == 1 and deltas == 24, "Only the first packet is a keyframe"),
+            (bytes_per_packet < 20, "Compact packets"),
+            (elapsed >= 24 / 50.0 * 0.9, "Sending is rate limited"),
+        ]
+    finally:
+        for member in members:
+            member.stop()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_packet_loss_and_foreign_packets():
+    """Test that a lost delta freezes the peer until the next keyframe"""
+    listener = LanShare("Me")
+    keyframe = encode_keyframe(7, 1, "Dino", "gateway", 0.0, (100, 200, 300))
+    assert decode(keyframe)[3] == ("Dino", "gateway", 0.0, (100, 200, 300))
+
+    peer = listener.handle_packet(keyframe)
+    listener.handle_packet(encode_delta(7, 2, (10, 0, 0)))
+    assert peer.centi == (110, 200, 300)
+
+    listener.handle_packet(encode_delta(7, 4, (10, 0, 0)))  # Sequence 3 was lost
+    listener.handle_packet(encode_delta(7, 5, (10, 0, 0)))
+    assert peer.centi == (110, 200, 300) and not peer.synced
+
+    listener.handle_packet(encode_keyframe(7, 6, "Dino", "gateway", 0.0, (500, 200, 300)))
+    listener.handle_packet(encode_delta(7, 7, (-5, 0, 0)))
+    assert peer.centi == (495, 200, 300) and peer.synced
+
+    assert listener.handle_packet(b"garbage") is None
+    assert listener.handle_packet(encode_delta(listener.sender_id, 1, (1, 1, 1))) is None
+    print("[PASS] Loss resynchronises on the next keyframe")
+
+if __name__ == "__main__":
+    test_instances_on_localhost()
+    test_packet_loss_and_foreign_packets()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test Suite for end-to-end latency tracing
+Checks stage durations, histogram feeding and the JSONL trace log
+"""
+
+import json
+import os
+import tempfile
+
+from latency_tracer import LatencyTracer
+from metrics_registry import MetricsRegistry
+
+def test_trace_stages():
+    """Test that stage durations are measured between consecutive recorded stages"""
+    metrics = MetricsRegistry()
+    log_file = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+    tracer = LatencyTracer(metrics, log_file=log_file)
+
+    print("=== TESTING TRACE STAGES ===")
+
+    trace = tracer.start('clipboard_read', timestamp=1_000_000)
+    trace.coordinates = "88,879.526, -288,696.11, 21,112.882"
+    trace.mark('parse', 1_500_000)
+    trace.mark('enqueue', 1_600_000)
+    trace.mark('driver_start', 2_600_000)
+    trace.mark('driver_end', 12_600_000)
+    durations = tracer.finish(trace)
+
+    with open(log_file) as f:
+        records = [json.loads(line) for line in f]
+
+    checks = [
+        (durations['parse'] == 0.5, "Parse stage 0.5 ms"),
+        (durations['driver_end'] == 10.0, "Driver stage 10 ms"),
+        (durations['total'] == 11.6, "Total 11.6 ms"),
+        ('page_ack' not in durations, "Missing stage skipped"),
+        (metrics.get_histogram('trace.total_ms')['count'] == 1, "Total fed to histogram"),
+        (len(records) == 1 and records[0]['trace_id'] == trace.trace_id, "Trace appended to JSONL"),
+        (tracer.start().trace_id == trace.trace_id + 1, "Trace IDs increase"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_trace_stages()
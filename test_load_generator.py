@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the synthetic load generator
+Checks the locale formats against the parser, the movement limits of the
+random walks and driving the pipeline at a fixed rate
+"""
+
+import contextlib
+import io
+import itertools
+import math
+import os
+import tempfile
+
+from coordinate_parser import CoordinateParser
+from load_generator import LoadGenerator, RandomWalk, format_number, format_position, paced, run_load
+from session_replay import start_pipeline, stop_pipeline
+
+BOUNDS = (-600_000.0, 600_000.0, -600_000.0, 600_000.0, -20_000.0, 80_000.0)
+
+def test_formats_parse_back():
+    """Test every style, locale and minus sign against CoordinateParser"""
+    parser = CoordinateParser()
+    generator = LoadGenerator(players=4, seed=7, bounds=BOUNDS)
+    wrong = []
+
+    print("=== TESTING GENERATED FORMATS ===")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for sample in itertools.islice(generator.samples(), 5000):
+            numeric = parser.to_numeric(parser.parse_coordinates(sample.text) or "")
+            if not numeric or any(abs(a - b) > 0.0005 for a, b in zip(numeric, sample.coords)):
+                wrong.append(sample.text)
+        parser.test_source = LoadGenerator(seed=1, bounds=BOUNDS).texts()
+        test_coordinates = [parser.get_test_coordinates() for _ in range(3)]
+        test_parsed = all(parser.parse_coordinates(text) for text in test_coordinates)
+
+    print(f"{len(wrong)} of 5000 parsed wrongly {wrong[:3]}")
+    checks = [
+        (format_number(-288696.11, '.', ',', '−') == "−288.696,110", "Dot-comma with Unicode minus"),
+        (format_number(88879.526, ' ', ',') == "88 879,526" and format_number(526.1, "'", '.') == "526.100",
+         "Space and apostrophe separators"),
+        (format_position((1234.5, -2.25, 3), 'legacy', 'raw') == "(Lat: 1234.500 Long: -2.250 Alt: 3.000)",
+         "Legacy style"),
+        (not wrong, "Every generated position parses back to its coordinates"),
+        (len(set(test_coordinates)) == 3 and test_parsed,
+         "Test coordinates from the generator"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_walk_limits():
+    """Test speed and climb limits, bounds, teleports and repeatable seeds"""
+    import random
+    walk = RandomWalk(BOUNDS, random.Random(3), max_speed=1200.0, max_climb=300.0, teleport_chance=0.01)
+    previous = walk.position
+    too_fast = too_steep = outside = 0
+
+    print("=== TESTING RANDOM WALKS ===")
+
+    for _ in range(20_000):
+        position, teleported = walk.step(0.5)
+        if not teleported:
+            too_fast += math.dist(previous[:2], position[:2]) > 1200.0 * 0.5 + 1e-6
+            too_steep += abs(position[2] - previous[2]) > 300.0 * 0.5 + 1e-6
+        outside += not (BOUNDS[0] <= position[0] <= BOUNDS[1] and BOUNDS[2] <= position[1] <= BOUNDS[3]
+                        and BOUNDS[4] <= position[2] <= BOUNDS[5])
+        previous = position
+
+    first = [sample.text for sample in itertools.islice(LoadGenerator(players=3, seed=5, bounds=BOUNDS).samples(), 50)]
+    again = [sample.text for sample in itertools.islice(LoadGenerator(players=3, seed=5, bounds=BOUNDS).samples(), 50)]
+    players = [sample.player for sample in itertools.islice(LoadGenerator(players=3, bounds=BOUNDS).samples(), 6)]
+
+    print(f"{walk.teleports} teleports in 20000 steps")
+    checks = [
+        (too_fast == 0, "Speed limit kept"),
+        (too_steep == 0, "Climb limit kept"),
+        (outside == 0, "Stays inside the map bounds"),
+        (100 <= walk.teleports <= 300, "Teleports at the configured chance"),
+        (first == again, "Same seed, same texts"),
+        (players == [0, 1, 2, 0, 1, 2], "Players take turns"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_drive_pipeline():
+    """Test a paced run through the clipboard step, parser, filters, sinks and markers"""
+    previous = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+
+    print("=== TESTING PIPELINE LOAD ===")
+
+    try:
+        updater, fixture = start_pipeline({'map': 'gateway'}, browser='fixture')
+        reports = []
+        try:
+            generator = LoadGenerator(players=3, seed=11, bounds=BOUNDS)
+            stats = run_load(updater, generator, rate=2000, count=1500, report_interval=0.25,
+                             report=lambda stats: reports.append(stats['generated']))
+        finally:
+            stop_pipeline(updater, fixture)
+        burst = list(paced(range(5000), 0))
+    finally:
+        os.chdir(previous)
+
+    results = stats['results']
+    rate = stats['generated'] / stats['elapsed']
+    print(f"{stats['generated']} positions at {rate:.0f}/s: {dict(results)}")
+    checks = [
+        (stats['generated'] == 1500 and stats['wrong'] == 0, "All positions parsed correctly"),
+        (results['sent'] >= 400 and results['tracked'] == 1000, "Own positions sent, others tracked as markers"),
+        (1500 <= rate <= 2200, "Paced to the requested rate"),
+        (reports and reports == sorted(reports), "Progress reported while running"),
+        (updater.sinks.stats()['browser']['handled'] >= 1, "Browser sink updated the fixture"),
+        # An idle player can copy the same text twice; the monitor skips that like a real clipboard
+        (updater.metrics.get_counter('input.clipboard') == 500 - results['unchanged_text'],
+         "Own positions went through the clipboard step"),
+        (burst == list(range(5000)), "Unpaced mode yields everything"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_formats_parse_back()
+    test_walk_limits()
+    test_drive_pipeline()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the local map renderer
+Drives the renderer with a recording canvas to check incremental drawing
+"""
+
+import gc
+import os
+import tempfile
+import time
+import weakref
+
+from local_renderer import LocalMapRenderer
+from map_projection import MapProjection
+from tile_store import write_pyramid
+
+class RecordingCanvas:
+    """Minimal stand-in for tk.Canvas that keeps item state"""
+
+    def __init__(self):
+        self.items = {}
+        self.next_id = 1
+        self.calls = []
+
+    def _create(self, kind, coords, **options):
+        item = self.next_id
+        self.next_id += 1
+        self.items[item] = (kind, list(coords), options)
+        self.calls.append(('create', kind))
+        return item
+
+    def create_oval(self, *coords, **options):
+        return self._create('oval', coords, **options)
+
+    def create_line(self, *coords, **options):
+        return self._create('line', coords, **options)
+
+    def create_text(self, *coords, **options):
+        return self._create('text', coords, **options)
+
+    def coords(self, item, *coords):
+        self.items[item] = (self.items[item][0], list(coords), self.items[item][2])
+        self.calls.append(('coords', item))
+
+    def delete(self, item):
+        self.calls.append(('delete', item))
+        if item == "all":
+            self.items.clear()
+        else:
+            self.items.pop(item, None)
+
+    def create_image(self, *coords, **options):
+        return self._create('image', coords, **options)
+
+    def tag_lower(self, item, below=None):
+        pass
+
+    def config(self, **options):
+        pass
+
+    def xview_moveto(self, fraction):
+        self.calls.append(('xview', fraction))
+
+    def yview_moveto(self, fraction):
+        self.calls.append(('yview', fraction))
+
+class SelectedMap:
+    def __init__(self, map_value):
+        self.map_value = map_value
+
+    def get_selected_map(self):
+        return self.map_value
+
+def make_renderer(trail_length=50):
+    projection = MapProjection(os.path.join(tempfile.mkdtemp(), "map_calibration.json"))
+    # 1 pixel per 100 world units, origin at pixel (4096, 4096)
+    projection.calibrate("gateway", [(0, 0, 4096, 4096), (100_000, 0, 5096, 4096), (0, 100_000, 4096, 5096)])
+    config = SelectedMap("gateway")
+    renderer = LocalMapRenderer(config, projection, image_dir=tempfile.mkdtemp(), trail_length=trail_length)
+    canvas = RecordingCanvas()
+    renderer.attach(canvas)
+    return renderer, canvas, config
+
+def test_incremental_drawing():
+    """Test that each update moves the marker and touches only one trail segment"""
+    renderer, canvas, _ = make_renderer(trail_length=50)
+
+    print("=== TESTING INCREMENTAL DRAWING ===")
+
+    renderer.update_position((0.0, 0.0, 0.0))
+    renderer.draw_pending()
+    marker = renderer.marker_item
+    setup_calls = len(canvas.calls)
+
+    timings = []
+    for i in range(1, 201):
+        renderer.update_position((i * 100.0, i * 50.0, 0.0))
+        start = time.perf_counter()
+        renderer.draw_pending()
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    per_update = (len(canvas.calls) - setup_calls) / 200
+    lines = [item for item, (kind, _, _) in canvas.items.items() if kind == 'line']
+    timings.sort()
+    print(f"[INFO] {per_update:.1f} canvas calls per update, p95 {timings[189]:.3f} ms")
+
+    checks = [
+        ([round(v, 6) for v in canvas.items[marker][1]] == [4291.0, 4191.0, 4301.0, 4201.0], "Marker at the projected position"),
+        (len(lines) == 50, "Trail bounded to trail_length segments"),
+        (per_update <= 4, "Constant canvas work per update"),
+        (not any(call == ('delete', 'all') for call in canvas.calls[setup_calls:]), "No full redraw"),
+        (timings[189] < 1.0, "Sub-millisecond updates"),
+    ]
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_map_switch_and_uncalibrated():
+    """Test that a map change starts a fresh trail and uncalibrated maps draw nothing"""
+    renderer, canvas, config = make_renderer()
+    for i in range(5):
+        renderer.update_position((i * 1000.0, 0.0, 0.0))
+    assert renderer.draw_pending() == 5 and len(renderer.trail_items) == 4
+
+    config.map_value = "spiro"
+    renderer.update_position((0.0, 0.0, 0.0))
+    renderer.draw_pending()
+    status = canvas.items[renderer.status_item][2]['text']
+    assert renderer.map_value == "spiro" and not renderer.trail_items and renderer.last_point is None
+    assert "No cached image" in status
+    print("[PASS] Map switch resets the trail")
+
+    renderer.canvas = None
+    assert renderer.update_position((0.0, 0.0, 0.0)) is False
+    print("[PASS] Positions are ignored while the window is closed")
+
+def test_pending_queue_without_trail():
+    """Test that trail_length 0 still moves the marker and the queue has its own bound"""
+    renderer, canvas, _ = make_renderer(trail_length=0)
+    bounded = LocalMapRenderer(SelectedMap("gateway"), renderer.projection, trail_length=200, pending_size=8)
+    bounded.attach(RecordingCanvas())
+
+    print("=== TESTING PENDING QUEUE ===")
+
+    renderer.update_position((0.0, 0.0, 0.0))
+    renderer.update_position((1000.0, 0.0, 0.0))
+    drawn = renderer.draw_pending()
+    for i in range(100):
+        bounded.update_position((i * 1000.0, 0.0, 0.0))
+    queued = list(bounded.pending)
+
+    lines = [item for item, (kind, _, _) in canvas.items.items() if kind == 'line']
+    checks = [
+        (drawn == 2 and canvas.items[renderer.marker_item][1] == [4101.0, 4091.0, 4111.0, 4101.0],
+         "Marker moves with trail_length 0"),
+        (not lines, "No trail drawn"),
+        (len(queued) == 8 and queued[-1] == (99_000.0, 0.0, 0.0), "Queue keeps the newest pending_size positions"),
+    ]
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_tile_mode():
+    """Test that only the tiles around the marker are placed and reused while it moves"""
+    renderer, canvas, _ = make_renderer()
+    levels = [(1, 1), (2, 2), (4, 4), (8, 8), (16, 16), (32, 32)]  # 8192 px at full resolution
+    tiles = (((zoom, column, row), f"{zoom}/{column}/{row}".encode())
+             for zoom, (columns, rows) in enumerate(levels) for column in range(columns) for row in range(rows))
+    write_pyramid(os.path.join(renderer.image_dir, "gateway.tiles"), 256, levels, tiles)
+    renderer.tile_decoder = bytes
+
+    renderer.update_position((0.0, 0.0, 0.0))  # Pixel (4096, 4096)
+    renderer.draw_pending()
+    placed = {canvas.items[item][2]['image'] for item, _ in renderer.tile_items.values()}
+    created = sum(1 for call in canvas.calls if call == ('create', 'image'))
+
+    renderer.update_position((5_000.0, 5_000.0, 0.0))  # 50 px further, same tiles
+    renderer.draw_pending()
+    created_after_small_move = sum(1 for call in canvas.calls if call == ('create', 'image'))
+
+    renderer.update_position((30_000.0, 0.0, 0.0))  # 300 px east, one new column
+    renderer.draw_pending()
+    columns = sorted({column for column, _ in renderer.tile_items})
+
+    checks = [
+        (len(placed) == 16 and b"5/16/16" in placed, "4x4 full-resolution tiles around the marker"),
+        (created_after_small_move == created, "Small moves reuse the placed tiles"),
+        (len(renderer.tile_items) == 16 and columns == list(range(15, 19)), "Tiles follow the marker"),
+        (renderer.tiles.stats()['misses'] == 20, "Each tile decoded once"),
+    ]
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_tile_images_outlive_cache():
+    """Test that tiles on screen stay alive when the tile cache is smaller than the view"""
+    renderer, canvas, _ = make_renderer()
+    levels = [(32, 32)]
+    tiles = (((0, column, row), b"tile") for column in range(32) for row in range(32))
+    write_pyramid(os.path.join(renderer.image_dir, "gateway.tiles"), 256, levels, tiles)
+    decoded = []
+
+    class Tile:
+        """Stands in for tk.PhotoImage, which Tk blanks once it is garbage collected"""
+
+    def decode(data):
+        tile = Tile()
+        decoded.append(weakref.ref(tile))
+        return tile
+
+    renderer.tile_decoder = decode
+    renderer.tile_cache_size = 4  # Fewer than the 16 tiles on screen
+
+    renderer.update_position((0.0, 0.0, 0.0))
+    renderer.draw_pending()
+    gc.collect()
+    alive = sum(1 for ref in decoded if ref() is not None)
+
+    checks = [
+        (len(decoded) == 16 and len(renderer.tile_items) == 16, "16 tiles decoded and placed"),
+        (alive == 16, "Tiles evicted from the cache stay referenced while on screen"),
+    ]
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_incremental_drawing()
+    test_map_switch_and_uncalibrated()
+    test_pending_queue_without_trail()
+    test_tile_mode()
+    test_tile_images_outlive_cache()
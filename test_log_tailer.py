@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the log tailer
+Checks incremental reads, partial lines, rotation, truncation, persistent
+offsets and that file notifications wake the reader without polling
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+from log_tailer import LogTailer, create_watcher
+from metrics_registry import MetricsRegistry
+
+def append(path, text):
+    with open(path, 'a', newline='') as f:
+        f.write(text)
+
+def test_incremental_reads():
+    """Test new lines only, partial lines, rotation, truncation and saved offsets"""
+    directory = tempfile.mkdtemp()
+    log = os.path.join(directory, "game.log")
+    offsets = os.path.join(directory, "offsets.json")
+    append(log, "old line before we started\n")
+    lines = []
+    metrics = MetricsRegistry()
+    tailer = LogTailer(log, lines.append, offsets_file=offsets, metrics=metrics)
+
+    print("=== TESTING INCREMENTAL LOG READS ===")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tailer.poll()
+        append(log, "88,879.526, -288,696.11, 21,112.882\r\n89,000.0, -288,000.0, 21,000.0\npartial")
+        first = tailer.poll()
+        append(log, " line\n")
+        tailer.poll()
+        offset_before_rotation = tailer.offset
+
+        # Rotation: the last lines of the old file arrive after the rename
+        append(log, "last line of old file\nunterminated")
+        os.rename(log, log + ".1")
+        append(log, "first line of new file\n")
+        tailer.poll()
+        rotated_lines = list(lines[3:])
+
+        # Truncation
+        with open(log, 'w') as f:
+            f.write("")
+        tailer.poll()
+        append(log, "after truncate\n")
+        tailer.poll()
+        tailer.stop()
+
+        # Restart: lines written while stopped are read once
+        append(log, "while stopped\n")
+        restarted = []
+        again = LogTailer(log, restarted.append, offsets_file=offsets)
+        again.poll()
+        again.stop()
+
+    checks = [
+        (lines[0] == "88,879.526, -288,696.11, 21,112.882" and first == 2, "Only new lines, CRLF stripped"),
+        (lines[2] == "partial line", "Partial line held until completed"),
+        (offset_before_rotation == os.path.getsize(log + ".1") - len("last line of old file\nunterminated"),
+         "Offset points after the last complete line"),
+        (rotated_lines == ["last line of old file", "unterminated", "first line of new file"],
+         "Rotation drains the old file, then reads the new one"),
+        (tailer.rotations == 1 and metrics.get_counter('logtail.rotations') == 1, "Rotation counted"),
+        (lines[-1] == "after truncate", "Truncated log read from the start"),
+        (restarted == ["while stopped"], "Saved offset resumes after a restart"),
+        (metrics.get_counter('logtail.lines') == len(lines), "Lines counted"),
+        (metrics.get_histogram('logtail.lag_ms') is not None, "Lag recorded"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_notifications_wake_reader():
+    """Test that an appended line is handled long before the next poll would happen"""
+    directory = tempfile.mkdtemp()
+    log = os.path.join(directory, "server.log")
+    append(log, "")
+    with contextlib.redirect_stdout(io.StringIO()):
+        watcher = create_watcher(log)
+    watcher.close()
+    received = threading.Event()
+    tailer = LogTailer(log, lambda line: received.set(), poll_interval=5.0)
+
+    print("=== TESTING FILE NOTIFICATIONS ===")
+    print(f"Watcher: {watcher.kind}")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tailer.start()
+        time.sleep(0.1)  # Reader is now blocked in wait()
+        start = time.perf_counter()
+        append(log, "1, 2, 3\n")
+        woke = received.wait(2.0)
+        elapsed = time.perf_counter() - start
+        tailer.running = False
+        append(log, "wake up\n")  # Let the reader leave wait() for the stop
+        tailer.stop()
+
+    print(f"Line handled after {elapsed * 1000:.1f} ms")
+    checks = [(woke, "Line handled")]
+    if watcher.kind != 'polling':
+        checks.append((elapsed < 1.0, "Woken by the notification, not the 5 s poll"))
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_polling_fallback():
+    """Test the polling watcher on its own"""
+    directory = tempfile.mkdtemp()
+    log = os.path.join(directory, "poll.log")
+    append(log, "")
+    lines = []
+    metrics = MetricsRegistry()
+    tailer = LogTailer(log, lines.append, poll_interval=0.05, force_polling=True, metrics=metrics)
+
+    print("=== TESTING POLLING FALLBACK ===")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        tailer.poll()  # Seen (empty) before anything is appended
+        tailer.start()
+        append(log, "a\nb\n")
+        deadline = time.monotonic() + 2
+        while len(lines) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        time.sleep(1.1)  # Past the first one-second window
+        kind = tailer.watcher.kind
+        tailer.stop()
+    rate = metrics.get_gauge('logtail.lines_per_s')
+
+    checks = [
+        (kind == 'polling', "Polling watcher used"),
+        (lines == ["a", "b"], "Lines read by polling"),
+        (rate is not None and 1.0 <= rate <= 2.5, "First lines_per_s measured from the start"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_incremental_reads()
+    test_notifications_wake_reader()
+    test_polling_fallback()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test Suite for per-map coordinate bounds
+Checks that impossible coordinates are rejected and calibration tightens the table
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from coordinate_parser import CoordinateParser
+from map_bounds import MapBoundsTable
+
+def test_default_bounds():
+    """Test that stray triples outside any map are rejected"""
+    parser = CoordinateParser()
+    bounds = MapBoundsTable(bounds_file=os.path.join(tempfile.mkdtemp(), "map_bounds.json"))
+
+    print("=== TESTING DEFAULT BOUNDS ===")
+
+    tests = [
+        ("88,879.526, -288,696.11, 21,112.882", True, "Realistic position"),
+        ("1,234,567.890, -9,876,543.210, 1,111,222.333", False, "7-digit coordinates"),
+        ("-45,123.456, 234,567.890, 312,345.678", False, "Altitude out of range"),
+    ]
+
+    passed = 0
+    for text, expected, description in tests:
+        result = bounds.contains("gateway", parser.to_numeric(parser.parse_coordinates(text)))
+        if result == expected:
+            print(f"[PASS] {description}: {'accepted' if result else 'rejected'}")
+            passed += 1
+        else:
+            print(f"[FAIL] {description}: expected {'accept' if expected else 'reject'}")
+
+    print(f"Default Bounds Tests: {passed}/{len(tests)} passed\n")
+    assert passed == len(tests)
+
+def test_calibration_and_refresh():
+    """Test calibration from observed positions, persistence and catalogue refresh"""
+    bounds_file = os.path.join(tempfile.mkdtemp(), "map_bounds.json")
+    bounds = MapBoundsTable(bounds_file=bounds_file)
+
+    print("=== TESTING CALIBRATION ===")
+
+    for i in range(100):
+        bounds.observe("spiro", (10_000.0 + i * 100, -20_000.0 - i * 100, 5_000.0))
+    calibrated = bounds.calibrate_from_observations("spiro", margin=0.25)
+    bounds.save()
+
+    reloaded = MapBoundsTable(bounds_file=bounds_file)
+    reloaded.refresh([{'value': 'spiro'}, {'value': 'gateway'}])
+
+    checks = [
+        (calibrated, "Calibrated from 100 observations"),
+        (reloaded.contains("spiro", (15_000.0, -25_000.0, 5_000.0)), "Observed area accepted"),
+        (not reloaded.contains("spiro", (300_000.0, -25_000.0, 5_000.0)), "Far outside area rejected"),
+        (reloaded.contains("gateway", (300_000.0, -25_000.0, 5_000.0)), "Other map keeps default bounds"),
+        ("gateway" in reloaded.table, "Catalogue map seeded on refresh"),
+        (not bounds.calibrate_from_observations("gateway"), "No calibration without observations"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_calibrated_bounds_can_widen():
+    """Test that calibrated bounds never lock the player out of the rest of the map"""
+    bounds = MapBoundsTable(bounds_file=os.path.join(tempfile.mkdtemp(), "map_bounds.json"))
+
+    print("=== TESTING WIDENING ===")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(100):  # A small corner of the map
+            bounds.observe("gateway", (100_000.0 + i * 20, -200_000.0 + i * 20, 20_000.0))
+        bounds.calibrate_from_observations("gateway")
+        calibrated = bounds.get_bounds("gateway")
+        east = (110_000.0, -199_000.0, 20_000.0)
+        first_east = bounds.contains("gateway", east) or bounds.observe_outlier("gateway", east)
+        stray_date = bounds.observe_outlier("gateway", (2024.0, 10.0, 18.0))
+        far_away = bounds.observe_outlier("gateway", (300_000.0, 300_000.0, 0.0))
+        off_every_map = bounds.observe_outlier("gateway", (5_000_000.0, 0.0, 0.0))
+        bounds.observe_outlier("gateway", east)
+        second_east = bounds.observe_outlier("gateway", (110_150.0, -198_900.0, 20_300.0))
+        widened = bounds.get_bounds("gateway")
+        bounds.calibrate_from_observations("gateway")  # Recalibrating must not undo the widening
+
+    checks = [
+        (calibrated[0] >= 98_000 and calibrated[1] <= 103_000, "Calibrated to the corner seen so far"),
+        (not first_east, "First position outside the bounds skipped"),
+        (not stray_date and not far_away and not off_every_map, "Unconfirmed and impossible triples skipped"),
+        (second_east and bounds.contains("gateway", east), "Second nearby position widens the bounds"),
+        (not bounds.contains("gateway", (2024.0, 10.0, 18.0)), "Dates still rejected after widening"),
+        (bounds.get_bounds("gateway") == widened, "Recalibration never shrinks the bounds"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_auto_calibration_in_app():
+    """Test that the app calibrates a map from its own updates and then ignores date-like triples"""
+    from session_replay import start_pipeline, stop_pipeline
+
+    previous = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+
+    print("=== TESTING AUTO CALIBRATION ===")
+
+    try:
+        updater, fixture = start_pipeline({'map': 'gateway'})
+        updater.config_manager.settings['bounds_auto_calibrate'] = True
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                date_before = updater.map_bounds.contains('gateway', (2024.0, 10.0, 18.0))
+                for i in range(100):
+                    handled = updater.sinks.stats()['browser']['handled']
+                    updater.handle_input(f"{88_000 + i * 200}.0, {-288_000 - i * 200}.0, 21000.0")
+                    deadline = time.time() + 5
+                    while updater.sinks.stats()['browser']['handled'] == handled and time.time() < deadline:
+                        time.sleep(0.002)
+                date_result = updater.handle_input("2024, 10, 18")
+                position_result = updater.handle_input("95,000.0, -295,000.0, 21,200.0")
+                # Walking 20k units east, out of the area seen so far
+                left_area = [updater.handle_input(f"{128_000 + i * 500}.0, -295,000.0, 21,200.0") for i in range(3)]
+        finally:
+            stop_pipeline(updater, fixture)
+        with contextlib.redirect_stdout(io.StringIO()):
+            saved = MapBoundsTable()
+    finally:
+        os.chdir(previous)
+
+    checks = [
+        (date_before, "Date-like triple inside the default bounds"),
+        (updater.map_bounds.is_calibrated('gateway'), "Calibrated after 100 map updates"),
+        (date_result == 'out_of_bounds', "Date-like triple rejected on the calibrated map"),
+        (position_result == 'sent', "Position in the explored area still sent"),
+        (left_area == ['out_of_bounds', 'sent', 'sent'], "Leaving the explored area skips one position only"),
+        (saved.is_calibrated('gateway') and not saved.is_calibrated('spiro'), "Calibration saved"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_default_bounds()
+    test_calibration_and_refresh()
+    test_calibrated_bounds_can_widen()
+    test_auto_calibration_in_app()
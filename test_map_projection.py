@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the affine map projection
+Checks calibration, scalar and batch projection and the pure-Python fallback
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from coordinate_parser import CoordinateParser
+from map_projection import MapProjection, pixel_to_tile
+
+# World -> pixel transform of an 8192 px image covering +-600,000 units, slightly rotated
+TRUE_AFFINE = ((0.00682, 0.0004, 4096.0), (-0.0004, 0.00682, 4096.0))
+
+def reference_points(count=6, seed=41):
+    rng = random.Random(seed)
+    points = []
+    for _ in range(count):
+        x, y = rng.uniform(-600_000, 600_000), rng.uniform(-600_000, 600_000)
+        (a, b, c), (d, e, f) = TRUE_AFFINE
+        points.append((x, y, a * x + b * y + c, d * x + e * y + f))
+    return points
+
+def test_calibration_and_scalar_projection():
+    """Test fitting, persistence and round trips of single positions"""
+    calibration_file = os.path.join(tempfile.mkdtemp(), "map_calibration.json")
+    projection = MapProjection(calibration_file)
+    residual = projection.calibrate("gateway", reference_points())
+    projection.save()
+    projection = MapProjection(calibration_file)
+
+    print("=== TESTING CALIBRATION ===")
+
+    parser = CoordinateParser()
+    coords = parser.to_numeric(parser.parse_coordinates("88,879.526, -288,696.11, 21,112.882"))
+    px, py = projection.project("gateway", coords)
+    x, y = projection.unproject("gateway", px, py)
+    column, row, offset_x, offset_y = pixel_to_tile(px, py, zoom=3, max_zoom=5)
+
+    checks = [
+        (residual < 1e-6, "Exact fit on noise-free reference points"),
+        (abs(x - coords[0]) < 1e-6 and abs(y - coords[1]) < 1e-6, "Unproject inverts project"),
+        (projection.project("spiro", coords) is None, "Uncalibrated map returns None"),
+        ((column * 256 + offset_x) * 4 == px and (row * 256 + offset_y) * 4 == py, "Tile addressing"),
+    ]
+    try:
+        projection.calibrate("spiro", [(0, 0, 0, 0), (1, 1, 1, 1), (2, 2, 2, 2)])
+        checks.append((False, "Collinear points rejected"))
+    except ValueError:
+        checks.append((True, "Collinear points rejected"))
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_batch_projection():
+    """Test NumPy batches against the scalar path, with and without NumPy"""
+    projection = MapProjection(os.path.join(tempfile.mkdtemp(), "map_calibration.json"))
+    projection.calibrate("gateway", reference_points())
+    rng = random.Random(7)
+    points = [(rng.uniform(-6e5, 6e5), rng.uniform(-6e5, 6e5), rng.uniform(0, 3e4)) for _ in range(1000)]
+    expected = [projection.project("gateway", point) for point in points]
+
+    saved = sys.modules.get("numpy")
+    sys.modules["numpy"] = None  # Makes "import numpy" raise ImportError
+    try:
+        fallback = projection.project_many("gateway", points)
+    finally:
+        if saved is not None:
+            sys.modules["numpy"] = saved
+        else:
+            del sys.modules["numpy"]
+    assert fallback == expected
+    print("[PASS] Pure-Python batch matches scalar projection")
+
+    try:
+        import numpy as np
+    except ImportError:
+        print("[SKIP] NumPy not installed")
+        return
+
+    batch = projection.project_many("gateway", points)
+    assert np.allclose(batch, expected, rtol=0, atol=1e-6)
+
+    many = np.random.default_rng(0).uniform(-6e5, 6e5, size=(1_000_000, 3))
+    start = time.perf_counter()
+    projected = projection.project_many("gateway", many)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    print(f"[INFO] 1,000,000 points projected in {elapsed_ms:.1f} ms")
+    assert projected.shape == (1_000_000, 2)
+
+    chunks = list(projection.project_chunks("gateway", iter(points), chunk_size=300))
+    assert [len(chunk) for chunk in chunks] == [300, 300, 300, 100]
+    print("[PASS] NumPy batches match scalar projection")
+
+if __name__ == "__main__":
+    test_calibration_and_scalar_projection()
+    test_batch_projection()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test Suite for movement-threshold deduplication
+Checks that redundant or reformatted positions are suppressed after parsing
+"""
+
+from coordinate_parser import CoordinateParser
+from movement_filter import MovementFilter
+
+def test_reformatted_duplicates():
+    """Test that the same position in different formats is only submitted once"""
+    parser = CoordinateParser()
+    movement_filter = MovementFilter(threshold=50.0)
+
+    print("=== TESTING REFORMATTED DUPLICATES ===")
+
+    tests = [
+        ("88,879.526, -288,696.11, 21,112.882", True, "First position"),
+        ("Lat: 88,879.526 Long: -288,696.11 Alt: 21,112.882", False, "Same position, Legacy format"),
+        ("88.879,526, -288.696,11, 21.112,882", False, "Same position, dot-comma separators"),
+        ("88,890.000, -288,700.00, 21,112.882", False, "Moved 11 units"),
+        ("88,979.526, -288,696.11, 21,112.882", True, "Moved 100 units"),
+        ("88,979.526, -288,696.11, 25,000.000", False, "Altitude change only"),
+    ]
+
+    passed = 0
+    for text, expected, description in tests:
+        result = movement_filter.should_update(parser.to_numeric(parser.parse_coordinates(text)))
+        if result == expected:
+            print(f"[PASS] {description}: {'submitted' if result else 'suppressed'}")
+            passed += 1
+        else:
+            print(f"[FAIL] {description}: expected {'submit' if expected else 'suppress'}")
+
+    print(f"Reformatted Duplicate Tests: {passed}/{len(tests)} passed\n")
+    assert passed == len(tests)
+    assert movement_filter.suppressed == 4 and movement_filter.accepted == 2
+
+def test_altitude_and_reset():
+    """Test altitude-aware comparison and reset after a map switch"""
+    movement_filter = MovementFilter(threshold=50.0, ignore_altitude=False)
+
+    print("=== TESTING ALTITUDE AND RESET ===")
+
+    checks = [
+        (movement_filter.should_update((0.0, 0.0, 0.0)), "First position submitted"),
+        (movement_filter.should_update((0.0, 0.0, 100.0)), "Altitude change submitted"),
+        (not movement_filter.should_update((10.0, 0.0, 100.0)), "Small move suppressed"),
+    ]
+    movement_filter.reset()
+    checks.append((movement_filter.should_update((10.0, 0.0, 100.0)), "Submitted again after reset"))
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_rollback_after_failed_update():
+    """Test that a position the browser failed to show is not suppressed when copied again"""
+    movement_filter = MovementFilter(threshold=50.0)
+
+    print("=== TESTING ROLLBACK ===")
+
+    movement_filter.should_update((0.0, 0.0, 0.0))
+    movement_filter.should_update((100.0, 0.0, 0.0))
+    movement_filter.rollback((0.0, 0.0, 0.0))  # Late failure of an older update
+    checks = [(not movement_filter.should_update((110.0, 0.0, 0.0)), "Older failure keeps the newer position")]
+    movement_filter.rollback((100.0, 0.0, 0.0))
+    checks.append((movement_filter.should_update((100.0, 0.0, 0.0)), "Same spot submitted again after a failure"))
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_reformatted_duplicates()
+    test_altitude_and_reset()
+    test_rollback_after_failed_update()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Test Suite for multi-marker tracking
+Checks frame diffs, the batched browser script against the local vulnona
+stand-in (100 markers at 5 Hz) and the local renderer's marker items
+"""
+
+import contextlib
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+
+from browser_manager import BrowserManager
+from map_projection import MapProjection
+from metrics_registry import MetricsRegistry
+from multi_marker import MarkerSet, MultiMarkerTracker
+from test_local_renderer import RecordingCanvas, SelectedMap
+from local_renderer import LocalMapRenderer
+from vulnona_fixture import VulnonaFixture, FakeWebDriver
+
+def make_projection():
+    projection = MapProjection(os.path.join(tempfile.mkdtemp(), "map_calibration.json"))
+    # 1 pixel per 100 world units, origin at pixel (4096, 4096) of an 8192x8192 image
+    projection.calibrate("gateway", [(0, 0, 4096, 4096), (100_000, 0, 5096, 4096), (0, 100_000, 4096, 5096)],
+                         image_size=(8192, 8192))
+    return projection
+
+def test_marker_diff():
+    """Test that frames carry only new, moved and removed markers"""
+    markers = MarkerSet(min_move=1.0)
+    targets = {f"p{i}": (float(i), float(i), f"Player {i}") for i in range(100)}
+
+    print("=== TESTING MARKER DIFF ===")
+
+    first = markers.diff("gateway", targets)
+    markers.commit(first)
+    unchanged = markers.diff("gateway", dict(targets))
+
+    moved = dict(targets)
+    moved["p1"] = (50.0, 1.0, "Player 1")
+    moved["p2"] = (2.4, 2.0, "Player 2")       # Below min_move
+    moved["p3"] = (3.0, 3.0, "Renamed")
+    del moved["p4"]
+    moved["p100"] = (0.0, 0.0, "Newcomer")
+    second = markers.diff("gateway", moved)
+    markers.commit(second)
+
+    other_map = markers.diff("spiro", {"p1": (1.0, 1.0, "Player 1")})
+
+    checks = [
+        (first.full and len(first.changes) == 100 and first.count == 100, "First frame is full"),
+        (unchanged is None, "No frame without changes"),
+        (sorted(second.changes) == ["p1", "p100", "p3"], "Only moved, renamed and new markers sent"),
+        (second.removed == ["p4"] and not second.full, "Vanished marker removed"),
+        (second.count == 100 and len(markers.shown) == 100, "Shown state follows the frames"),
+        (other_map.full and list(other_map.changes) == ["p1"], "Map change redraws everything"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_browser_markers_at_frame_rate():
+    """Test 100 moving markers at 5 Hz: one script per frame and the page keeps up"""
+    fixture = VulnonaFixture().start()
+    browser_manager = BrowserManager(vulnova_url=fixture.url, driver_factory=FakeWebDriver)
+    browser_manager.page_load_wait = browser_manager.popup_close_wait = browser_manager.map_load_wait = 0
+    browser_manager.marker_overlay_selector = "#map_container"
+    projection = make_projection()
+    metrics = MetricsRegistry()
+    tracker = MultiMarkerTracker(SelectedMap("gateway"), projection, frame_rate=5.0, metrics=metrics)
+    scripts = []
+
+    def browser_output(frame):
+        scripts.append(frame)
+        markers = {marker_id: (px / 8192, py / 8192, label) for marker_id, (px, py, label) in frame.changes.items()}
+        return browser_manager.update_markers(markers, frame.removed, frame.full) == frame.count
+
+    output = tracker.add_output('browser', browser_output)
+    rng = random.Random(46)
+    positions = {f"p{i}": [rng.uniform(-300_000, 300_000), rng.uniform(-300_000, 300_000), 0.0] for i in range(100)}
+    feeding = threading.Event()
+    feeding.set()
+
+    def feed():
+        # Far more updates than frames: every marker moves every 10 ms
+        while feeding.is_set():
+            for marker_id, coords in positions.items():
+                coords[0] += rng.uniform(-500, 500)
+                coords[1] += rng.uniform(-500, 500)
+                tracker.set_position(marker_id, marker_id.upper(), "gateway", tuple(coords))
+            time.sleep(0.01)
+
+    print("=== TESTING 100 MARKERS AT 5 HZ ===")
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.setup_browser()
+            browser_manager.select_map("gateway")
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        tracker.start()
+        time.sleep(2.0)
+        tracker.stop()
+        feeding.clear()
+        feeder.join()
+
+        frames_while_running = output.frames
+        state_running = fixture.get_state()
+        tracker.frame('browser')  # Catch up with the last positions
+        expected = {marker_id: (px / 8192, py / 8192) for marker_id, (px, py, _) in tracker.targets("gateway").items()}
+        page_markers = dict(fixture.markers)
+
+        # Move 3 markers only
+        for marker_id in ("p1", "p2", "p3"):
+            positions[marker_id][0] += 10_000
+            tracker.set_position(marker_id, marker_id.upper(), "gateway", tuple(positions[marker_id]))
+        partial = tracker.frame('browser')
+
+        # A reload loses the page's layer: the count check forces a full redraw
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.driver.get(fixture.url)
+        positions["p5"][0] += 10_000
+        tracker.set_position("p5", "P5", "gateway", tuple(positions["p5"]))
+        lost = tracker.frame('browser')
+        recovered = tracker.frame('browser')
+        state = fixture.get_state()
+    finally:
+        feeding.clear()
+        tracker.stop()
+        with contextlib.redirect_stdout(io.StringIO()):
+            browser_manager.stop()
+        fixture.stop()
+
+    frame_ms = metrics.get_histogram('markers.browser.frame_ms')
+    print(f"Frames: {frames_while_running}, p95 frame: {frame_ms['p95']:.2f} ms, overruns: {output.overruns}")
+
+    checks = [
+        (9 <= frames_while_running <= 12, "About 5 frames per second"),
+        (state_running['marker_frames'] == frames_while_running, "One page round trip per frame"),
+        (output.overruns == 0, "No frame overran its interval"),
+        (frame_ms['p95'] < 200, "Frames finish within the frame interval"),
+        (len(page_markers) == 100, "Page shows all 100 markers"),
+        (all(abs(page_markers[mid][0] - fx) < 1 / 8192 and abs(page_markers[mid][1] - fy) < 1 / 8192
+             for mid, (fx, fy) in expected.items()), "Page shows the newest positions (within min_move)"),
+        (partial is not None and sorted(partial.changes) == ["p1", "p2", "p3"], "Only moved markers sent"),
+        (len(scripts[-3].changes) == 3, "Partial frame script carries 3 markers"),
+        (lost is None and recovered is not None and recovered.full, "Lost layer triggers a full frame"),
+        (state['marker_count'] == 100, "Full frame restores every marker"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_renderer_markers():
+    """Test that renderer frames move existing canvas items instead of redrawing"""
+    projection = make_projection()
+    config = SelectedMap("gateway")
+    renderer = LocalMapRenderer(config, projection, image_dir=tempfile.mkdtemp())
+    canvas = RecordingCanvas()
+    renderer.attach(canvas)
+    tracker = MultiMarkerTracker(config, projection)
+    tracker.add_output('renderer', renderer.update_markers)
+
+    print("=== TESTING RENDERER MARKERS ===")
+
+    for i in range(100):
+        tracker.set_position(f"p{i}", f"Player {i}", "gateway", (i * 1_000.0, 0.0, 0.0))
+    tracker.frame('renderer')
+    renderer.draw_pending()
+    items_after_first = len(canvas.items)
+    creates_after_first = sum(1 for call in canvas.calls if call[0] == 'create')
+
+    tracker.set_position("p7", "Player 7", "gateway", (7_000.0, 5_000.0, 0.0))
+    tracker.remove("p8")
+    canvas.calls.clear()
+    tracker.frame('renderer')
+    renderer.draw_pending()
+    oval = canvas.items[renderer.marker_items["p7"][0]]
+
+    checks = [
+        (len(renderer.marker_items) == 99, "One item pair per marker"),
+        (items_after_first == 200 + 2 and creates_after_first == 202, "Markers drawn once (plus status and own marker)"),
+        (sorted(call[0] for call in canvas.calls) == ['coords', 'coords', 'delete', 'delete'],
+         "Only the moved and removed markers touched"),
+        (oval[1] == [4162.0, 4142.0, 4170.0, 4150.0], "Moved marker at its new pixel"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_marker_diff()
+    test_browser_markers_at_frame_rate()
+    test_renderer_markers()
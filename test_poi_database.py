@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the points-of-interest database
+Checks grid nearest-neighbour and radius queries against a brute-force scan
+"""
+
+import json
+import math
+import os
+import random
+import tempfile
+
+from poi_database import PoiDatabase
+
+def write_pois(data):
+    poi_file = os.path.join(tempfile.mkdtemp(), "pois.json")
+    with open(poi_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return poi_file
+
+def test_nearest_matches_brute_force():
+    """Test k-nearest and radius queries against a full scan"""
+    rng = random.Random(38)
+    types = ['water', 'mud', 'nest']
+    pois = [{"name": f"poi{i}", "type": rng.choice(types),
+             "x": rng.uniform(-400_000, 400_000), "y": rng.uniform(-400_000, 400_000), "z": 0.0}
+            for i in range(2000)]
+    database = PoiDatabase(write_pois({"gateway": pois}), cell_size=20_000.0)
+
+    print("=== TESTING NEAREST LOOKUP ===")
+
+    for _ in range(50):
+        x, y = rng.uniform(-500_000, 500_000), rng.uniform(-500_000, 500_000)
+        poi_type = rng.choice([None] + types)
+        candidates = [p for p in pois if poi_type is None or p['type'] == poi_type]
+        expected = sorted(math.hypot(p['x'] - x, p['y'] - y) for p in candidates)
+
+        nearest = database.nearest("gateway", x, y, k=5, poi_type=poi_type)
+        assert [round(d, 6) for d, _ in nearest] == [round(d, 6) for d in expected[:5]]
+
+        radius = 30_000.0
+        within = database.within_radius("gateway", x, y, radius, poi_type=poi_type)
+        assert [round(d, 6) for d, _ in within] == [round(d, 6) for d in expected if d <= radius]
+
+    print("[PASS] Grid results match brute force")
+
+def test_unknown_map_and_missing_file():
+    """Test that lookups degrade to empty results"""
+    database = PoiDatabase(write_pois({"spiro": [{"name": "Lake", "type": "water", "x": 0, "y": 0}]}))
+    assert database.nearest("gateway", 0, 0) == []
+    assert database.types("spiro") == ["water"]
+    distance, poi = database.nearest("spiro", 300, 400)[0]
+    assert distance == 500 and poi['name'] == "Lake"
+
+    empty = PoiDatabase(os.path.join(tempfile.mkdtemp(), "missing.json"))
+    assert empty.nearest("spiro", 0, 0) == [] and empty.within_radius("spiro", 0, 0, 10) == []
+    print("[PASS] Unknown maps and missing files return nothing")
+
+if __name__ == "__main__":
+    test_nearest_matches_brute_force()
+    test_unknown_map_and_missing_file()
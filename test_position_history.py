@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the position history store
+Checks batched background writes, time-range queries and radius queries
+"""
+
+import math
+import os
+import random
+import tempfile
+import time
+
+from position_history import PositionHistory
+
+def test_history_queries():
+    """Test time and radius queries against 100,000 recorded positions"""
+    history = PositionHistory(os.path.join(tempfile.mkdtemp(), "history.db"), flush_interval=0.05)
+    history.start()
+    rng = random.Random(42)
+
+    print("=== TESTING HISTORY QUERIES ===")
+
+    points = []
+    for i in range(100_000):
+        map_value = "gateway" if i % 2 == 0 else "spiro"
+        coords = (rng.uniform(-300_000, 300_000), rng.uniform(-300_000, 300_000), rng.uniform(0, 30_000))
+        history.record(map_value, coords, "evrima", timestamp=1_000_000.0 + i)
+        if map_value == "gateway":
+            points.append((1_000_000.0 + i, coords))
+    history.flush()
+
+    start = time.perf_counter()
+    window = history.positions_between("gateway", 1_010_000.0, 1_011_000.0)
+    window_ms = (time.perf_counter() - start) * 1000.0
+
+    start = time.perf_counter()
+    nearby = history.visits_within("gateway", 0.0, 0.0, 20_000.0)
+    radius_ms = (time.perf_counter() - start) * 1000.0
+
+    expected_nearby = sum(1 for _, (x, y, _) in points if math.hypot(x, y) <= 20_000.0)
+    print(f"[INFO] Time query {window_ms:.2f} ms, radius query {radius_ms:.2f} ms")
+
+    checks = [
+        (history.count() == 100_000, "All positions written"),
+        (len(window) == 501, "Time range on one map"),
+        (all(window[i][0] <= window[i + 1][0] for i in range(len(window) - 1)), "Time order"),
+        (len(nearby) == expected_nearby, "Radius query matches brute force"),
+        (window_ms < 50 and radius_ms < 50, "Queries answer in milliseconds"),
+    ]
+    history.close()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_history_queries()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the opt-in profiling hooks
+Checks that wrapped methods are profiled inside the window and restored afterwards
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+
+from coordinate_parser import CoordinateParser
+from profiling_hooks import ProfilingSession, profiling_requested
+
+def test_profiling_window():
+    """Test profiling a parser for a short window"""
+    parser = CoordinateParser()
+    session = ProfilingSession(output_root=tempfile.mkdtemp(), duration=30.0)
+
+    print("=== TESTING PROFILING WINDOW ===")
+
+    session.instrument(parser, ['parse_coordinates'])
+    wrapped = 'parse_coordinates' in vars(parser)
+    session.start()
+    for _ in range(20):
+        result = parser.parse_coordinates("88,879.526, -288,696.11, 21,112.882")
+    session.stop()
+
+    files = os.listdir(session.output_dir)
+    checks = [
+        (wrapped, "Method wrapped on the instance"),
+        (result == "88,879.526, -288,696.11, 21,112.882", "Wrapped method returns normally"),
+        ("parse_coordinates.prof" in files and "parse_coordinates.txt" in files, "cProfile report written"),
+        (any(name.startswith("memory_") for name in files), "tracemalloc snapshot written"),
+        ("samples_collapsed.txt" in files, "Stack samples written"),
+        ('parse_coordinates' not in vars(parser), "Original method restored"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_window_starts_with_monitoring():
+    """Test that the app opens the profiling window when monitoring starts, not at launch"""
+    from session_replay import create_updater
+
+    previous = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+
+    print("=== TESTING PROFILING WINDOW START ===")
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            updater = create_updater({'map': 'gateway'})
+            session = ProfilingSession(output_root=tempfile.mkdtemp(), duration=30.0)
+            updater.profiling_session = session
+            active_at_launch = session.active
+            updater.start_monitoring()
+            active_while_monitoring = session.active
+            updater.stop()
+            session.stop()
+            session.start()  # A second start after the window ended
+    finally:
+        os.chdir(previous)
+
+    checks = [
+        (not active_at_launch, "Not profiling before monitoring"),
+        (active_while_monitoring, "Window opened by start_monitoring"),
+        (not session.active, "Window not reopened after it ended"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_profiling_flag():
+    """Test the CLI flag and environment variable switch"""
+    print("=== TESTING PROFILING FLAG ===")
+
+    previous = os.environ.pop("ISLE_PROFILE", None)
+    try:
+        checks = [(not profiling_requested([]), "Off by default"),
+                  (profiling_requested(["--profile"]), "CLI flag")]
+        os.environ["ISLE_PROFILE"] = "1"
+        checks.append((profiling_requested([]), "Environment variable"))
+        os.environ["ISLE_PROFILE"] = "0"
+        checks.append((not profiling_requested([]), "Environment variable set to 0"))
+    finally:
+        os.environ.pop("ISLE_PROFILE", None)
+        if previous is not None:
+            os.environ["ISLE_PROFILE"] = previous
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_profiling_window()
+    test_window_starts_with_monitoring()
+    test_profiling_flag()
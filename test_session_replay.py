@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test Suite for clipboard session recording and replay
+Checks the session file, deterministic replay through the pipeline with the
+local fixture, real-time pacing and that verify notices changed coordinates
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from session_replay import (SessionRecorder, ReplayClipboard, SessionReplayer, read_session,
+                            replay_session, verify, create_updater)
+
+CLIPBOARD_CHANGES = [
+    "88,879.526, -288,696.11, 21,112.882",
+    "my secret password",
+    "(Lat: 89,123.456 Long: -289,123.45 Alt: 22,456.789)",
+    "89,123.500, -289,123.45, 22,456.789",     # Barely moved
+    "1,500,000.000, -288,696.11, 21,112.882",  # Off the map
+    "90,111.222, -290,333.44, 23,555.666",
+]
+
+@contextlib.contextmanager
+def in_temp_dir():
+    """Run the updater where its settings and bounds files cannot touch the repo"""
+    previous = os.getcwd()
+    os.chdir(tempfile.mkdtemp())
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def record_session(path, changes, interval=0.02):
+    """Record changes as the monitor sees them, like a real session"""
+    header = {'map': 'gateway', 'settings': {}}
+    with contextlib.redirect_stdout(io.StringIO()):
+        updater = create_updater(header)
+        updater.clipboard = clipboard = ReplayClipboard()
+        updater.recorder = SessionRecorder(path, 'gateway', settings={'movement_threshold': 50.0})
+        for text in changes:
+            clipboard.copy(text)
+            updater.poll_clipboard()
+            updater.poll_clipboard()  # Unchanged clipboard is not recorded again
+            time.sleep(interval)
+        updater.recorder.close()
+    return updater
+
+def test_session_file():
+    """Test the compact, redacted, gzip-compressed session file"""
+    print("=== TESTING SESSION FILE ===")
+
+    with in_temp_dir():
+        record_session("session.jsonl.gz", CLIPBOARD_CHANGES)
+        header, events = read_session("session.jsonl.gz")
+        with contextlib.redirect_stdout(io.StringIO()):
+            recorder = SessionRecorder("cut.jsonl", 'spiro')
+            recorder.record("1, 2, 3", 'sent', "1.000, 2.000, 3.000")
+            recorder.close()
+            with open("cut.jsonl", 'a') as f:
+                f.write('[12.5, "4, 5')  # Killed mid-write
+            _, cut_events = read_session("cut.jsonl")
+
+    results = [event[2] for event in events]
+    checks = [
+        (header['map'] == 'gateway' and header['settings'] == {'movement_threshold': 50.0}, "Header"),
+        (len(events) == len(CLIPBOARD_CHANGES), "One event per clipboard change"),
+        (events[0][1] == CLIPBOARD_CHANGES[0] and events[0][3] == "88,879.526, -288,696.11, 21,112.882",
+         "Text and coordinates sent"),
+        (events[1][1] == len("my secret password"), "Non-position text stored as its length"),
+        (results == ['sent', 'no_match', 'sent', 'unchanged', 'out_of_bounds', 'sent'],
+         "Results recorded"),
+        (all(b[0] - a[0] >= 15 for a, b in zip(events, events[1:])), "Millisecond timestamps"),
+        ([event[1:] for event in cut_events] == [["1, 2, 3", 'sent', "1.000, 2.000, 3.000"]],
+         "Damaged tail ignored"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_replay_and_verify():
+    """Test replay through parser, sinks and the fixture browser, and that verify spots changes"""
+    print("=== TESTING SESSION REPLAY ===")
+
+    with in_temp_dir():
+        record_session("session.jsonl", CLIPBOARD_CHANGES, interval=0)
+        result = replay_session("session.jsonl", speed=None)
+
+        # A "parser change": the same session now produces other coordinates
+        header, events = read_session("session.jsonl")
+        with contextlib.redirect_stdout(io.StringIO()):
+            updater = create_updater(header)
+            parse = updater.coordinate_parser.parse_coordinates
+            updater.coordinate_parser.parse_coordinates = lambda text: (
+                parse(text) if 'Lat' not in text else "89,123.000, -289,123.45, 22,456.789")
+            outcomes, _, _ = SessionReplayer(updater, speed=None).replay(events)
+        changed = verify(events, outcomes)
+
+    sent = [outcome[1] for outcome in result['outcomes'] if outcome[0] == 'sent']
+    checks = [
+        (result['mismatches'] == [], "Replay reproduces the recording"),
+        (len(sent) == 3 and sent[1] == "89,123.456, -289,123.45, 22,456.789", "Coordinates produced again"),
+        (result['sinks']['browser']['handled'] >= 1, "Browser sink ran"),
+        (1 <= result['positions_shown'] <= 3, "Fixture page received positions"),
+        (result['trace_total_ms'] is not None, "End-to-end latency traced"),
+        (len(result['step_ms']) == len(CLIPBOARD_CHANGES), "Per-change timing"),
+        ([index for index, _, _ in changed] == [2], "Verify finds the changed coordinates"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_real_time_pacing():
+    """Test that real-time replay keeps the recorded gaps and fast replay does not"""
+    events = [[0.0, "1, 2, 3", 'sent', None], [150.0, "4, 5, 6", 'sent', None], [300.0, "7, 8, 9", 'sent', None]]
+
+    class CountingUpdater:
+        def __init__(self):
+            self.clipboard = None
+            self.seen = []
+
+        def poll_clipboard(self):
+            self.seen.append(self.clipboard.paste())
+            return ('sent', None)
+
+    print("=== TESTING REPLAY PACING ===")
+
+    real_time = CountingUpdater()
+    _, _, real_elapsed = SessionReplayer(real_time, speed=1.0).replay(events)
+    double = CountingUpdater()
+    _, _, double_elapsed = SessionReplayer(double, speed=2.0).replay(events)
+    fast = CountingUpdater()
+    _, _, fast_elapsed = SessionReplayer(fast, speed=None).replay(events)
+
+    print(f"Real time {real_elapsed:.3f} s, 2x {double_elapsed:.3f} s, fast {fast_elapsed * 1000:.2f} ms")
+    checks = [
+        (real_time.seen == ["1, 2, 3", "4, 5, 6", "7, 8, 9"], "Changes copied in order"),
+        (0.3 <= real_elapsed < 0.5, "Real time keeps the gaps"),
+        (0.15 <= double_elapsed < 0.3, "Speed factor applied"),
+        (fast_elapsed < 0.05, "Fast mode does not sleep"),
+    ]
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_session_file()
+    test_replay_and_verify()
+    test_real_time_pacing()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the sink pipeline
+Checks drop policies and that a slow sink never delays the others
+"""
+
+import threading
+import time
+
+from latency_tracer import LatencyTracer
+from metrics_registry import MetricsRegistry
+from sink_pipeline import SinkPipeline, PositionUpdate, LATEST_WINS, DROP_OLDEST, BLOCK
+
+def update(i, trace=None):
+    return PositionUpdate("gateway", f"{i}, 0, 0", (float(i), 0.0, 0.0), "evrima", trace)
+
+def test_slow_sink_isolation():
+    """Test that a hung browser sink does not hold back history or the dispatcher"""
+    metrics = MetricsRegistry()
+    pipeline = SinkPipeline(metrics)
+    release = threading.Event()
+    browser_seen, history_seen = [], []
+
+    def browser(item):
+        browser_seen.append(item.coords[0])
+        release.wait(5)  # Hung page
+
+    pipeline.register('browser', browser, policy=LATEST_WINS)
+    pipeline.register('history', lambda item: history_seen.append(item.coords[0]), policy=BLOCK, maxsize=100)
+    pipeline.start()
+
+    print("=== TESTING SINK ISOLATION ===")
+
+    start = time.perf_counter()
+    for i in range(200):
+        pipeline.dispatch(update(i))
+    dispatch_ms = (time.perf_counter() - start) * 1000.0
+
+    deadline = time.monotonic() + 2
+    while len(history_seen) < 200 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    pipeline.stop()
+    stats = pipeline.stats()
+
+    print(f"[INFO] 200 dispatches in {dispatch_ms:.1f} ms, stats {stats['browser']}")
+    checks = [
+        (dispatch_ms < 200, "Dispatch does not wait for the hung sink"),
+        (history_seen == [float(i) for i in range(200)], "History got every position in order"),
+        (len(browser_seen) == 2 and browser_seen[-1] == 199.0, "Browser skipped straight to the newest position"),
+        (stats['browser']['coalesced'] == 198 and metrics.get_counter('updates.coalesced') == 198, "Coalesced count"),
+        (stats['history']['lag_ms']['count'] == 200, "Lag observed per sink"),
+    ]
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_drop_oldest_and_errors():
+    """Test the drop-oldest policy, block timeouts and that failing handlers keep the worker alive"""
+    pipeline = SinkPipeline(MetricsRegistry())
+    gate = threading.Event()
+    seen = []
+
+    def renderer(item):
+        gate.wait(5)
+        if item.coords[0] == 5:
+            raise RuntimeError("bad position")
+        seen.append(item.coords[0])
+
+    pipeline.register('renderer', renderer, policy=DROP_OLDEST, maxsize=3)
+    stalled = pipeline.register('stalled', lambda item: gate.wait(5), policy=BLOCK, maxsize=1, block_timeout=0.05)
+    pipeline.start()
+    for i in range(10):
+        pipeline.dispatch(update(i))
+        time.sleep(0.005)
+    gate.set()
+    pipeline.stop()
+
+    stats = pipeline.stats()
+    assert seen[0] == 0.0 and seen[-3:] == [7.0, 8.0, 9.0], seen
+    assert stats['renderer']['dropped'] == 6
+    assert stalled.dropped > 0
+    print("[PASS] Oldest positions dropped, newest kept")
+
+    pipeline = SinkPipeline()
+    pipeline.register('broken', lambda item: 1 / 0)
+    seen = []
+    pipeline.register('ok', lambda item: seen.append(item))
+    pipeline.start()
+    pipeline.dispatch(update(1))
+    pipeline.dispatch(update(2))
+    pipeline.stop()
+    assert pipeline.stats()['broken']['errors'] >= 1 and len(seen) >= 1
+    print("[PASS] Failing sink is isolated")
+
+def test_trace_enqueue_mark():
+    """Test that dispatch marks the enqueue stage of the trace"""
+    tracer = LatencyTracer(MetricsRegistry())
+    trace = tracer.start('clipboard_read')
+    trace.mark('parse')
+    pipeline = SinkPipeline()
+    pipeline.dispatch(update(1, trace))
+    assert 'enqueue' in trace.stages and trace.stages['enqueue'] >= trace.stages['parse']
+    print("[PASS] Enqueue marked at dispatch")
+
+if __name__ == "__main__":
+    test_slow_sink_isolation()
+    test_drop_oldest_and_errors()
+    test_trace_enqueue_mark()
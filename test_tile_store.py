@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the tile pyramid store
+Checks O(1) tile lookup in the mapped file and the LRU cache of decoded tiles
+"""
+
+import os
+import tempfile
+import time
+
+from tile_store import TileStore, build_pyramid, write_pyramid
+
+LEVELS = [(1, 1), (2, 2), (4, 4), (8, 8), (16, 16), (32, 32)]
+
+def make_store(cache_size=16, decoder=None):
+    path = os.path.join(tempfile.mkdtemp(), "gateway.tiles")
+    tiles = (((zoom, column, row), f"tile {zoom}/{column}/{row}".encode() * 50)
+             for zoom, (columns, rows) in reversed(list(enumerate(LEVELS)))
+             for row in range(rows) for column in range(columns))
+    write_pyramid(path, 256, LEVELS, tiles)
+    return TileStore(path, decoder=decoder, cache_size=cache_size)
+
+def test_lookup():
+    """Test that every tile is found by coordinates and missing tiles return None"""
+    store = make_store()
+
+    print("=== TESTING TILE LOOKUP ===")
+
+    start = time.perf_counter()
+    lookups = 0
+    for zoom, (columns, rows) in enumerate(LEVELS):
+        for row in range(rows):
+            for column in range(columns):
+                assert bytes(store.tile_bytes(zoom, column, row)) == f"tile {zoom}/{column}/{row}".encode() * 50
+                lookups += 1
+    per_lookup_us = (time.perf_counter() - start) / lookups * 1_000_000
+    print(f"[INFO] {lookups} lookups, {per_lookup_us:.2f} us each")
+
+    checks = [
+        (store.max_zoom == 5 and store.level_size(5) == (8192, 8192), "Levels read from the header"),
+        (store.tile_bytes(5, 32, 0) is None and store.tile_bytes(6, 0, 0) is None, "Outside tiles are None"),
+        (len(store.tiles_around(5, 4096, 4096, 448)) == 16, "View needs only the tiles around the position"),
+        (store.tiles_around(0, 10, 10, 10_000) == [(0, 0)], "View clipped to the level"),
+    ]
+    store.close()
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_lru_cache():
+    """Test decoding once per cached tile, LRU eviction and hit-rate stats"""
+    decoded = []
+    store = make_store(cache_size=24, decoder=lambda data: decoded.append(1) or bytes(data))
+
+    # Walk east across the map, asking for the 4x4 tiles around the position each step
+    for px in range(1000, 3000, 50):
+        for column, row in store.tiles_around(5, px, 4096, 448):
+            store.get_tile(5, column, row)
+
+    stats = store.stats()
+    print(f"[INFO] {stats}")
+    checks = [
+        (len(decoded) == stats['misses'], "Only misses decode"),
+        (stats['cached'] == 24, "Cache bounded"),
+        (stats['hit_rate'] > 0.9, "Moving view mostly hits the cache"),
+        (store.get_tile(5, 99, 99) is None, "Missing tile not cached"),
+    ]
+    store.close()
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_build_from_image():
+    """Test cutting a real image (only when Pillow is installed)"""
+    try:
+        from PIL import Image
+    except ImportError:
+        print("[SKIP] Pillow not installed")
+        return
+    directory = tempfile.mkdtemp()
+    image_path = os.path.join(directory, "spiro.png")
+    Image.new("RGB", (1000, 600), (30, 120, 60)).save(image_path)
+    levels = build_pyramid(image_path, os.path.join(directory, "spiro.tiles"))
+    store = TileStore(os.path.join(directory, "spiro.tiles"))
+    assert levels == [(1, 1), (2, 2), (4, 3)] and store.levels == levels
+    assert store.tile_bytes(2, 3, 2)[:4] == b"\x89PNG"
+    store.close()
+    print("[PASS] Pyramid cut from image")
+
+if __name__ == "__main__":
+    test_lookup()
+    test_lru_cache()
+    test_build_from_image()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test Suite for streaming trail simplification
+Checks the reduction on a realistic path and that no point drifts beyond the tolerance
+"""
+
+import math
+import os
+import random
+import tempfile
+
+from position_history import PositionHistory
+from trail_simplifier import TrailSimplifier, segment_distance
+
+def walk(count, seed=39):
+    """Jittery walk with occasional turns, one point per second"""
+    rng = random.Random(seed)
+    x, y, heading = 50_000.0, -200_000.0, 0.0
+    points = []
+    for i in range(count):
+        if i % 300 == 0:
+            heading += rng.uniform(-math.pi / 2, math.pi / 2)
+        x += 8.0 * math.cos(heading) + rng.uniform(-3, 3)
+        y += 8.0 * math.sin(heading) + rng.uniform(-3, 3)
+        points.append((1_000_000.0 + i, x, y, 20_000.0))
+    return points
+
+def test_streaming_simplification():
+    """Test reduction ratio and maximum deviation of the simplified trail"""
+    points = walk(20_000)
+    simplifier = TrailSimplifier(tolerance=25.0)
+
+    print("=== TESTING TRAIL SIMPLIFICATION ===")
+
+    vertices = []
+    for point in points:
+        vertices.extend(simplifier.add(point))
+    vertices.extend(simplifier.flush())
+
+    # Every raw point lies within tolerance of the segment between its surrounding vertices
+    worst = 0.0
+    segment = 0
+    for point in points:
+        while segment < len(vertices) - 2 and point[0] > vertices[segment + 1][0]:
+            segment += 1
+        worst = max(worst, segment_distance(point, vertices[segment], vertices[segment + 1]))
+
+    ratio = len(points) / len(vertices)
+    print(f"[INFO] {len(points)} points -> {len(vertices)} vertices ({ratio:.0f}x), worst deviation {worst:.1f}")
+
+    checks = [
+        (vertices[0] == points[0] and vertices[-1] == points[-1], "Trail keeps both ends"),
+        (worst <= 25.0, "Deviation within tolerance"),
+        (ratio >= 10, "Order-of-magnitude reduction"),
+    ]
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_history_trails():
+    """Test that the history store keeps simplified trails and splits them on gaps"""
+    history = PositionHistory(os.path.join(tempfile.mkdtemp(), "history.db"), flush_interval=0.05,
+                              store_raw=False, trail_tolerance=25.0, trail_gap=60.0)
+    history.start()
+
+    points = walk(2_000) + [(p[0] + 10_000, p[1] + 50_000, p[2], p[3]) for p in walk(500, seed=7)]
+    for ts, x, y, z in points:
+        history.record("gateway", (x, y, z), "evrima", timestamp=ts)
+
+    history.flush()
+    open_trail = history.trail_between("gateway", 0, 2_000_000)
+    history.close()
+
+    reopened = PositionHistory(history.db_file)
+    stored = reopened.trail_between("gateway", 0, 2_000_000)
+
+    checks = [
+        (reopened.count() == 0, "No raw positions stored"),
+        (len({row[0] for row in stored}) == 2, "Gap starts a new trail"),
+        (open_trail[-1][1:] == points[-1], "Open end is included in queries"),
+        (stored[-1][1:] == points[-1], "Closing writes the final vertex"),
+        (len(stored) * 10 <= len(points), "Trail is much smaller than the raw path"),
+    ]
+    reopened.close()
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_streaming_simplification()
+    test_history_trails()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test Suite for the local vulnona stand-in
+Checks that the fixture page and fake driver expose the DOM BrowserManager relies on
+"""
+
+from vulnona_fixture import VulnonaFixture, FakeWebDriver, BY_ID, BY_CSS_SELECTOR
+
+def test_fixture_dom():
+    """Test that the page exposes radios, labels, popup and position form"""
+    fixture = VulnonaFixture().start()
+    driver = FakeWebDriver()
+
+    print("=== TESTING FIXTURE DOM ===")
+
+    try:
+        driver.get(fixture.url)
+        radios = driver.find_elements(BY_CSS_SELECTOR, "input[type='radio'][name='map_list']")
+        label = driver.find_element(BY_CSS_SELECTOR, f"label[for='{radios[0].get_attribute('id')}']")
+
+        checks = [
+            (len(radios) == len(fixture.maps), "Map radios present"),
+            ("TI_icon.png" in label.find_element(BY_CSS_SELECTOR, "img.game_icon").get_attribute('src'), "Game icon"),
+            (label.find_element(BY_CSS_SELECTOR, "div.middle").text.startswith("✅"), "Status text"),
+            (len(driver.find_elements(BY_ID, "readme_close")) == 1, "Readme close button"),
+            (len(driver.find_elements(BY_ID, "current_pos")) == 1, "Position input"),
+            (len(driver.find_elements(BY_CSS_SELECTOR, "input[type='submit'][value='Show']")) == 1, "Show button"),
+        ]
+    finally:
+        fixture.stop()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+def test_fixture_interaction():
+    """Test that selecting a map and submitting a position reach the server"""
+    fixture = VulnonaFixture(response_delay=0.01).start()
+    driver = FakeWebDriver()
+
+    print("=== TESTING FIXTURE INTERACTION ===")
+
+    try:
+        driver.get(fixture.url)
+        label = driver.find_element(BY_CSS_SELECTOR, "label[for='map_list_spiro']")
+        driver.execute_script("arguments[0].click();", label)
+
+        position = driver.find_element(BY_ID, "current_pos")
+        position.clear()
+        position.send_keys("88,879.526, -288,696.11, 21,112.882")
+        driver.find_element(BY_CSS_SELECTOR, "input[type='submit'][value='Show']").click()
+
+        state = fixture.get_state()
+        radio = driver.find_element(BY_CSS_SELECTOR, "input[type='radio'][name='map_list'][value='spiro']")
+        checks = [
+            (state['selected_map'] == "spiro", "Map selection reached fixture"),
+            (radio.is_selected(), "Radio checked in fake DOM"),
+            (state['last_position'] == "88,879.526, -288,696.11, 21,112.882", "Position reached fixture"),
+            (state['position_count'] == 1, "Exactly one position update"),
+        ]
+
+        driver.crash()
+        try:
+            driver.find_element(BY_ID, "current_pos").clear()
+            checks.append((False, "Crashed driver raises"))
+        except Exception:
+            checks.append((True, "Crashed driver raises"))
+    finally:
+        fixture.stop()
+
+    for ok, description in checks:
+        print(f"[{'PASS' if ok else 'FAIL'}] {description}")
+    assert all(ok for ok, _ in checks)
+
+if __name__ == "__main__":
+    test_fixture_dom()
+    test_fixture_interaction()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Tile pyramid store for Isle Map Updater
+Keeps pre-cut map tiles for every zoom level in one memory-mapped file per
+map. A fixed-size index gives O(1) tile lookup, and only the tiles around
+the current position are ever decoded, through a bounded LRU cache.
+
+    python tile_store.py map_images/gateway.png map_images/gateway.tiles
+"""
+
+import argparse
+import io
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+
+MAGIC = b"ISLETILE"
+VERSION = 1
+HEADER = struct.Struct("<8sHHH")   # magic, version, tile_size, level count
+LEVEL = struct.Struct("<II")       # columns, rows (level 0 = most zoomed out)
+ENTRY = struct.Struct("<QI")       # data offset, length (0 = no tile)
+
+
+def write_pyramid(path, tile_size, levels, tiles):
+    """Write a tile file. levels is [(columns, rows), ...] from zoomed out to full
+    resolution; tiles yields ((zoom, column, row), encoded_bytes) in any order"""
+    entry_counts = [columns * rows for columns, rows in levels]
+    index_start = HEADER.size + LEVEL.size * len(levels)
+    level_starts = []
+    position = index_start
+    for count in entry_counts:
+        level_starts.append(position)
+        position += count * ENTRY.size
+    data_start = position
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, tile_size, len(levels)))
+        for columns, rows in levels:
+            f.write(LEVEL.pack(columns, rows))
+        f.write(b"\0" * (data_start - index_start))  # Index, filled in as tiles arrive
+
+        offset = data_start
+        for (zoom, column, row), data in tiles:
+            columns, rows = levels[zoom]
+            if not (0 <= column < columns and 0 <= row < rows):
+                raise ValueError(f"Tile {zoom}/{column}/{row} outside level {columns}x{rows}")
+            f.seek(offset)
+            f.write(data)
+            f.seek(level_starts[zoom] + (row * columns + column) * ENTRY.size)
+            f.write(ENTRY.pack(offset, len(data)))
+            offset += len(data)
+
+
+def build_pyramid(image_path, output_path, tile_size=256, image_format="PNG"):
+    """Cut a large map image into a tile pyramid (needs Pillow, only for building)"""
+    from PIL import Image  # Optional - the app itself only reads tile files
+
+    Image.MAX_IMAGE_PIXELS = None  # Map images are trusted and large
+    with Image.open(image_path) as source:
+        full = source.convert("RGB")
+
+    # Halve until the whole map fits in one tile
+    images = [full]
+    while max(images[0].size) > tile_size:
+        width, height = images[0].size
+        images.insert(0, images[0].resize((max(1, width // 2), max(1, height // 2)), Image.LANCZOS))
+    levels = [(-(-image.width // tile_size), -(-image.height // tile_size)) for image in images]
+
+    def tiles():
+        for zoom, image in enumerate(images):
+            columns, rows = levels[zoom]
+            for row in range(rows):
+                for column in range(columns):
+                    box = (column * tile_size, row * tile_size,
+                           min(image.width, (column + 1) * tile_size), min(image.height, (row + 1) * tile_size))
+                    buffer = io.BytesIO()
+                    image.crop(box).save(buffer, format=image_format)
+                    yield (zoom, column, row), buffer.getvalue()
+
+    write_pyramid(output_path, tile_size, levels, tiles())
+    return levels
+
+
+class TileStore:
+    """Read-only view of one tile file with an LRU cache of decoded tiles"""
+
+    def __init__(self, path, decoder=None, cache_size=64):
+        self.path = path
+        self.decoder = decoder or (lambda data: data)  # e.g. bytes -> tk.PhotoImage
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # (zoom, column, row) -> decoded tile
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.tile_size, level_count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a tile file: {path}")
+
+        self.levels = [LEVEL.unpack_from(self.data, HEADER.size + i * LEVEL.size) for i in range(level_count)]
+        self.level_starts = []
+        position = HEADER.size + LEVEL.size * level_count
+        for columns, rows in self.levels:
+            self.level_starts.append(position)
+            position += columns * rows * ENTRY.size
+
+    @property
+    def max_zoom(self):
+        return len(self.levels) - 1
+
+    def level_size(self, zoom):
+        """Pixel size of a zoom level (rounded up to whole tiles)"""
+        columns, rows = self.levels[zoom]
+        return columns * self.tile_size, rows * self.tile_size
+
+    def tile_bytes(self, zoom, column, row):
+        """Encoded tile straight from the mapped file (no copy of the rest), or None"""
+        if not 0 <= zoom < len(self.levels):
+            return None
+        columns, rows = self.levels[zoom]
+        if not (0 <= column < columns and 0 <= row < rows):
+            return None
+        offset, length = ENTRY.unpack_from(self.data, self.level_starts[zoom] + (row * columns + column) * ENTRY.size)
+        return self.data[offset:offset + length] if length else None
+
+    def get_tile(self, zoom, column, row):
+        """Decoded tile through the LRU cache, or None outside the map"""
+        key = (zoom, column, row)
+        with self.lock:
+            tile = self.cache.get(key)
+            if tile is not None:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return tile
+            self.misses += 1
+
+        data = self.tile_bytes(zoom, column, row)
+        if data is None:
+            return None
+        tile = self.decoder(data)
+        with self.lock:
+            self.cache[key] = tile
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return tile
+
+    def tiles_around(self, zoom, px, py, half_width, half_height=None):
+        """(column, row) of the tiles covering a view centred on a pixel of that zoom level"""
+        half_height = half_width if half_height is None else half_height
+        columns, rows = self.levels[zoom]
+        first_column = max(0, int((px - half_width) // self.tile_size))
+        last_column = min(columns - 1, int((px + half_width) // self.tile_size))
+        first_row = max(0, int((py - half_height) // self.tile_size))
+        last_row = min(rows - 1, int((py + half_height) // self.tile_size))
+        return [(column, row) for row in range(first_row, last_row + 1)
+                for column in range(first_column, last_column + 1)]
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else None,
+                'cached': len(self.cache),
+            }
+
+    def close(self):
+        with self.lock:
+            self.cache.clear()
+        self.data.close()
+        self.file.close()
+
+
+def main():
+    """Command line entry point for cutting tiles"""
+    parser = argparse.ArgumentParser(description="Cut a map image into an Isle Map Updater tile file")
+    parser.add_argument("image", help="Full-resolution map image")
+    parser.add_argument("output", nargs="?", help="Tile file (default: image name with .tiles)")
+    parser.add_argument("--tile-size", type=int, default=256)
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.image)[0] + ".tiles"
+    levels = build_pyramid(args.image, output, args.tile_size)
+    print(f"[TILES] Wrote {sum(c * r for c, r in levels)} tiles in {len(levels)} levels to {output}")
+
+
+if __name__ == "__main__":
+    main()
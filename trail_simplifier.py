@@ -0,0 +1,75 @@
+"""
+Trail simplification for Isle Map Updater
+Streaming (opening-window) Douglas-Peucker: points are simplified as they
+arrive, so a day of clipboard-rate positions shrinks to the vertices that
+actually change the shape of the trail.
+"""
+
+import math
+
+
+def segment_distance(point, start, end):
+    """Distance on the map plane (x, y) from point to the segment start-end"""
+    px, py = point[1], point[2]
+    ax, ay = start[1], start[2]
+    bx, by = end[1], end[2]
+    dx, dy = bx - ax, by - ay
+    length_sq = dx * dx + dy * dy
+    if length_sq == 0.0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+class TrailSimplifier:
+    """Simplifies one trail of (ts, x, y, z) points.
+    add() returns the vertices that became final; the trail so far is
+    every returned vertex followed by `last` (the open end)."""
+
+    def __init__(self, tolerance=25.0, max_window=500):
+        self.tolerance = tolerance    # Max distance (game units) a dropped point may lie from the trail
+        self.max_window = max_window  # Bounds the work per point on long straight runs
+        self.anchor = None            # Last emitted vertex
+        self.window = []              # Points since the anchor, all within tolerance of anchor->window[-1]
+        self.points_in = 0
+        self.vertices_out = 0
+
+    @property
+    def last(self):
+        """Most recent point (not yet a vertex unless the trail is flushed)"""
+        return self.window[-1] if self.window else self.anchor
+
+    def add(self, point):
+        """Feed one point; returns the list of newly finalized vertices"""
+        self.points_in += 1
+        if self.anchor is None:
+            self.anchor = point
+            self.vertices_out += 1
+            return [point]
+
+        if len(self.window) < self.max_window and all(
+                segment_distance(kept, self.anchor, point) <= self.tolerance for kept in self.window):
+            self.window.append(point)
+            return []
+
+        # The new point bends the trail: the previous point becomes a vertex
+        vertex = self.window[-1]
+        self.anchor = vertex
+        self.window = [point]
+        self.vertices_out += 1
+        return [vertex]
+
+    def flush(self):
+        """Close the trail; returns the open end as a final vertex (if any)"""
+        if not self.window:
+            return []
+        vertex = self.window[-1]
+        self.anchor = vertex
+        self.window = []
+        self.vertices_out += 1
+        return [vertex]
+
+    def reset(self):
+        """Start a new trail (teleport, map change)"""
+        self.anchor = None
+        self.window = []
@@ -0,0 +1,540 @@
+"""
+Local vulnona stand-in for Isle Map Updater
+Serves a page with the DOM structure BrowserManager relies on and provides
+a lightweight fake driver so the browser code can run without network access
+"""
+
+import json
+import threading
+import time
+import urllib.parse
+import urllib.request
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# Same string values as selenium.webdriver.common.by.By
+BY_ID = "id"
+BY_CSS_SELECTOR = "css selector"
+
+DEFAULT_MAPS = [
+    # (value, name, game icon, status text)
+    ("gateway", "Gateway", "TI_icon.png", "✅ Up to date"),
+    ("spiro", "Spiro", "TI_icon.png", "✅ Up to date"),
+    ("test_map", "Test Map", "TI_icon.png", "⚠️ Legacy"),
+    ("isla_spiro_outdated", "Isla Spiro OUTDATED", "TI_icon.png", "❌ Outdated"),
+    ("gondwa", "Gondwa", "PoT_icon.png", "✅ Up to date"),
+]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><title>Vulnona Map (local fixture)</title></head>
+<body>
+<div id="readme"><button id="readme_close" type="button">Close</button></div>
+<form id="map_select">
+{radios}
+</form>
+<form id="position_form">
+<input type="text" id="current_pos" name="current_pos" value="">
+<input type="submit" value="Show">
+</form>
+<div id="map_container"><div id="player_marker" data-pos=""></div></div>
+<script>
+document.getElementById('readme_close').onclick = function () {{
+    document.getElementById('readme').style.display = 'none';
+}};
+document.querySelectorAll("input[name='map_list']").forEach(function (radio) {{
+    radio.addEventListener('change', function () {{
+        fetch('/select?map=' + encodeURIComponent(radio.value));
+    }});
+}});
+document.getElementById('position_form').onsubmit = function (event) {{
+    event.preventDefault();
+    var pos = document.getElementById('current_pos').value;
+    fetch('/show?pos=' + encodeURIComponent(pos)).then(function () {{
+        document.getElementById('player_marker').setAttribute('data-pos', pos);
+    }});
+}};
+</script>
+</body>
+</html>
+"""
+
+RADIO_TEMPLATE = (
+    '<input type="radio" name="map_list" id="map_list_{value}" value="{value}"{checked}>\n'
+    '<label for="map_list_{value}"><img class="game_icon" src="/img/{icon}">'
+    '<div class="left">{name}</div><div class="middle">{status}</div></label>'
+)
+
+VOID_TAGS = {"input", "img", "br", "meta", "link", "hr"}
+
+
+class VulnonaFixture:
+    """Threaded local HTTP server imitating vulnona.com/game/map/"""
+
+    def __init__(self, maps=None, load_delay=0.0, response_delay=0.0, host="127.0.0.1", port=0):
+        self.maps = list(maps or DEFAULT_MAPS)
+        self.load_delay = load_delay          # Artificial delay for the main page
+        self.response_delay = response_delay  # Artificial delay for map select / show requests
+        self.host = host
+        self.port = port
+        self.server = None
+        self.thread = None
+
+        # Observed state, readable by tests and benchmarks
+        self.lock = threading.Lock()
+        self.selected_map = self.maps[0][0] if self.maps else None
+        self.last_position = None
+        self.position_count = 0
+        self.page_loads = 0
+        self.markers = {}       # Multi-marker overlay: id -> [fraction x, fraction y, label]
+        self.marker_frames = 0
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/game/map/"
+
+    def render_page(self):
+        """Render the map page with the current map selection"""
+        radios = []
+        for value, name, icon, status in self.maps:
+            checked = " checked" if value == self.selected_map else ""
+            radios.append(RADIO_TEMPLATE.format(value=value, name=name, icon=icon,
+                                                status=status, checked=checked))
+        return PAGE_TEMPLATE.format(radios="\n".join(radios))
+
+    def start(self):
+        """Start serving in a background thread"""
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                fixture.handle_request(self)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        print(f"[FIXTURE] Serving local vulnona stand-in at {self.url}")
+        return self
+
+    def stop(self):
+        """Stop the server"""
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def handle_request(self, handler):
+        """Route a GET request"""
+        parsed = urllib.parse.urlparse(handler.path)
+        query = urllib.parse.parse_qs(parsed.query)
+
+        if parsed.path.startswith("/game/map"):
+            time.sleep(self.load_delay)
+            with self.lock:
+                self.page_loads += 1
+                body = self.render_page()
+            self._send(handler, body, "text/html; charset=utf-8")
+        elif parsed.path == "/select":
+            time.sleep(self.response_delay)
+            with self.lock:
+                self.selected_map = query.get("map", [None])[0]
+            self._send_json(handler, {"ok": True, "map": self.selected_map})
+        elif parsed.path == "/show":
+            time.sleep(self.response_delay)
+            with self.lock:
+                self.last_position = query.get("pos", [""])[0]
+                self.position_count += 1
+            self._send_json(handler, {"ok": True, "pos": self.last_position})
+        elif parsed.path == "/markers":
+            time.sleep(self.response_delay)
+            frame = json.loads(query.get("frame", ["{}"])[0])
+            with self.lock:
+                self.apply_marker_frame(frame)
+                count = len(self.markers)
+            self._send_json(handler, {"ok": True, "markers": count})
+        elif parsed.path == "/state":
+            self._send_json(handler, self.get_state())
+        else:
+            self._send(handler, "not found", "text/plain", status=404)
+
+    def apply_marker_frame(self, frame):
+        """Same bookkeeping as the injected marker script"""
+        if frame.get("full"):
+            self.markers = {}
+        for marker_id in frame.get("removed", []):
+            self.markers.pop(marker_id, None)
+        self.markers.update(frame.get("set", {}))
+        self.marker_frames += 1
+
+    def get_state(self):
+        """Snapshot of the observed page state"""
+        with self.lock:
+            return {
+                "selected_map": self.selected_map,
+                "last_position": self.last_position,
+                "position_count": self.position_count,
+                "page_loads": self.page_loads,
+                "marker_count": len(self.markers),
+                "marker_frames": self.marker_frames,
+            }
+
+    def _send_json(self, handler, data):
+        self._send(handler, json.dumps(data), "application/json")
+
+    def _send(self, handler, body, content_type, status=200):
+        payload = body.encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+
+class NoSuchElementException(Exception):
+    """Raised by the fake driver when a lookup finds nothing"""
+
+
+class FakeElement:
+    """Minimal stand-in for a selenium WebElement"""
+
+    def __init__(self, driver, tag, attrs, parent=None):
+        self.driver = driver
+        self.tag_name = tag
+        self.attrs = dict(attrs)
+        self.parent = parent
+        self.children = []
+        self.text_parts = []
+
+    @property
+    def text(self):
+        """Visible text, one line per text node like a rendered block layout"""
+        lines = [part.strip() for part in self.text_parts if part.strip()]
+        for child in self.children:
+            child_text = child.text
+            if child_text:
+                lines.append(child_text)
+        return "\n".join(lines)
+
+    def root(self):
+        """Document this element belongs to"""
+        element = self
+        while element.parent is not None:
+            element = element.parent
+        return element
+
+    def _find_by_id(self, element_id):
+        matches = self.root().find_elements(BY_ID, element_id) if element_id else []
+        return matches[0] if matches else None
+
+    def _request(self, path, params):
+        return self.driver._request(self.root().url, path, params)
+
+    def outer_html(self):
+        """Approximate markup of the element (attributes, text and children)"""
+        attributes = "".join(f' {name}="{value}"' for name, value in sorted(self.attrs.items()))
+        inner = "".join(self.text_parts) + "".join(child.outer_html() for child in self.children)
+        return f"<{self.tag_name}{attributes}>{inner}</{self.tag_name}>"
+
+    def get_attribute(self, name):
+        if name == "checked":
+            return "true" if "checked" in self.attrs else None
+        return self.attrs.get(name)
+
+    def is_selected(self):
+        return "checked" in self.attrs
+
+    def clear(self):
+        self.driver._check_alive()
+        self.attrs["value"] = ""
+
+    def send_keys(self, text):
+        self.driver._check_alive()
+        self.attrs["value"] = self.attrs.get("value", "") + text
+
+    def click(self):
+        """Mimic the page's reaction to a click"""
+        self.driver._check_alive()
+        if self.tag_name == "label":
+            target = self._find_by_id(self.attrs.get("for"))
+            if target is not None:
+                target.click()
+        elif self.tag_name == "input" and self.attrs.get("type") == "radio":
+            if "checked" not in self.attrs:
+                self.driver._check_radio(self)
+                self._request("/select", {"map": self.attrs.get("value", "")})
+        elif self.tag_name == "input" and self.attrs.get("type") == "submit":
+            position = self._find_by_id("current_pos")
+            value = position.attrs.get("value", "") if position is not None else ""
+            self._request("/show", {"pos": value})
+            marker = self._find_by_id("player_marker")
+            if marker is not None:
+                marker.attrs["data-pos"] = value
+        elif self.attrs.get("id") == "readme_close":
+            readme = self._find_by_id("readme")
+            if readme is not None:
+                readme.attrs["style"] = "display: none;"
+
+    def find_element(self, by, value):
+        matches = self.find_elements(by, value)
+        if not matches:
+            raise NoSuchElementException(f"No element for {by}={value}")
+        return matches[0]
+
+    def find_elements(self, by, value):
+        self.driver._check_alive()
+        return [element for element in self.iter_descendants() if _matches(element, by, value)]
+
+    def iter_descendants(self):
+        for child in self.children:
+            yield child
+            yield from child.iter_descendants()
+
+
+class _DocumentBuilder(HTMLParser):
+    """Builds a FakeElement tree from the fixture page"""
+
+    def __init__(self, driver):
+        super().__init__(convert_charrefs=True)
+        self.root = FakeElement(driver, "#document", {})
+        self.stack = [self.root]
+        self.in_script = False
+
+    def handle_starttag(self, tag, attrs):
+        attributes = {name: (value if value is not None else "") for name, value in attrs}
+        element = FakeElement(self.root.driver, tag, attributes, parent=self.stack[-1])
+        self.stack[-1].children.append(element)
+        if tag == "script":
+            self.in_script = True
+        if tag not in VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self.in_script = False
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index].tag_name == tag:
+                del self.stack[index:]
+                break
+
+    def handle_data(self, data):
+        if not self.in_script:
+            self.stack[-1].text_parts.append(data)
+
+
+def _parse_selector(selector):
+    """Split a compound CSS selector (tag, .class, #id, [attr='value']) into parts"""
+    tag = None
+    conditions = []
+    index = 0
+    length = len(selector)
+
+    while index < length:
+        char = selector[index]
+        if char == "[":
+            end = selector.index("]", index)
+            body = selector[index + 1:end]
+            if "=" in body:
+                name, value = body.split("=", 1)
+                conditions.append(("attr", name.strip(), value.strip().strip("'\"")))
+            else:
+                conditions.append(("has", body.strip(), None))
+            index = end + 1
+        elif char in ".#":
+            end = index + 1
+            while end < length and selector[end] not in ".#[":
+                end += 1
+            kind = "class" if char == "." else "id"
+            conditions.append((kind, selector[index + 1:end], None))
+            index = end
+        else:
+            end = index
+            while end < length and selector[end] not in ".#[":
+                end += 1
+            tag = selector[index:end].strip() or None
+            index = end
+
+    return tag, conditions
+
+
+def _matches(element, by, value):
+    if by == BY_ID:
+        return element.attrs.get("id") == value
+    if by != BY_CSS_SELECTOR:
+        raise ValueError(f"Unsupported locator strategy: {by}")
+
+    tag, conditions = _parse_selector(value)
+    if tag and element.tag_name != tag:
+        return False
+    for kind, name, expected in conditions:
+        if kind == "attr" and element.attrs.get(name) != expected:
+            return False
+        if kind == "has" and name not in element.attrs:
+            return False
+        if kind == "class" and name not in element.attrs.get("class", "").split():
+            return False
+        if kind == "id" and element.attrs.get("id") != name:
+            return False
+    return True
+
+
+class _FakeSwitchTo:
+    """driver.switch_to stand-in for window handling"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver._check_alive()
+        if handle not in self.driver.windows:
+            raise NoSuchElementException(f"No such window: {handle}")
+        self.driver.active_handle = handle
+
+    def new_window(self, type_hint=None):
+        self.driver._check_alive()
+        self.driver.active_handle = self.driver._new_window()
+
+
+class FakeWebDriver:
+    """Selenium-compatible subset used by BrowserManager, backed by VulnonaFixture over HTTP"""
+
+    def __init__(self, request_timeout=10):
+        self.request_timeout = request_timeout
+        self.crashed = False
+        self.windows = {}  # handle -> {"url", "document", "source"}
+        self.window_counter = 0
+        self.active_handle = self._new_window()
+        self.switch_to = _FakeSwitchTo(self)
+
+    # --- windows --------------------------------------------------------------
+
+    @property
+    def current_window_handle(self):
+        self._check_alive()
+        if self.active_handle not in self.windows:
+            raise NoSuchElementException("Current window was closed")
+        return self.active_handle
+
+    @property
+    def window_handles(self):
+        self._check_alive()
+        return list(self.windows)
+
+    @property
+    def current_url(self):
+        return self.windows[self.active_handle]["url"]
+
+    @property
+    def document(self):
+        return self.windows[self.active_handle]["document"]
+
+    def close(self):
+        """Close the current window"""
+        self._check_alive()
+        del self.windows[self.active_handle]
+
+    def _new_window(self):
+        self.window_counter += 1
+        handle = f"fake-window-{self.window_counter}"
+        self.windows[handle] = {"url": None, "document": None, "source": ""}
+        return handle
+
+    # --- page loading -------------------------------------------------------
+
+    def get(self, url):
+        self._check_alive()
+        with urllib.request.urlopen(url, timeout=self.request_timeout) as response:
+            html = response.read().decode("utf-8")
+        builder = _DocumentBuilder(self)
+        builder.feed(html)
+        builder.root.url = url
+        self.windows[self.active_handle] = {"url": url, "document": builder.root, "source": html}
+
+    @property
+    def title(self):
+        self._check_alive()
+        titles = self.document.find_elements(BY_CSS_SELECTOR, "title") if self.document else []
+        return titles[0].text if titles else ""
+
+    @property
+    def page_source(self):
+        self._check_alive()
+        return self.windows[self.active_handle]["source"]
+
+    # --- lookups --------------------------------------------------------------
+
+    def find_element(self, by, value):
+        self._check_alive()
+        if self.document is None:
+            raise NoSuchElementException("No page loaded")
+        return self.document.find_element(by, value)
+
+    def find_elements(self, by, value):
+        self._check_alive()
+        if self.document is None:
+            return []
+        return self.document.find_elements(by, value)
+
+    def execute_script(self, script, *args):
+        """Handle the small set of scripts BrowserManager injects"""
+        self._check_alive()
+        if "checked = true" in script and args:
+            self._check_radio(args[0])
+        if ".click()" in script and args:
+            args[0].click()
+        if "outerHTML" in script and args:
+            return args[0].outer_html()
+        if "isle-markers" in script and len(args) == 2:
+            return self._apply_marker_frame(*args)
+        return None
+
+    def quit(self):
+        self.windows = {}
+        self.crashed = True
+
+    # --- fault injection --------------------------------------------------------
+
+    def crash(self):
+        """Simulate a dead browser: every later command raises"""
+        self.crashed = True
+
+    # --- helpers used by FakeElement ---------------------------------------------
+
+    def _check_alive(self):
+        if self.crashed:
+            raise ConnectionError("Fake browser session is no longer available")
+
+    def _check_radio(self, radio):
+        name = radio.attrs.get("name")
+        for other in radio.root().find_elements(BY_CSS_SELECTOR, f"input[type='radio'][name='{name}']"):
+            other.attrs.pop("checked", None)
+        radio.attrs["checked"] = ""
+
+    def _apply_marker_frame(self, selector, frame_json):
+        """Mimic the marker script: the overlay lives with the loaded page, and
+        the frame is reported to the fixture (one request per frame)"""
+        if not self.find_elements(BY_CSS_SELECTOR, selector):
+            return None
+        window = self.windows[self.active_handle]
+        frame = json.loads(frame_json)
+        markers = window.setdefault("markers", {})
+        if frame["full"]:
+            markers.clear()
+        for marker_id in frame["removed"]:
+            markers.pop(marker_id, None)
+        markers.update(frame["set"])
+        self._request(window["url"], "/markers", {"frame": frame_json})
+        return len(markers)
+
+    def _request(self, url, path, params):
+        base = urllib.parse.urlparse(url)
+        request_url = f"{base.scheme}://{base.netloc}{path}?{urllib.parse.urlencode(params)}"
+        with urllib.request.urlopen(request_url, timeout=self.request_timeout) as response:
+            return json.loads(response.read().decode("utf-8"))